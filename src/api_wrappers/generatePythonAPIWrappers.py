@@ -18,10 +18,16 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import argparse
 import json
 import re
 import sys
 
+parser = argparse.ArgumentParser(description="Generates Python API wrappers from the wrapper table on stdin.")
+parser.add_argument("--async", dest="use_async", action="store_true",
+                    help="Generate coroutine wrappers for dxpy.aio instead of the blocking wrappers for dxpy")
+args = parser.parse_args()
+
 preamble = '''# Do not modify this file by hand.
 #
 # It is automatically generated by src/api_wrappers/generatePythonAPIWrappers.py.
@@ -31,30 +37,30 @@ from __future__ import print_function, unicode_literals, division, absolute_impo
 
 import sys
 
-from dxpy import DXHTTPRequest
+from {http_request_module} import DXHTTPRequest
 from dxpy.utils import Nonce
 '''
 
-class_method_template = '''def {wrapper_method_name}(input_params={{}}, always_retry={retry}, **kwargs):
+class_method_template = '''{def_keyword} {wrapper_method_name}(input_params={{}}, always_retry={retry}, **kwargs):
     """
     Invokes the {route} API method.{wiki_ref}
     """{nonce_code}
-    return DXHTTPRequest('{route}', {input_params}, always_retry=always_retry, **kwargs)
+    return {await_keyword}DXHTTPRequest('{route}', {input_params}, always_retry=always_retry, **kwargs)
 '''
 
-object_method_template = '''def {wrapper_method_name}(object_id, input_params={{}}, always_retry={retry}, **kwargs):
+object_method_template = '''{def_keyword} {wrapper_method_name}(object_id, input_params={{}}, always_retry={retry}, **kwargs):
     """
     Invokes the {route} API method.{wiki_ref}
     """{nonce_code}
-    return DXHTTPRequest('/%s/{api_method_name}' % object_id, {input_params}, always_retry=always_retry, **kwargs)
+    return {await_keyword}DXHTTPRequest('/%s/{api_method_name}' % object_id, {input_params}, always_retry=always_retry, **kwargs)
 '''
 
-globalexec_object_method_template = '''def {wrapper_method_name}({name_or_id}, alias=None, input_params={{}}, always_retry={retry}, **kwargs):
+globalexec_object_method_template = '''{def_keyword} {wrapper_method_name}({name_or_id}, alias=None, input_params={{}}, always_retry={retry}, **kwargs):
     """
     Invokes the /{exec_type}-xxxx/{api_method_name} API method.{wiki_ref}
     """{nonce_code}
     fully_qualified_version = {name_or_id} + (('/' + alias) if alias else '')
-    return DXHTTPRequest('/%s/{api_method_name}' % fully_qualified_version, {input_params}, always_retry=always_retry, **kwargs)
+    return {await_keyword}DXHTTPRequest('/%s/{api_method_name}' % fully_qualified_version, {input_params}, always_retry=always_retry, **kwargs)
 '''
 
 
@@ -70,13 +76,20 @@ def make_wiki_ref(url):
     return ("\n\n    For more info, see: " + url) if url else ""
 
 
+def make_keywords():
+    if args.use_async:
+        return dict(def_keyword="async def", await_keyword="await ")
+    return dict(def_keyword="def", await_keyword="")
+
+
 def make_class_method(wrapper_method_name, route, accept_nonce, retry=False, url=None):
     return class_method_template.format(wrapper_method_name=wrapper_method_name,
                                         route=route,
                                         retry=retry,
                                         wiki_ref=make_wiki_ref(url),
                                         nonce_code=make_nonce_code(accept_nonce),
-                                        input_params=make_input_params(accept_nonce))
+                                        input_params=make_input_params(accept_nonce),
+                                        **make_keywords())
 
 
 def make_object_method(wrapper_method_name, api_method_name, route, accept_nonce, retry=False, url=None):
@@ -86,7 +99,8 @@ def make_object_method(wrapper_method_name, api_method_name, route, accept_nonce
                                          retry=retry,
                                          wiki_ref=make_wiki_ref(url),
                                          nonce_code=make_nonce_code(accept_nonce),
-                                         input_params=make_input_params(accept_nonce))
+                                         input_params=make_input_params(accept_nonce),
+                                         **make_keywords())
 
 
 def make_app_or_globalworkflow_object_method(wrapper_method_name, api_method_name, exec_type,
@@ -98,7 +112,8 @@ def make_app_or_globalworkflow_object_method(wrapper_method_name, api_method_nam
                                              retry=retry,
                                              wiki_ref=make_wiki_ref(url),
                                              nonce_code=make_nonce_code(accept_nonce),
-                                             input_params=make_input_params(accept_nonce))
+                                             input_params=make_input_params(accept_nonce),
+                                             **make_keywords())
 
 
 def camel_case_to_underscore(name):
@@ -107,7 +122,7 @@ def camel_case_to_underscore(name):
     """
     return re.sub("[A-Z]+", lambda m: "_" + m.group(0).lower(), name, 0)
 
-print(preamble)
+print(preamble.format(http_request_module="dxpy.aio" if args.use_async else "dxpy"))
 
 for method in json.loads(sys.stdin.read()):
     route, signature, opts = method
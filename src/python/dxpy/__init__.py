@@ -57,6 +57,33 @@ The bindings are configured by the following environment variables:
    Indicates either the project context of a running job, or the default
    project to use for a user accessing the platform from the outside.
 
+.. envvar:: DX_DESCRIBE_CACHE
+
+   If set to a nonempty value other than ``0``, descriptions of data
+   objects are cached on disk in ``~/.dnanexus_config`` and shared
+   between processes (see :mod:`dxpy.utils.describe_cache`). The maximum
+   number of cached descriptions can be set with
+   ``DX_DESCRIBE_CACHE_SIZE``.
+
+.. envvar:: DX_API_POOL_SIZE
+
+   Maximum number of connections to the API server that are kept open
+   for reuse (default 32).
+
+.. envvar:: DX_STORAGE_POOL_SIZE
+
+   Maximum number of connections to each storage host (used to transfer
+   file data) that are kept open for reuse (default: 4 per CPU core,
+   and at least 32).
+
+.. envvar:: DX_POOL_BLOCK
+
+   If set to a nonempty value other than ``0``, a request for which no
+   connection is available waits for one to be returned to its pool,
+   instead of opening a connection that is closed after use. The number
+   of connections opened, reused, and dropped, and the number of such
+   waits, are reported by :func:`dxpy.get_http_pool_stats`.
+
 The following fields can be used to read the current configuration
 values:
 
@@ -210,10 +237,105 @@ _RequestForAuth = namedtuple('_RequestForAuth', 'method url headers')
 _expected_exceptions = (exceptions.network_exceptions, exceptions.DXAPIError, BadStatusLine, exceptions.BadJSONInReply,
                         exceptions.UrllibInternalError)
 
+# Requests to the API server and requests for file data (to the URLs
+# of the storage service) are made from separate pools, so that bulk
+# transfers do not take the connections of metadata calls, or vice
+# versa.
+API_POOL = 'api'
+STORAGE_POOL = 'storage'
+DEFAULT_API_POOL_SIZE = 32
+DEFAULT_STORAGE_POOL_SIZE = 32
+STORAGE_POOL_CONNECTIONS_PER_CORE = 4
+
 # Multiple threads can ask for the pool, so we need to protect
 # access and make it thread safe.
 _pool_mutex = Lock()
-_pool_manager = None
+_pool_managers = {}
+
+_pool_stats_mutex = Lock()
+_pool_stats = {pool_name: dict(opened=0, reused=0, dropped=0, waits=0) for pool_name in (API_POOL, STORAGE_POOL)}
+
+def _count_pool_event(pool_name, event, count=1):
+    with _pool_stats_mutex:
+        _pool_stats[pool_name][event] += count
+
+def get_http_pool_stats(reset=False):
+    '''
+    :param reset: If True, the counters are set to zero after they are read
+    :type reset: boolean
+    :returns: For each connection pool (:data:`API_POOL` and :data:`STORAGE_POOL`), a dict of counters
+    :rtype: dict
+
+    Returns the number of connections that requests made by
+    :func:`DXHTTPRequest` have opened ("opened", each of which costs a
+    TCP and usually a TLS handshake), reused ("reused"), and closed
+    after an error or because the pool was full ("dropped"), and the
+    number of times a request had to wait for a connection ("waits";
+    see :envvar:`DX_POOL_BLOCK`).
+    '''
+    with _pool_stats_mutex:
+        stats = {pool_name: dict(counters) for pool_name, counters in _pool_stats.items()}
+        if reset:
+            for counters in _pool_stats.values():
+                for event in counters:
+                    counters[event] = 0
+    return stats
+
+class _CountingConnectionPoolMixin(object):
+    '''
+    Counts the connection events of a urllib3 connection pool in the
+    counters of the dxpy pool named by *dx_pool_name*.
+    '''
+    dx_pool_name = None
+
+    def _get_conn(self, timeout=None):
+        if self.block and self.pool is not None and self.pool.empty():
+            _count_pool_event(self.dx_pool_name, "waits")
+        conn = super(_CountingConnectionPoolMixin, self)._get_conn(timeout=timeout)
+        # A connection without a socket connects when it is used
+        _count_pool_event(self.dx_pool_name, "reused" if getattr(conn, "sock", None) is not None else "opened")
+        return conn
+
+    def _put_conn(self, conn):
+        # urllib3 puts back None in place of a connection it has closed
+        # after an error, and closes connections that do not fit
+        if conn is None or self.pool is None or self.pool.full():
+            _count_pool_event(self.dx_pool_name, "dropped")
+        super(_CountingConnectionPoolMixin, self)._put_conn(conn)
+
+def _get_pool_size(pool_name):
+    if pool_name == API_POOL:
+        env_var, default = 'DX_API_POOL_SIZE', DEFAULT_API_POOL_SIZE
+    else:
+        from multiprocessing import cpu_count
+        env_var = 'DX_STORAGE_POOL_SIZE'
+        default = max(DEFAULT_STORAGE_POOL_SIZE, STORAGE_POOL_CONNECTIONS_PER_CORE * cpu_count())
+    try:
+        size = int(os.environ.get(env_var, default))
+    except ValueError:
+        logger.warning("Expected %s to be an integer, but got %r", env_var, os.environ[env_var])
+        return default
+    return max(size, 1)
+
+def _get_pool_name(url):
+    '''
+    Returns the name of the pool for requests to *url*.
+    '''
+    if url is not None and not url.startswith(APISERVER):
+        return STORAGE_POOL
+    return API_POOL
+
+def _new_pool_manager(pool_name, pool_args):
+    if _get_env_var_proxy():
+        proxy_params = _get_proxy_info(_get_env_var_proxy(print_proxy=True))
+        pool_manager = urllib3.ProxyManager(**dict(pool_args, **proxy_params))
+    else:
+        pool_manager = urllib3.PoolManager(**pool_args)
+    pool_manager.pool_classes_by_scheme = {
+        scheme: type(str(pool_class.__name__), (_CountingConnectionPoolMixin, pool_class), {"dx_pool_name": pool_name})
+        for scheme, pool_class in pool_manager.pool_classes_by_scheme.items()
+    }
+    return pool_manager
 
 def _get_proxy_info(url):
     proxy_info = {}
@@ -248,9 +370,9 @@ def _get_env_var_proxy(print_proxy=False):
           file=sys.stderr)
   return proxy
 
-def _get_pool_manager(verify, cert_file, key_file, ssl_context=None):
-    global _pool_manager
-    default_pool_args = dict(maxsize=32,
+def _get_pool_manager(verify, cert_file, key_file, ssl_context=None, pool_name=API_POOL):
+    default_pool_args = dict(maxsize=_get_pool_size(pool_name),
+                             block=os.environ.get('DX_POOL_BLOCK', '0') not in ('', '0'),
                              cert_reqs=ssl.CERT_REQUIRED,
                              headers=_default_headers,
                              timeout=_default_timeout)
@@ -262,14 +384,9 @@ def _get_pool_manager(verify, cert_file, key_file, ssl_context=None):
 
     if cert_file is None and verify is None and 'DX_CA_CERT' not in os.environ:
         with _pool_mutex:
-            if _pool_manager is None:
-                if _get_env_var_proxy():
-                    proxy_params = _get_proxy_info(_get_env_var_proxy(print_proxy=True))
-                    default_pool_args.update(proxy_params)
-                    _pool_manager = urllib3.ProxyManager(**default_pool_args)
-                else:
-                    _pool_manager = urllib3.PoolManager(**default_pool_args)
-            return _pool_manager
+            if pool_name not in _pool_managers:
+                _pool_managers[pool_name] = _new_pool_manager(pool_name, default_pool_args)
+            return _pool_managers[pool_name]
     else:
         # This is the uncommon case, normally, we want to cache the pool
         # manager.
@@ -281,12 +398,7 @@ def _get_pool_manager(verify, cert_file, key_file, ssl_context=None):
         if verify is False or os.environ.get('DX_CA_CERT') == 'NOVERIFY':
             pool_args.update(cert_reqs=ssl.CERT_NONE, ca_certs=None)
             urllib3.disable_warnings()
-        if _get_env_var_proxy():
-            proxy_params = _get_proxy_info(_get_env_var_proxy(print_proxy=True))
-            pool_args.update(proxy_params)
-            return urllib3.ProxyManager(**pool_args)
-        else:
-            return urllib3.PoolManager(**pool_args)
+        return _new_pool_manager(pool_name, pool_args)
 
 
 def _process_method_url_headers(method, url, headers):
@@ -589,6 +701,7 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
 
     retried_responses = []
     _url = None
+    pool_name = API_POOL
     while True:
         success, time_started = True, None
         response = None
@@ -596,6 +709,7 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
         try:
             time_started = time.time()
             _method, _url, _headers = _process_method_url_headers(method, url, headers)
+            pool_name = _get_pool_name(_url)
 
             _debug_print_request(_DEBUG, seq_num, time_started, _method, _url, _headers, jsonify_data, data)
 
@@ -603,7 +717,7 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
 
             # throws BadStatusLine if the server returns nothing
             try:
-                pool_manager = _get_pool_manager(**pool_args)
+                pool_manager = _get_pool_manager(pool_name=pool_name, **pool_args)
 
                 _headers['User-Agent'] = USER_AGENT
                 _headers['DNAnexus-API'] = API_VERSION
@@ -735,7 +849,7 @@ def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
             # Avoid reusing connections in the pool, since they may be
             # in an inconsistent state (observed as "ResponseNotReady"
             # errors).
-            _get_pool_manager(**pool_args).clear()
+            _get_pool_manager(pool_name=pool_name, **pool_args).clear()
             success = False
             exception_msg = _extract_msg_from_last_exception()
             if isinstance(e, _expected_exceptions):
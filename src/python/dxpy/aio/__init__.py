@@ -0,0 +1,357 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Asyncio-native counterpart of :func:`dxpy.DXHTTPRequest` and of the
+wrappers in :mod:`dxpy.api`.
+
+This module requires Python 3.7 or newer and the `aiohttp
+<https://docs.aiohttp.org/>`_ package (``pip install dxpy[aio]``). It
+uses the same API server location, security context, and retry policy
+as the blocking bindings, so that many requests can be kept in flight
+from a single event loop::
+
+    import asyncio
+    from dxpy.aio import api, close_session
+
+    async def describe_files(file_ids):
+        try:
+            return await asyncio.gather(*[api.file_describe(file_id) for file_id in file_ids])
+        finally:
+            await close_session()
+
+    asyncio.run(describe_files(["file-xxxx", "file-yyyy"]))
+
+Requests issued from the same event loop share an
+:class:`aiohttp.ClientSession`, which holds at most
+:data:`MAX_CONNECTIONS` connections; call :func:`close_session` before
+the loop is closed.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, json, time, ssl, asyncio, weakref
+from threading import Lock
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    raise ImportError("dxpy.aio requires the aiohttp package; install it with 'pip install dxpy[aio]'")
+
+import dxpy
+from .. import exceptions, logger, DEFAULT_RETRIES, DEFAULT_TIMEOUT, USER_AGENT, API_VERSION
+
+# Maximum number of simultaneous connections held by the session of
+# each event loop. Takes effect for sessions created after it is set.
+MAX_CONNECTIONS = 256
+
+_expected_exceptions = dxpy._expected_exceptions + (aiohttp.ClientError, asyncio.TimeoutError)
+
+# Sessions are bound to the event loop that created them. Multiple
+# threads (each running its own loop) can ask for a session, so we need
+# to protect access to the mapping.
+_session_mutex = Lock()
+_sessions = weakref.WeakKeyDictionary()
+
+
+def _get_ssl_context(verify=None):
+    '''
+    :param verify: If False, TLS certificates are not verified; if a string, path of the CA bundle to verify against
+    :type verify: boolean, string, or None
+
+    Mirrors the certificate handling of the blocking bindings, including
+    the ``DX_CA_CERT`` and ``DX_USE_OS_CA_BUNDLE`` environment variables.
+    '''
+    ca_certs = verify if isinstance(verify, str) else os.environ.get('DX_CA_CERT')
+    if verify is False or ca_certs == 'NOVERIFY':
+        return False
+    if ca_certs:
+        return ssl.create_default_context(cafile=ca_certs)
+    if 'DX_USE_OS_CA_BUNDLE' in os.environ:
+        return ssl.create_default_context()
+    return ssl.create_default_context(cafile=requests.certs.where())
+
+
+def get_session():
+    '''
+    :returns: The session used for requests made from the running event loop
+    :rtype: :class:`aiohttp.ClientSession`
+
+    Must be called from a coroutine. A new session is created the first
+    time it is called from each event loop (or after the previous one
+    was closed). Proxies set in the ``HTTP_PROXY`` and ``HTTPS_PROXY``
+    environment variables are honored.
+    '''
+    loop = asyncio.get_running_loop()
+    with _session_mutex:
+        session = _sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, ssl=_get_ssl_context())
+            session = aiohttp.ClientSession(connector=connector, trust_env=True)
+            _sessions[loop] = session
+        return session
+
+
+async def close_session():
+    '''
+    Closes the session of the running event loop, if there is one.
+    '''
+    with _session_mutex:
+        session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def _is_retryable_exception(e):
+    """Returns True if the exception is always safe to retry.
+
+    In addition to the errors recognized by
+    :func:`dxpy._is_retryable_exception`, this is True for aiohttp
+    errors raised when a connection to the server could not be
+    established.
+
+    """
+    if isinstance(e, aiohttp.ClientConnectorError):
+        return True
+    return dxpy._is_retryable_exception(e)
+
+
+def _ensure_str(i):
+    if isinstance(i, bytes):
+        i = i.decode('ascii')
+    return i
+
+
+def _raise_for_status(response, content, time_started, req_id):
+    # If an HTTP code that is not in the 200 series is received and the content is JSON, parse it and throw the
+    # appropriate error.  Otherwise, raise the usual exception.
+    if response.headers.get('content-type', '').startswith('application/json'):
+        try:
+            content = json.loads(content.decode('utf-8'))
+        except ValueError:
+            # The JSON is not parsable, but we should be able to retry.
+            raise exceptions.BadJSONInReply("Invalid JSON received from server", response.status)
+        try:
+            error_class = getattr(exceptions, content["error"]["type"], exceptions.DXAPIError)
+        except (KeyError, AttributeError, TypeError):
+            raise exceptions.HTTPErrorWithContent("Appropriate error class not found. [HTTPCode=%s]" % response.status, content)
+        raise error_class(content, response.status, time_started, req_id)
+    else:
+        raise exceptions.HTTPErrorWithContent("{} {} [Time={} RequestID={}]".format(response.status,
+                                                                             response.reason,
+                                                                             time_started,
+                                                                             req_id), content.decode('utf-8').strip())
+
+
+async def DXHTTPRequest(resource, data, method='POST', headers=None, auth=True,
+                        timeout=DEFAULT_TIMEOUT, jsonify_data=True, want_full_response=False,
+                        decode_response_body=True, prepend_srv=True,
+                        max_retries=DEFAULT_RETRIES, always_retry=False,
+                        **kwargs):
+    '''
+    :param resource: API server route, e.g. "/record/new". If *prepend_srv* is False, a fully qualified URL is expected. If this argument is a callable, it will be called just before each request attempt, and expected to return a tuple (URL, headers).
+    :type resource: string
+    :param data: Content of the request body
+    :type data: list or dict, if *jsonify_data* is True; or bytes, otherwise
+    :param headers: Names and values of HTTP headers to submit with the request
+    :type headers: dict
+    :param auth: As in :func:`dxpy.DXHTTPRequest`
+    :type auth: True (default), callable, or None
+    :param timeout: HTTP request timeout, in seconds
+    :type timeout: float
+    :param jsonify_data: If True, *data* is converted from a Python list or dict to a JSON string
+    :type jsonify_data: boolean
+    :param want_full_response: If True, the :class:`aiohttp.ClientResponse` object (whose body has already been read) is returned
+    :type want_full_response: boolean
+    :param decode_response_body: If True (and *want_full_response* is False), the response body is decoded and, if it is a JSON string, deserialized.
+    :type decode_response_body: boolean
+    :param prepend_srv: If True, prepends the API server location to the URL
+    :type prepend_srv: boolean
+    :param max_retries: Maximum number of retries to perform for a request, under the same conditions as :func:`dxpy.DXHTTPRequest`
+    :type max_retries: int
+    :param always_retry: If True, indicates that it is safe to retry a request on failure
+    :type always_retry: boolean
+    :returns: Response from API server in the format indicated by *want_full_response* and *decode_response_body*.
+    :raises: :exc:`exceptions.DXAPIError` or a subclass if the server returned a non-200 status code; :exc:`requests.exceptions.HTTPError` if an invalid response was received from the server; or :exc:`aiohttp.ClientError` if a connection cannot be established.
+
+    Coroutine version of :func:`dxpy.DXHTTPRequest`. Retries are
+    scheduled with :func:`asyncio.sleep`, so a request which is waiting
+    to be retried does not block other requests on the same event loop.
+    Delays between retries (including those requested by the server
+    with a 503 response and a ``Retry-After`` header, which do not count
+    against *max_retries*) are computed as in the blocking version.
+    '''
+    if headers is None:
+        headers = {}
+
+    seq_num = dxpy._get_sequence_number()
+
+    url = dxpy.APISERVER + resource if prepend_srv else resource
+    method = method.upper()  # Convert method name to uppercase, to ease string comparisons later
+
+    if auth is True:
+        auth = dxpy.AUTH_HELPER
+
+    if auth:
+        auth(dxpy._RequestForAuth(method, url, headers))
+
+    if kwargs.get("verify") is not None:
+        kwargs["ssl"] = _get_ssl_context(kwargs.pop("verify"))
+    else:
+        kwargs.pop("verify", None)
+
+    if jsonify_data:
+        serialized_data = json.dumps(data)
+        if 'Content-Type' not in headers and method == 'POST':
+            headers['Content-Type'] = 'application/json'
+    else:
+        serialized_data = data
+
+    rewind_input_buffer_offset = None
+    if hasattr(data, 'seek') and hasattr(data, 'tell'):
+        rewind_input_buffer_offset = data.tell()
+
+    try_index = 0  # excluding 503 errors; cannot exceed (max_retries + 1)
+    try_index_including_503 = 0  # including 503 errors; used for exponential backoff
+
+    _url = None
+    while True:
+        success, time_started = True, None
+        response = None
+        req_id = None
+        try:
+            time_started = time.time()
+            _method, _url, _headers = dxpy._process_method_url_headers(method, url, headers)
+
+            dxpy._debug_print_request(dxpy._DEBUG, seq_num, time_started, _method, _url, _headers, jsonify_data, data)
+
+            _headers['User-Agent'] = USER_AGENT
+            _headers['DNAnexus-API'] = API_VERSION
+            _headers = {_ensure_str(k): _ensure_str(v) for k, v in _headers.items()}
+            for header in ('host', 'content-length', 'Content-Length'):
+                _headers.pop(header, None)
+
+            async with get_session().request(_method, _url, headers=_headers, data=serialized_data,
+                                             timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as response:
+                content = await response.read()
+
+            req_id = response.headers.get("x-request-id", "unavailable")
+
+            if response.status // 100 != 2:
+                _raise_for_status(response, content, time_started, req_id)
+
+            if want_full_response:
+                return response
+
+            # The length of a body with a content-encoding is checked
+            # by aiohttp after decompressing it.
+            if 'content-length' in response.headers and 'content-encoding' not in response.headers:
+                if int(response.headers['content-length']) != len(content):
+                    range_str = (' (%s)' % (headers['Range'],)) if 'Range' in headers else ''
+                    raise exceptions.ContentLengthError(
+                        "Received response with content-length header set to %s but content length is %d%s. [Time=%f RequestID=%s]" %
+                        (response.headers['content-length'], len(content), range_str, time_started, req_id)
+                    )
+
+            response_was_json = False
+
+            if decode_response_body:
+                content = content.decode('utf-8')
+                if response.headers.get('content-type', '').startswith('application/json'):
+                    try:
+                        content = json.loads(content)
+                    except ValueError:
+                        # The JSON is not parsable, but we should be able to retry.
+                        raise exceptions.BadJSONInReply("Invalid JSON received from server", response.status)
+                    else:
+                        response_was_json = True
+
+            req_id = response.headers.get('x-request-id') or "--"
+
+            dxpy._debug_print_response(dxpy._DEBUG, seq_num, time_started, req_id, response.status, response_was_json,
+                                       _method, _url, content)
+
+            return content
+        except Exception as e:
+            success = False
+            exception_msg = dxpy._extract_msg_from_last_exception()
+            if isinstance(e, _expected_exceptions):
+                # Total number of allowed tries is the initial try PLUS
+                # up to (max_retries) subsequent retries.
+                total_allowed_tries = max_retries + 1
+                ok_to_retry = False
+                is_retryable = always_retry or (method == 'GET') or _is_retryable_exception(e)
+                if try_index + 1 < total_allowed_tries:
+                    if (response is None
+                       or isinstance(e, (exceptions.ContentLengthError, exceptions.BadJSONInReply,
+                                         aiohttp.ClientPayloadError, aiohttp.ServerDisconnectedError))):
+                        ok_to_retry = is_retryable
+                    else:
+                        ok_to_retry = 500 <= response.status < 600
+
+                    # The server has closed the connection prematurely
+                    if (response is not None
+                       and response.status == 400 and is_retryable and method == 'PUT'
+                       and isinstance(e, exceptions.HTTPErrorWithContent)
+                       and '<Code>RequestTimeout</Code>' in e.content):
+                        logger.info("Retrying 400 HTTP error, due to slow data transfer. " +
+                                    "Request Time=%f Request ID=%s", time_started, req_id)
+                        ok_to_retry = True
+
+                    # Unprocessable entity, request has semantical errors
+                    if response is not None and response.status == 422:
+                        ok_to_retry = False
+
+                if ok_to_retry:
+                    if rewind_input_buffer_offset is not None:
+                        data.seek(rewind_input_buffer_offset)
+
+                    delay = dxpy._calculate_retry_delay(response, try_index_including_503 + 1)
+
+                    range_str = (' (range=%s)' % (headers['Range'],)) if 'Range' in headers else ''
+                    if response is not None and response.status == 503:
+                        waiting_msg = 'Waiting %d seconds before retry...' % (delay,)
+                    else:
+                        waiting_msg = 'Waiting %d seconds before retry %d of %d...' % (
+                            delay, try_index + 1, max_retries)
+
+                    log_msg = "[%s] %s %s: %s. %s %s" % (time.ctime(), method, _url, exception_msg, waiting_msg, range_str)
+                    if isinstance(e, exceptions.HTTPErrorWithContent):
+                        log_msg += "\n%s" % e.content
+
+                    logger.warning(log_msg)
+                    await asyncio.sleep(delay)
+                    try_index_including_503 += 1
+                    if response is None or response.status != 503:
+                        try_index += 1
+                    continue
+
+            # All retries have been exhausted OR the error is deemed not
+            # retryable. Print the latest error and propagate it back to the caller.
+            if not isinstance(e, exceptions.DXAPIError):
+                log_msg = "[%s] %s %s: %s." % (time.ctime(), method, _url, exception_msg)
+                if isinstance(e, exceptions.HTTPErrorWithContent):
+                    log_msg += "\n%s" % e.content
+                logger.error(log_msg)
+            raise
+        finally:
+            if success and try_index > 0:
+                logger.info("[%s] %s %s: Recovered after %d retries", time.ctime(), method, _url, try_index)
+
+
+from . import api
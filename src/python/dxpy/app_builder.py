@@ -36,18 +36,18 @@ the effective destination project.
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import os, sys, json, subprocess, tempfile, multiprocessing
+import os, sys, json, subprocess, multiprocessing
+import collections
 import datetime
-import gzip
 import hashlib
-import io
 import tarfile
 import stat
+import zlib
 
 import dxpy
 import dxpy.executable_builder
 from . import logger
-from .utils import merge
+from .utils import merge, get_futures_threadpool
 from .utils.printing import fill
 from .compat import input
 from .cli import INTERACTIVE_CLI
@@ -192,6 +192,185 @@ def _fix_perm_filter(tar_obj):
     return tar_obj
 
 
+RESOURCES_COMPRESSION_BLOCK_SIZE = 1024*1024*4
+
+
+def _scan_resources_dir(resources_dir, force_symlinks=False, worker_resources_subpath=""):
+    """
+    :param resources_dir: Directory with resources to be archived
+    :type resources_dir: str
+    :returns: The checksum of the directory, and the (path, name in the archive, recursive) triples to add to the tarball, in order
+    :rtype: tuple
+
+    Walks *resources_dir* without reading any file. The input to the
+    SHA1 contains entries of the form (whitespace only included here for
+    readability):
+
+      / \\0 MODE \\0 MTIME \\0
+      /foo \\0 MODE \\0 MTIME \\0
+      ...
+
+    where there is one entry for each directory or file (order is
+    specified below), followed by a numeric representation of the
+    mode, and the mtime in milliseconds since the epoch.
+
+    Note when looking at a link, if the link is to be dereferenced, the
+    mtime and mode used are that of the target (using os.stat()). If the
+    link is to be kept as a link, the mtime and mode are those of the
+    link itself (using os.lstat()).
+    """
+    output_sha1 = hashlib.sha1()
+    tar_entries = []
+
+    for dirname, subdirs, files in os.walk(resources_dir):
+        if not dirname.startswith(resources_dir):
+            raise AssertionError('Expected %r to start with root directory %r' % (dirname, resources_dir))
+
+        # Add an entry for the directory itself
+        relative_dirname = dirname[len(resources_dir):]
+        dir_stat = os.lstat(dirname)
+        if not relative_dirname.startswith('/'):
+            relative_dirname = '/' + relative_dirname
+
+        fields = [relative_dirname, str(_fix_perms(dir_stat.st_mode)), str(int(dir_stat.st_mtime * 1000))]
+        output_sha1.update(b''.join(s.encode('utf-8') + b'\0' for s in fields))
+
+        # add an entry in the tar file for the current directory, but
+        # do not recurse!
+        tar_entries.append((dirname, worker_resources_subpath + relative_dirname, False))
+        # Canonicalize the order of subdirectories; this is the order in
+        # which they will be visited by os.walk
+        subdirs.sort()
+
+        # check the subdirectories for symlinks.  We should throw an error
+        # if there are any links that point outside of the directory (unless
+        # --force-symlinks is given).  If a link is pointing internal to
+        # the directory (or --force-symlinks is given), we should add it
+        # as a file.
+        for subdir_name in subdirs:
+            dir_path = os.path.join(dirname, subdir_name)
+
+            # If we do have a symlink,
+            if os.path.islink(dir_path):
+                # Let's get the pointed-to path to ensure that it is
+                # still in the directory
+                link_target = os.readlink(dir_path)
+
+                # If this is a local link, add it to the list of files (case 1)
+                # else raise an error
+                if force_symlinks or is_link_local(link_target):
+                    files.append(subdir_name)
+                else:
+                    raise AppBuilderException("Cannot include symlinks to directories outside of the resource directory.  '%s' points to directory '%s'" % (dir_path, os.path.realpath(dir_path)))
+
+
+        # Canonicalize the order of files so that we compute the
+        # checksum in a consistent order
+        for filename in sorted(files):
+            deref_link = False
+
+            relative_filename = os.path.join(relative_dirname, filename)
+            true_filename = os.path.join(dirname, filename)
+
+            file_stat = os.lstat(true_filename)
+            # check for a link here, please!
+            if os.path.islink(true_filename):
+
+                # Get the pointed-to path
+                link_target = os.readlink(true_filename)
+
+                if not (force_symlinks or is_link_local(link_target)):
+                    # if we are pointing outside of the directory, then:
+                    # try to get the true stat of the file and make sure
+                    # to dereference the link!
+                    try:
+                        file_stat = os.stat(os.path.join(dirname, link_target))
+                        deref_link = True
+                    except OSError:
+                        # uh-oh! looks like we have a broken link!
+                        # since this is guaranteed to cause problems (and
+                        # we know we're not forcing symlinks here), we
+                        # should throw an error
+                        raise AppBuilderException("Broken symlink: Link '%s' points to '%s', which does not exist" % (true_filename, os.path.realpath(true_filename)) )
+
+
+            fields = [relative_filename, str(_fix_perms(file_stat.st_mode)), str(int(file_stat.st_mtime * 1000))]
+            output_sha1.update(b''.join(s.encode('utf-8') + b'\0' for s in fields))
+
+            # If we are to dereference, use the target fn
+            if deref_link:
+                true_filename = os.path.realpath(true_filename)
+            tar_entries.append((true_filename, worker_resources_subpath + relative_filename, True))
+        # end for filename in sorted(files)
+
+    return output_sha1.hexdigest(), tar_entries
+
+
+def _gzip_block(data, compresslevel):
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class _TeeWriter(object):
+    """
+    Write-only file-like object which writes the same data to all of
+    *fileobjs*.
+    """
+    def __init__(self, fileobjs):
+        self._fileobjs = fileobjs
+
+    def write(self, data):
+        for fileobj in self._fileobjs:
+            fileobj.write(data)
+
+
+class _ParallelGzipWriter(object):
+    """
+    :param fileobj: File-like object to which the compressed data is written
+    :param block_size: Number of uncompressed bytes compressed at a time
+    :type block_size: int
+
+    Write-only file-like object which compresses blocks of the data
+    written to it on all cores, and writes the compressed blocks to
+    *fileobj* in order. Each block is a complete gzip member; a series of
+    gzip members (as written by pigz) is itself a valid gzip file.
+    """
+    def __init__(self, fileobj, block_size=RESOURCES_COMPRESSION_BLOCK_SIZE, compresslevel=9, max_workers=NUM_CORES):
+        self._fileobj = fileobj
+        self._block_size = block_size
+        self._compresslevel = compresslevel
+        self._chunks = []
+        self._chunks_size = 0
+        self._num_blocks = 0
+        # Bounds the memory used by blocks which have not been written yet
+        self._max_pending = 2 * max_workers
+        self._pending = collections.deque()
+        self._threadpool = get_futures_threadpool(max_workers=max_workers)
+
+    def _submit_block(self):
+        data = b"".join(self._chunks)
+        self._chunks, self._chunks_size = [], 0
+        self._pending.append(self._threadpool.submit(_gzip_block, data, self._compresslevel))
+        self._num_blocks += 1
+        while len(self._pending) > self._max_pending:
+            self._fileobj.write(self._pending.popleft().result())
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._chunks_size += len(data)
+        if self._chunks_size >= self._block_size:
+            self._submit_block()
+
+    def close(self):
+        try:
+            if self._chunks or self._num_blocks == 0:
+                self._submit_block()
+            while self._pending:
+                self._fileobj.write(self._pending.popleft().result())
+        finally:
+            self._threadpool.shutdown(wait=False)
+
+
 def upload_resources(src_dir, project=None, folder='/', ensure_upload=False, force_symlinks=False, brief=False, resources_dir=None, worker_resources_subpath=""):
     """
     :param ensure_upload: If True, will bypass checksum of resources directory
@@ -222,212 +401,124 @@ def upload_resources(src_dir, project=None, folder='/', ensure_upload=False, for
     the form expected by the ``bundledDepends`` field of a run
     specification. Returns an empty list, if no archive was created.
     """
+    return upload_resources_to_regions(src_dir, {None: project}, folder=folder, ensure_upload=ensure_upload,
+                                       force_symlinks=force_symlinks, brief=brief, resources_dir=resources_dir,
+                                       worker_resources_subpath=worker_resources_subpath)[None]
+
+
+def upload_resources_to_regions(src_dir, projects_by_region, folder='/', ensure_upload=False, force_symlinks=False,
+                                brief=False, resources_dir=None, worker_resources_subpath=""):
+    """
+    :param projects_by_region: Project to upload the resources bundle to (None to use whatever is specified in dxapp.json), by region
+    :type projects_by_region: dict
+    :returns: The list returned by :func:`upload_resources`, by region
+    :rtype: dict
+
+    Same as :func:`upload_resources`, for several projects at once. The
+    resources directory is checksummed, archived, and compressed once;
+    the bundle is looked for in all projects concurrently, and uploaded
+    to all projects which do not have it at the same time.
+    """
     if not resources_dir:
         resources_dir = os.path.join(src_dir, "resources")
 
     applet_spec = _get_applet_spec(src_dir)
 
-    if project is None:
-        dest_project = applet_spec['project']
+    if not (os.path.exists(resources_dir) and len(os.listdir(resources_dir)) > 0):
+        return dict((region, []) for region in projects_by_region)
+
+    dest_projects = dict((region, applet_spec['project'] if project is None else project)
+                         for region, project in projects_by_region.items())
+    target_folder = applet_spec['folder'] if 'folder' in applet_spec else folder
+
+    # Look for a resource bundle with the same contents, and reuse it
+    # if possible. The resource bundle carries a property
+    # 'resource_bundle_checksum' that indicates the checksum; the way
+    # in which the checksum is computed is given in the documentation
+    # of _scan_resources_dir. The checksum only depends on metadata,
+    # so no file is read unless the bundle has to be uploaded.
+    directory_checksum, tar_entries = _scan_resources_dir(resources_dir, force_symlinks=force_symlinks,
+                                                          worker_resources_subpath=worker_resources_subpath)
+
+    if ensure_upload:
+        properties_dict = {}
+        archives_by_region = {}
     else:
-        dest_project = project
-        applet_spec['project'] = project
-
-    if os.path.exists(resources_dir) and len(os.listdir(resources_dir)) > 0:
-        target_folder = applet_spec['folder'] if 'folder' in applet_spec else folder
-
-        # While creating the resource bundle, optimistically look for a
-        # resource bundle with the same contents, and reuse it if possible.
-        # The resource bundle carries a property 'resource_bundle_checksum'
-        # that indicates the checksum; the way in which the checksum is
-        # computed is given below.   If the checksum matches  (and
-        # ensure_upload is False), then we will use the existing file,
-        # otherwise, we will compress and upload the tarball.
-
-
-        # The input to the SHA1 contains entries of the form (whitespace
-        # only included here for readability):
-        #
-        # / \0 MODE \0 MTIME \0
-        # /foo \0 MODE \0 MTIME \0
-        # ...
-        #
-        # where there is one entry for each directory or file (order is
-        # specified below), followed by a numeric representation of the
-        # mode, and the mtime in milliseconds since the epoch.
-        #
-        # Note when looking at a link, if the link is to be dereferenced,
-        # the mtime and mode used are that of the target (using os.stat())
-        # If the link is to be kept as a link, the mtime and mode are those
-        # of the link itself (using os.lstat())
-
-        with tempfile.NamedTemporaryFile(suffix=".tar") as tar_tmp_fh:
-
-            output_sha1 = hashlib.sha1()
-            tar_fh = tarfile.open(fileobj=tar_tmp_fh, mode='w')
-
-            for dirname, subdirs, files in os.walk(resources_dir):
-                if not dirname.startswith(resources_dir):
-                    raise AssertionError('Expected %r to start with root directory %r' % (dirname, resources_dir))
-
-                # Add an entry for the directory itself
-                relative_dirname = dirname[len(resources_dir):]
-                dir_stat = os.lstat(dirname)
-                if not relative_dirname.startswith('/'):
-                    relative_dirname = '/' + relative_dirname
-
-                fields = [relative_dirname, str(_fix_perms(dir_stat.st_mode)), str(int(dir_stat.st_mtime * 1000))]
-                output_sha1.update(b''.join(s.encode('utf-8') + b'\0' for s in fields))
-
-                # add an entry in the tar file for the current directory, but
-                # do not recurse!
-                tar_fh.add(dirname, arcname=worker_resources_subpath + relative_dirname, recursive=False, filter=_fix_perm_filter)
-                # Canonicalize the order of subdirectories; this is the order in
-                # which they will be visited by os.walk
-                subdirs.sort()
-
-                # check the subdirectories for symlinks.  We should throw an error
-                # if there are any links that point outside of the directory (unless
-                # --force-symlinks is given).  If a link is pointing internal to
-                # the directory (or --force-symlinks is given), we should add it
-                # as a file.
-                for subdir_name in subdirs:
-                    dir_path = os.path.join(dirname, subdir_name)
-
-                    # If we do have a symlink,
-                    if os.path.islink(dir_path):
-                        # Let's get the pointed-to path to ensure that it is
-                        # still in the directory
-                        link_target = os.readlink(dir_path)
-
-                        # If this is a local link, add it to the list of files (case 1)
-                        # else raise an error
-                        if force_symlinks or is_link_local(link_target):
-                            files.append(subdir_name)
-                        else:
-                            raise AppBuilderException("Cannot include symlinks to directories outside of the resource directory.  '%s' points to directory '%s'" % (dir_path, os.path.realpath(dir_path)))
-
-
-                # Canonicalize the order of files so that we compute the
-                # checksum in a consistent order
-                for filename in sorted(files):
-                    deref_link = False
-
-                    relative_filename = os.path.join(relative_dirname, filename)
-                    true_filename = os.path.join(dirname, filename)
-
-                    file_stat = os.lstat(true_filename)
-                    # check for a link here, please!
-                    if os.path.islink(true_filename):
-
-                        # Get the pointed-to path
-                        link_target = os.readlink(true_filename)
-
-                        if not (force_symlinks or is_link_local(link_target)):
-                            # if we are pointing outside of the directory, then:
-                            # try to get the true stat of the file and make sure
-                            # to dereference the link!
-                            try:
-                                file_stat = os.stat(os.path.join(dirname, link_target))
-                                deref_link = True
-                            except OSError:
-                                # uh-oh! looks like we have a broken link!
-                                # since this is guaranteed to cause problems (and
-                                # we know we're not forcing symlinks here), we
-                                # should throw an error
-                                raise AppBuilderException("Broken symlink: Link '%s' points to '%s', which does not exist" % (true_filename, os.path.realpath(true_filename)) )
-
-
-                    fields = [relative_filename, str(_fix_perms(file_stat.st_mode)), str(int(file_stat.st_mtime * 1000))]
-                    output_sha1.update(b''.join(s.encode('utf-8') + b'\0' for s in fields))
-
-                    # If we are to dereference, use the target fn
-                    if deref_link:
-                        true_filename = os.path.realpath(true_filename)
-                    tar_fh.add(true_filename, arcname=worker_resources_subpath + relative_filename, filter=_fix_perm_filter)
-                # end for filename in sorted(files)
-
-            # end for dirname, subdirs, files in os.walk(resources_dir):
-
-            # at this point, the tar is complete, so close the tar_fh
-            tar_fh.close()
-
-            # Optimistically look for a resource bundle with the same
-            # contents, and reuse it if possible. The resource bundle
-            # carries a property 'resource_bundle_checksum' that indicates
-            # the checksum; the way in which the checksum is computed is
-            # given in the documentation of _directory_checksum.
-
-            if ensure_upload:
-                properties_dict = {}
-                existing_resources = False
-            else:
-                directory_checksum = output_sha1.hexdigest()
-                properties_dict = dict(resource_bundle_checksum=directory_checksum)
-                existing_resources = dxpy.find_one_data_object(
-                    project=dest_project,
-                    folder=target_folder,
-                    properties=dict(resource_bundle_checksum=directory_checksum),
-                    visibility='either',
-                    zero_ok=True,
-                    state='closed',
-                    return_handler=True
-                )
-
+        properties_dict = dict(resource_bundle_checksum=directory_checksum)
+
+        def find_existing_resources(region, dest_project):
+            return dxpy.find_one_data_object(
+                project=dest_project,
+                folder=target_folder,
+                properties=dict(resource_bundle_checksum=directory_checksum),
+                visibility='either',
+                zero_ok=True,
+                state='closed',
+                return_handler=True
+            )
+
+        archives_by_region, error = dxpy.executable_builder.run_in_regions(find_existing_resources, dest_projects)
+        if error is not None:
+            raise error
+        for region, existing_resources in list(archives_by_region.items()):
             if existing_resources:
                 if not brief:
                     logger.info("Found existing resource bundle that matches local resources directory: " +
                                 existing_resources.get_id())
-
-                dx_resource_archive = existing_resources
             else:
+                del archives_by_region[region]
 
-                logger.debug("Uploading in " + src_dir)
-                # We need to compress the tar that we've created
-
+    regions_to_upload = [region for region in dest_projects if region not in archives_by_region]
+    if regions_to_upload:
+        logger.debug("Uploading in " + src_dir)
 
-                targz_fh = tempfile.NamedTemporaryFile(suffix=".tar.gz", delete=False)
-
-                # compress the file by reading the tar file and passing
-                # it though a GzipFile object, writing the given
-                # block size (by default 8192 bytes) at a time
-                targz_gzf = gzip.GzipFile(fileobj=targz_fh, mode='wb')
-                tar_tmp_fh.seek(0)
-                dat = tar_tmp_fh.read(io.DEFAULT_BUFFER_SIZE)
-                while dat:
-                    targz_gzf.write(dat)
-                    dat = tar_tmp_fh.read(io.DEFAULT_BUFFER_SIZE)
-
-                targz_gzf.flush()
-                targz_gzf.close()
-                targz_fh.close()
-
-                if 'folder' in applet_spec:
-                    try:
-                        dxpy.get_handler(dest_project).new_folder(applet_spec['folder'], parents=True)
-                    except dxpy.exceptions.DXAPIError:
-                        pass # TODO: make this better
-
-                dx_resource_archive = dxpy.upload_local_file(
-                    targz_fh.name,
-                    wait_on_close=True,
-                    project=dest_project,
-                    folder=target_folder,
-                    hidden=True,
-                    properties=properties_dict
-                )
-
-                os.unlink(targz_fh.name)
-
-                # end compressed file creation and upload
-
-            archive_link = dxpy.dxlink(dx_resource_archive.get_id())
-
-        # end tempfile.NamedTemporaryFile(suffix=".tar") as tar_fh
-
-        return [{'name': 'resources.tar.gz', 'id': archive_link}]
-    else:
-        return []
+        def new_resources_file(region, dest_project):
+            if 'folder' in applet_spec:
+                try:
+                    dxpy.get_handler(dest_project).new_folder(applet_spec['folder'], parents=True)
+                except dxpy.exceptions.DXAPIError:
+                    pass # TODO: make this better
+            return dxpy.new_dxfile(
+                name='resources.tar.gz',
+                project=dest_project,
+                folder=target_folder,
+                hidden=True,
+                properties=properties_dict
+            )
+
+        def close_resources_file(region, dx_resource_archive):
+            dx_resource_archive.close(block=True)
+
+        new_archives_by_region, error = dxpy.executable_builder.run_in_regions(
+            new_resources_file, dict((region, dest_projects[region]) for region in regions_to_upload))
+        try:
+            if error is not None:
+                raise error
+            # The tarball is compressed as it is written, and the
+            # compressed data is uploaded to all projects as it is
+            # produced, so no temporary file is needed
+            targz_fh = _ParallelGzipWriter(_TeeWriter(list(new_archives_by_region.values())))
+            tar_fh = tarfile.open(fileobj=targz_fh, mode='w|')
+            for filename, arcname, recursive in tar_entries:
+                tar_fh.add(filename, arcname=arcname, recursive=recursive, filter=_fix_perm_filter)
+            tar_fh.close()
+            targz_fh.close()
+            _, error = dxpy.executable_builder.run_in_regions(close_resources_file, new_archives_by_region)
+            if error is not None:
+                raise error
+        except:
+            for region, dx_resource_archive in new_archives_by_region.items():
+                try:
+                    dxpy.api.project_remove_objects(dest_projects[region],
+                                                    {"objects": [dx_resource_archive.get_id()]})
+                except Exception as e:
+                    logger.debug("Unable to remove incomplete resource bundle %s: %s",
+                                 dx_resource_archive.get_id(), e)
+            raise
+        archives_by_region.update(new_archives_by_region)
+
+    return dict((region, [{'name': 'resources.tar.gz', 'id': dxpy.dxlink(archives_by_region[region].get_id())}])
+                for region in dest_projects)
 
 
 def upload_applet(src_dir, uploaded_resources, check_name_collisions=True, overwrite=False, archive=False,
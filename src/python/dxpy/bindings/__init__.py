@@ -25,6 +25,7 @@ from __future__ import print_function, unicode_literals, division, absolute_impo
 import time, copy, re
 
 import dxpy.api
+from ..utils import describe_cache
 from ..exceptions import (DXError, DXAPIError, DXFileError, DXSearchError, DXAppletError,
                           DXJobFailureError, AppError, AppInternalError, DXCLIError)
 from ..compat import basestring
@@ -350,6 +351,10 @@ class DXDataObject(DXObject):
         tags) are obtained from the copy of the object in the project
         associated with the handler, if possible.
 
+        If the environment variable ``DX_DESCRIBE_CACHE`` is set, the
+        description may be served from the local describe cache (see
+        :mod:`dxpy.utils.describe_cache`).
+
         """
 
         if self._dxid is None:
@@ -373,7 +378,12 @@ class DXDataObject(DXObject):
         if self._proj is not None:
             describe_input["project"] = self._proj
 
-        self._desc = self._describe(self._dxid, describe_input, **kwargs)
+        cache = describe_cache.get_describe_cache()
+        if cache is not None:
+            self._desc = cache.describe(self._dxid, describe_input,
+                                        lambda _input: self._describe(self._dxid, _input, **kwargs))
+        else:
+            self._desc = self._describe(self._dxid, describe_input, **kwargs)
 
         return self._desc
 
@@ -435,7 +445,9 @@ class DXDataObject(DXObject):
 
         """
 
-        return self._set_visibility(self._dxid, {"hidden": True}, **kwargs)
+        resp = self._set_visibility(self._dxid, {"hidden": True}, **kwargs)
+        describe_cache.invalidate(self._dxid)
+        return resp
 
     def unhide(self, **kwargs):
         """
@@ -445,7 +457,9 @@ class DXDataObject(DXObject):
 
         """
 
-        return self._set_visibility(self._dxid, {"hidden": False}, **kwargs)
+        resp = self._set_visibility(self._dxid, {"hidden": False}, **kwargs)
+        describe_cache.invalidate(self._dxid)
+        return resp
 
     def rename(self, name, **kwargs):
         """
@@ -459,8 +473,10 @@ class DXDataObject(DXObject):
 
         """
 
-        return self._rename(self._dxid, {"project": self._proj,
+        resp = self._rename(self._dxid, {"project": self._proj,
                                          "name": name}, **kwargs)
+        describe_cache.invalidate(self._dxid)
+        return resp
 
     def get_properties(self, **kwargs):
         """
@@ -505,6 +521,7 @@ class DXDataObject(DXObject):
         self._set_properties(self._dxid, {"project": self._proj,
                                           "properties": properties},
                              **kwargs)
+        describe_cache.invalidate(self._dxid)
 
     def add_tags(self, tags, **kwargs):
         """
@@ -521,6 +538,7 @@ class DXDataObject(DXObject):
 
         self._add_tags(self._dxid, {"project": self._proj, "tags": tags},
                        **kwargs)
+        describe_cache.invalidate(self._dxid)
 
     def remove_tags(self, tags, **kwargs):
         """
@@ -537,6 +555,7 @@ class DXDataObject(DXObject):
 
         self._remove_tags(self._dxid, {"project": self._proj, "tags": tags},
                           **kwargs)
+        describe_cache.invalidate(self._dxid)
 
     def close(self, **kwargs):
         """
@@ -571,6 +590,7 @@ class DXDataObject(DXObject):
 
         dxpy.api.project_remove_objects(self._proj, {"objects": [self._dxid]},
                                         **kwargs)
+        describe_cache.invalidate(self._dxid)
 
         # Reset internal state
         self._dxid = None
@@ -593,6 +613,7 @@ class DXDataObject(DXObject):
         dxpy.api.project_move(self._proj, {"objects": [self._dxid],
                                            "destination": folder},
                               **kwargs)
+        describe_cache.invalidate(self._dxid)
 
 
     def clone(self, project, folder="/", **kwargs):
@@ -683,18 +704,18 @@ from .dxfile import DXFile, DXFILE_HTTP_THREADS, DEFAULT_BUFFER_SIZE
 from .dxdatabase import DXDatabase, DXFILE_HTTP_THREADS, DEFAULT_BUFFER_SIZE
 from .download_all_inputs import download_all_inputs
 from .mount_all_inputs import mount_all_inputs
-from .dxfile_functions import open_dxfile, new_dxfile, download_dxfile, upload_local_file, upload_string, list_subfolders, download_folder
+from .dxfile_functions import open_dxfile, new_dxfile, download_dxfile, download_dxfiles, upload_local_file, upload_local_files, upload_string, list_subfolders, download_folder
 from .dxdatabase_functions import download_dxdatabasefile
 from .dxrecord import DXRecord, new_dxrecord
 from .dxproject import DXContainer, DXProject
-from .dxjob import DXJob, new_dxjob
+from .dxjob import DXJob, new_dxjob, wait_on_many
 from .dxanalysis import DXAnalysis
 from .dxapplet import DXExecutable, DXApplet
 from .dxapp import DXApp
 from .dxglobalworkflow import DXGlobalWorkflow
 from .dxworkflow import DXWorkflow, new_dxworkflow
 from .auth import user_info, whoami
-from .dxdataobject_functions import dxlink, is_dxlink, get_dxlink_ids, get_handler, describe, get_details, remove
+from .dxdataobject_functions import dxlink, is_dxlink, get_dxlink_ids, get_handler, describe, bulk_describe, get_details, remove
 from .search import (find_data_objects, find_executions, find_jobs, find_analyses, find_projects, find_apps, find_global_workflows,
                      find_one_data_object, find_one_project, find_one_app, resolve_data_objects, find_orgs,
                      org_find_members, org_find_projects, org_find_apps)
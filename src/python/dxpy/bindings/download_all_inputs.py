@@ -15,11 +15,9 @@
 #   under the License.
 
 from __future__ import print_function
-import concurrent.futures
 import os
 import sys
 import multiprocessing
-import psutil
 
 import dxpy
 from dxpy.utils import file_load_utils
@@ -41,36 +39,53 @@ def _create_dirs(idir, dirs):
     for d in dirs:
         file_load_utils.ensure_dir(os.path.join(idir, d))
 
-def _download_one_file(file_rec, idir):
+def _describe_files(to_download):
+    '''
+    Describe all the files to be downloaded, using as few API calls as
+    possible, so that each download can skip its own describe call.
+    The descriptions from the input manifest are used when available.
+    Returns a dict mapping file IDs to their descriptions.
+    '''
+    file_descs = {file_rec['src_file_id']: file_rec['src_file_desc'] for file_rec in to_download
+                  if file_rec.get('src_file_desc') is not None}
+    file_ids = [file_rec['src_file_id'] for file_rec in to_download if file_rec['src_file_id'] not in file_descs]
+    if file_ids:
+        descs = dxpy.bulk_describe(file_ids, fields={"parts"}, default_fields=True, project=dxpy.WORKSPACE_ID)
+        file_descs.update({file_id: desc for file_id, desc in zip(file_ids, descs) if desc is not None})
+    return file_descs
+
+def _download_one_file(file_rec, idir, describe_output=None):
     src_file = file_rec['src_file_id']
     trg_file = os.path.join(idir, file_rec['trg_fname'])
     print("downloading file: " + src_file + " to filesystem: " + trg_file)
     sys.stdout.flush()
-    dxpy.download_dxfile(src_file, trg_file)
+    dxpy.download_dxfile(src_file, trg_file, describe_output=describe_output)
     return file_rec
 
 # Download the files sequentially
 #   to_download: list of tuples describing files to download
-def _sequential_file_download(to_download, idir):
+#   file_descs: dict of file descriptions, by file ID
+def _sequential_file_download(to_download, idir, file_descs):
     for file_rec in to_download:
-        _download_one_file(file_rec, idir)
+        _download_one_file(file_rec, idir, file_descs.get(file_rec['src_file_id']))
 
-# Download files in parallel
+# Download files in parallel. The chunks of all files are scheduled
+# together, with at most max_num_parallel_downloads buffers' worth of
+# data in memory at a time.
 #   to_download: list of tuples describing files to download
-def _parallel_file_download(to_download, idir, max_num_parallel_downloads):
+#   file_descs: dict of file descriptions, by file ID
+def _parallel_file_download(to_download, idir, max_num_parallel_downloads, file_descs):
+    def file_downloads():
+        for file_rec in to_download:
+            src_file = file_rec['src_file_id']
+            trg_file = os.path.join(idir, file_rec['trg_fname'])
+            print("downloading file: " + src_file + " to filesystem: " + trg_file)
+            sys.stdout.flush()
+            yield dict(dxid=src_file, filename=trg_file, describe_output=file_descs.get(src_file))
+
     try:
-        with concurrent.futures.ThreadPoolExecutor(
-                max_workers=max_num_parallel_downloads) as executor:
-            future_files = {executor.submit(_download_one_file, file_rec, idir): file_rec
-                            for file_rec in to_download}
-            for future in concurrent.futures.as_completed(future_files):
-                file_rec = future_files[future]
-                try:
-                    future.result()
-                except Exception:
-                    sys.stderr.write('%r -> %s generated an exception' %
-                                     (file_rec['src_file_id'], file_rec['trg_fname']))
-                    raise
+        dxpy.download_dxfiles(file_downloads(),
+                              max_bytes_in_flight=max_num_parallel_downloads * dxpy.bindings.dxfile.DEFAULT_BUFFER_SIZE)
     except KeyboardInterrupt:
         # Call os._exit() in case of KeyboardInterrupt. Otherwise, the atexit registered handler in
         # concurrent.futures.thread will run, and issue blocking join() on all worker threads,
@@ -191,15 +206,19 @@ def download_all_inputs(exclude=None, parallel=False, max_threads=8):
     for ival_list in inputs.values():
         to_download.extend(ival_list)
 
+    # Describe all the files up front, in bulk
+    file_descs = _describe_files(to_download)
+
     # Download the files
     if parallel:
+        import psutil
         total_mem = psutil.virtual_memory().total >> 20  # Total RAM in MB
         num_cores = multiprocessing.cpu_count()
         max_num_parallel_downloads = _get_num_parallel_threads(max_threads, num_cores, total_mem)
         sys.stderr.write("Downloading files using {} threads".format(max_num_parallel_downloads))
-        _parallel_file_download(to_download, idir, max_num_parallel_downloads)
+        _parallel_file_download(to_download, idir, max_num_parallel_downloads, file_descs)
     else:
-        _sequential_file_download(to_download, idir)
+        _sequential_file_download(to_download, idir, file_descs)
 
     helper_vars = _gen_helper_dict(inputs)
     return helper_vars
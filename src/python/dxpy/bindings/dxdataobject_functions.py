@@ -28,11 +28,24 @@ full object handler.
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+from threading import Lock
+
 import dxpy
 from . import DXDataObject
 from . import __dict__ as all_bindings
 from ..exceptions import DXError
 from ..compat import basestring
+from ..utils import response_iterator, get_futures_threadpool
+
+# Maximum number of objects the API server accepts in a single
+# /system/describeDataObjects call
+DESCRIBE_DATA_OBJECTS_BATCH_SIZE = 1000
+BULK_DESCRIBE_THREADS = 4
+
+# Multiple threads can ask for the pool, so we need to protect the
+# initialization.
+_bulk_describe_threadpool_mutex = Lock()
+_bulk_describe_threadpool = None
 
 def dxlink(object_id, project_id=None, field=None):
     '''
@@ -228,6 +241,83 @@ def describe(id_or_link, **kwargs):
         data_object_descriptions = dxpy.api.system_describe_data_objects(bulk_describe_input)
         return [desc['describe'] for desc in data_object_descriptions['results']]
 
+def _get_bulk_describe_threadpool():
+    global _bulk_describe_threadpool
+    with _bulk_describe_threadpool_mutex:
+        if _bulk_describe_threadpool is None:
+            _bulk_describe_threadpool = get_futures_threadpool(max_workers=BULK_DESCRIBE_THREADS)
+        return _bulk_describe_threadpool
+
+def bulk_describe(ids_or_links, fields=None, default_fields=None, project=None, describe=None,
+                  batch_size=DESCRIBE_DATA_OBJECTS_BATCH_SIZE, max_active_batches=BULK_DESCRIBE_THREADS, **kwargs):
+    '''
+    :param ids_or_links: Object IDs, or dicts containing DXLinks (possibly with a project)
+    :type ids_or_links: iterable
+    :param fields: set of fields to include in each description; as in :meth:`~dxpy.bindings.DXDataObject.describe`
+    :type fields: set or sequence of str
+    :param default_fields: if True, include the default fields in addition to *fields*; as in :meth:`~dxpy.bindings.DXDataObject.describe`
+    :type default_fields: bool
+    :param project: Project ID in which to look for objects whose link does not specify a project
+    :type project: string
+    :param describe: Additional describe input (e.g. ``{"details": True}``), merged into the input of each object
+    :type describe: dict
+    :param batch_size: Maximum number of objects described per API call
+    :type batch_size: int
+    :param max_active_batches: Maximum number of API calls in flight at any time
+    :type max_active_batches: int
+    :returns: Generator of descriptions, in the order of *ids_or_links*; None for objects that could not be described
+    :rtype: generator of dict or None
+
+    Describes many data objects with as few
+    :meth:`~dxpy.api.system_describe_data_objects` calls as possible.
+    The objects are split into batches of at most *batch_size*, which
+    are described concurrently, and the descriptions are yielded as the
+    batches complete.
+
+    Example::
+
+        for desc in bulk_describe(file_ids, fields={"name", "size"}):
+            print(desc["name"], desc["size"])
+
+    '''
+    if fields is not None and (describe or {}).get('fields') is not None:
+        raise ValueError('Cannot specify fields both as an argument and in the describe input')
+
+    describe_input = dict(describe or {})
+    if default_fields is not None:
+        describe_input['defaultFields'] = default_fields
+    if fields is not None:
+        describe_input['fields'] = {field_name: True for field_name in fields}
+
+    def get_object_input(id_or_link):
+        object_input = {'id': id_or_link, 'describe': describe_input or True}
+        if is_dxlink(id_or_link):
+            object_input['id'], object_project = get_dxlink_ids(id_or_link)
+            if object_project is not None:
+                object_input['project'] = object_project
+        if project is not None and 'project' not in object_input:
+            object_input['project'] = project
+        return object_input
+
+    def describe_batch(objects):
+        results = dxpy.api.system_describe_data_objects({'objects': objects}, **kwargs)['results']
+        return [result.get('describe') for result in results]
+
+    def batch_requests():
+        batch = []
+        for id_or_link in ids_or_links:
+            batch.append(get_object_input(id_or_link))
+            if len(batch) == batch_size:
+                yield describe_batch, [batch], {}
+                batch = []
+        if batch:
+            yield describe_batch, [batch], {}
+
+    for descriptions in response_iterator(batch_requests(), _get_bulk_describe_threadpool(),
+                                          max_active_tasks=max_active_batches, do_first_task_sequentially=False):
+        for desc in descriptions:
+            yield desc
+
 def get_details(id_or_link, **kwargs):
     '''
     :param id_or_link: String containing an object ID or dict containing a DXLink
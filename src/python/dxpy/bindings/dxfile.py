@@ -23,7 +23,8 @@ This remote file handler is a Python file-like object.
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import os, sys, logging, traceback, hashlib, copy, time
+import os, sys, io, logging, traceback, hashlib, copy, time
+import collections
 import math
 import mmap
 from threading import Lock
@@ -48,6 +49,13 @@ if dxpy.JOB_ID:
 MD5_READ_CHUNK_SIZE = 1024*1024*4
 FILE_REQUEST_TIMEOUT = 60
 
+# Read-ahead for sequential reads (see _ReadAheadController)
+READ_AHEAD_MIN_CHUNK_SIZE = 1024*64
+READ_AHEAD_INITIAL_REQUESTS = 4
+# Requests taking about this long (in seconds) amortize their latency
+# without holding up the reader for long
+READ_AHEAD_TARGET_REQUEST_TIME = 0.5
+
 
 def _validate_headers(headers):
     for key, value in headers.items():
@@ -128,6 +136,153 @@ def _get_write_buf_size(buffer_size_hint, file_upload_params, expected_file_size
     return buffer_size
 
 
+class _ReadBuffer(object):
+    '''
+    The most recently received chunk of file data and the read position
+    within it. The chunk is never copied into another buffer: readers
+    take slices of :attr:`view` or search :attr:`content` in place.
+    '''
+    def __init__(self, content=b""):
+        self.content = content
+        self.view = memoryview(content)
+        self.pos = 0
+
+    def __len__(self):
+        return len(self.content)
+
+    def remaining(self):
+        return len(self.content) - self.pos
+
+    def advance(self, max_length):
+        '''
+        Consumes up to *max_length* bytes and returns their (start,
+        stop) offsets in :attr:`content`.
+        '''
+        start = self.pos
+        self.pos = min(len(self.content), start + max_length)
+        return start, self.pos
+
+
+ReadAheadStats = collections.namedtuple("ReadAheadStats", ["chunk_size", "max_requests", "requests", "bytes",
+                                                           "request_latency", "throughput"])
+
+
+class _ReadAheadController(object):
+    '''
+    Chooses the size of the requests issued ahead of the read position
+    of a :class:`DXFile`, and how many of them may be in flight, from
+    what is observed while reading.
+
+    The chunk size starts small. It is doubled while requests complete
+    in less than half of READ_AHEAD_TARGET_REQUEST_TIME, and halved when
+    they take more than twice that time. The number of requests in
+    flight is reconsidered after each window of responses consumed by
+    the reader. It is doubled while doing so raised the throughput seen
+    by the reader by more than 10%, and decreased by one when the
+    throughput dropped by more than 10%. Both are kept within
+    *max_chunk_size*, *max_requests* and *max_bytes* (the product of
+    the chunk size and the number of requests in flight).
+    '''
+    def __init__(self, min_chunk_size, max_chunk_size, max_requests, max_bytes):
+        self.min_chunk_size = min(min_chunk_size, max_chunk_size)
+        self.max_chunk_size = max_chunk_size
+        self.max_requests_limit = max_requests
+        self.max_bytes = max_bytes
+        self.chunk_size = self.min_chunk_size
+        self.max_requests = self._bound_requests(READ_AHEAD_INITIAL_REQUESTS)
+        self.requests, self.bytes = 0, 0
+        self.request_latency, self.throughput = None, None
+        self._lock = Lock()
+        self.restart()
+
+    def _bound_requests(self, num_requests):
+        return max(1, min(num_requests, self.max_requests_limit, self.max_bytes // self.chunk_size))
+
+    def restart(self):
+        '''
+        Starts a new measurement window (e.g. after a seek).
+        '''
+        self._window_start, self._window_bytes, self._window_responses = None, 0, 0
+
+    def record_request(self, num_bytes, elapsed):
+        '''
+        Called by the download threads when a request completes.
+        '''
+        with self._lock:
+            self.requests += 1
+            self.bytes += num_bytes
+            if self.request_latency is None:
+                self.request_latency = elapsed
+            else:
+                self.request_latency = 0.75 * self.request_latency + 0.25 * elapsed
+            if num_bytes < self.chunk_size:
+                # Short requests (at the end of the file) say nothing
+                # about the best chunk size
+                return
+            if elapsed < READ_AHEAD_TARGET_REQUEST_TIME / 2:
+                self.chunk_size = min(self.chunk_size * 2, self.max_chunk_size)
+            elif elapsed > READ_AHEAD_TARGET_REQUEST_TIME * 2:
+                self.chunk_size = max(self.chunk_size // 2, self.min_chunk_size)
+            self.max_requests = self._bound_requests(self.max_requests)
+
+    def record_response(self, num_bytes):
+        '''
+        Called by the reader when it consumes a response.
+        '''
+        now = time.time()
+        if self._window_start is None:
+            # The first response may have waited for the whole pipeline
+            # to fill; measure from when it arrived.
+            self._window_start = now
+            return
+        self._window_bytes += num_bytes
+        self._window_responses += 1
+        if self._window_responses < max(self.max_requests, READ_AHEAD_INITIAL_REQUESTS):
+            return
+        elapsed = now - self._window_start
+        throughput = self._window_bytes / elapsed if elapsed > 0 else float("inf")
+        with self._lock:
+            if self.throughput is None or throughput > self.throughput * 1.1:
+                self.max_requests = self._bound_requests(self.max_requests * 2)
+            elif throughput < self.throughput * 0.9:
+                self.max_requests = self._bound_requests(self.max_requests - 1)
+            self.throughput = throughput
+        self._window_start, self._window_bytes, self._window_responses = now, 0, 0
+
+    def stats(self):
+        with self._lock:
+            return ReadAheadStats(chunk_size=self.chunk_size, max_requests=self.max_requests,
+                                  requests=self.requests, bytes=self.bytes,
+                                  request_latency=self.request_latency, throughput=self.throughput)
+
+
+class _DXFileRawIO(io.RawIOBase):
+    '''
+    Read-only :class:`io.RawIOBase` interface to a
+    :class:`DXFile`. Returned by :meth:`DXFile.raw_io`.
+    '''
+    def __init__(self, dxfile, **kwargs):
+        io.RawIOBase.__init__(self)
+        self._dxfile = dxfile
+        self._kwargs = kwargs
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        return self._dxfile.readinto(b, **self._kwargs)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._dxfile.seek(offset, whence)
+        return self._dxfile.tell()
+
+    def tell(self):
+        return self._dxfile.tell()
+
+
 class DXFile(DXDataObject):
     '''Remote file object handler.
 
@@ -185,7 +340,8 @@ class DXFile(DXDataObject):
         print('set_http_threadpool_size is deprecated')
 
     def __init__(self, dxid=None, project=None, mode=None, read_buffer_size=DEFAULT_BUFFER_SIZE,
-                 write_buffer_size=DEFAULT_BUFFER_SIZE, expected_file_size=None, file_is_mmapd=False):
+                 write_buffer_size=DEFAULT_BUFFER_SIZE, expected_file_size=None, file_is_mmapd=False,
+                 block_cache=None, max_read_ahead=None):
         """
         :param dxid: Object ID
         :type dxid: string
@@ -207,6 +363,14 @@ class DXFile(DXDataObject):
             write buffer size will be constrained to be a multiple of
             the allocation granularity)
         :type file_is_mmapd: bool
+        :param block_cache: if given, reads are served in whole blocks
+            through this cache instead of being streamed with read-ahead,
+            so that random access only fetches each block once
+        :type block_cache: :class:`~dxpy.utils.block_cache.DXBlockCache`
+        :param max_read_ahead: maximum number of bytes requested ahead
+            of the read position (defaults to *read_buffer_size* times
+            the number of CPUs)
+        :type max_read_ahead: int
         """
         DXDataObject.__init__(self, dxid=dxid, project=project)
 
@@ -222,10 +386,15 @@ class DXFile(DXDataObject):
             if mode not in ['r', 'w', 'a']:
                 raise ValueError("mode must be one of 'r', 'w', or 'a'. Character 'b' may be used in combination (e.g. 'wb').")
             self._close_on_exit = (mode == 'w')
-        self._read_buf = BytesIO()
+        self._read_buf = _ReadBuffer()
         self._write_buf = BytesIO()
 
         self._read_bufsize = read_buffer_size
+        self._block_cache = block_cache
+        if max_read_ahead is None:
+            max_read_ahead = read_buffer_size * cpu_count()
+        self._read_ahead = _ReadAheadController(READ_AHEAD_MIN_CHUNK_SIZE, read_buffer_size, cpu_count(),
+                                                max_read_ahead)
 
         # Computed lazily later since this depends on the project, and
         # we want to allow the project to be set as late as possible.
@@ -313,41 +482,43 @@ class DXFile(DXDataObject):
             raise
 
     def __iter__(self):
-        _buffer = self.read(self._read_bufsize)
-        done = False
-        if USING_PYTHON2:
-            while not done:
-                if b"\n" in _buffer:
-                    lines = _buffer.splitlines()
-                    for i in range(len(lines) - 1):
-                        yield lines[i]
-                    _buffer = lines[len(lines) - 1]
-                else:
-                    more = self.read(self._read_bufsize)
-                    if more == b"":
-                        done = True
-                    else:
-                        _buffer = _buffer + more
-        else:
-            if self._binary_mode:
-                raise DXFileError("Cannot read lines when file opened in binary mode")
+        # Lines are split at "\n" (dropping a preceding "\r"). Each chunk
+        # of the file is searched in place and split in one go; only
+        # a line that spans two chunks is copied more than once.
+        if not USING_PYTHON2 and self._binary_mode:
+            raise DXFileError("Cannot read lines when file opened in binary mode")
+        partial_line = []
+        for buf, start, stop in self._read_chunks():
+            last_newline = buf.content.rfind(b"\n", start, stop)
+            if last_newline < 0:
+                partial_line.append(buf.content[start:stop])
+                continue
+            block = buf.content[start:last_newline]
+            if partial_line:
+                partial_line.append(block)
+                block = b"".join(partial_line)
+                partial_line = []
+            if last_newline + 1 < stop:
+                partial_line.append(buf.content[last_newline + 1:stop])
+            for line in self._split_lines(block):
+                yield line
+
+        if partial_line:
+            for line in self._split_lines(b"".join(partial_line)):
+                yield line
+
+    def _split_lines(self, block):
+        if not USING_PYTHON2:
             # python3 is much stricter about distinguishing
             # 'bytes' from 'str'.
-            while not done:
-                if "\n" in _buffer:
-                    lines = _buffer.splitlines()
-                    for i in range(len(lines) - 1):
-                        yield lines[i]
-                    _buffer = lines[len(lines) - 1]
-                else:
-                    more = self.read(self._read_bufsize)
-                    if more == "":
-                        done = True
-                    else:
-                        _buffer = _buffer + more
-
-        if _buffer:
-            yield _buffer
+            block = block.decode("utf-8")
+            newline, carriage_return = "\n", "\r"
+        else:
+            newline, carriage_return = b"\n", b"\r"
+        lines = block.split(newline)
+        if carriage_return in block:
+            lines = [line[:-1] if line.endswith(carriage_return) else line for line in lines]
+        return lines
 
     next = next
     __next__ = next
@@ -401,23 +572,14 @@ class DXFile(DXDataObject):
         orig_pos = self._pos
         self._pos = reference_pos + offset
 
-        in_buf = False
-        orig_buf_pos = self._read_buf.tell()
-        if offset < orig_pos:
-            if orig_buf_pos > orig_pos - offset:
-                # offset is less than original position but within the buffer
-                in_buf = True
-        else:
-            buf_len = dxpy.utils.string_buffer_length(self._read_buf)
-            if buf_len - orig_buf_pos > offset - orig_pos:
-                # offset is greater than original position but within the buffer
-                in_buf = True
-
-        if in_buf:
+        buf = self._read_buf
+        # File position of the first byte in the buffer
+        buf_start_pos = orig_pos - buf.pos
+        if buf_start_pos <= self._pos < buf_start_pos + len(buf):
             # offset is within the buffer (at least one byte following
             # the offset can be read directly out of the buffer)
-            self._read_buf.seek(orig_buf_pos - orig_pos + offset)
-        elif offset == orig_pos:
+            buf.pos = self._pos - buf_start_pos
+        elif self._pos == orig_pos:
             # This seek is a no-op (the cursor is just past the end of
             # the read buffer and coincides with the desired seek
             # position). We don't have the data ready, but the request
@@ -429,7 +591,7 @@ class DXFile(DXDataObject):
         else:
             # offset is outside the buffer-- reset buffer and queues.
             # This is the failsafe behavior
-            self._read_buf = BytesIO()
+            self._read_buf = _ReadBuffer()
             # TODO: if the offset is within the next response(s), don't throw out the queues
             self._request_iterator, self._response_iterator = None, None
 
@@ -840,33 +1002,51 @@ class DXFile(DXDataObject):
         if end_pos > self._file_length:
             raise DXFileError("Invalid end_pos")
 
-        def chunk_ranges(start_pos, end_pos, init_chunk_size=1024*64, ramp=2, num_requests_between_ramp=4):
-            cur_chunk_start = start_pos
-            cur_chunk_size = min(init_chunk_size, limit_chunk_size)
-            i = 0
-            while cur_chunk_start < end_pos:
-                cur_chunk_end = min(cur_chunk_start + cur_chunk_size - 1, end_pos)
-                yield cur_chunk_start, cur_chunk_end
-                cur_chunk_start += cur_chunk_size
-                if cur_chunk_size < limit_chunk_size and i % num_requests_between_ramp == (num_requests_between_ramp - 1):
-                    cur_chunk_size = min(cur_chunk_size * ramp, limit_chunk_size)
-                i += 1
-
-        for chunk_start_pos, chunk_end_pos in chunk_ranges(start_pos, end_pos):
+        # The chunk size is looked up as each request is generated, so
+        # that it follows the read-ahead controller as it adapts.
+        chunk_start_pos = start_pos
+        while chunk_start_pos < end_pos:
+            chunk_size = min(self._read_ahead.chunk_size, limit_chunk_size)
+            chunk_end_pos = min(chunk_start_pos + chunk_size - 1, end_pos)
             url, headers = self.get_download_url(project=project, **kwargs)
             # It is possible for chunk_end_pos to be outside of the range of the file
-            yield dxpy._dxhttp_read_range, [url, headers, chunk_start_pos, min(chunk_end_pos, self._file_length - 1),
-                                            FILE_REQUEST_TIMEOUT], {}
+            yield self._timed_read_range, [url, headers, chunk_start_pos, min(chunk_end_pos, self._file_length - 1),
+                                           FILE_REQUEST_TIMEOUT], {}
+            chunk_start_pos += chunk_size
+
+    def _timed_read_range(self, *args):
+        start_time = time.time()
+        content = dxpy._dxhttp_read_range(*args)
+        self._read_ahead.record_request(len(content), time.time() - start_time)
+        return content
+
+    def get_read_ahead_stats(self):
+        '''
+        :returns: The parameters currently chosen for read-ahead, and what they are based on
+        :rtype: :class:`ReadAheadStats`
+
+        Sequential reads are served by requests issued ahead of the read
+        position. Their size (*chunk_size*) and the number of them that
+        may be in flight (*max_requests*) adapt to the observed mean
+        request latency (*request_latency*, in seconds) and the
+        throughput seen by the reader (*throughput*, in bytes per
+        second). *requests* and *bytes* count the requests made so far.
+        '''
+        return self._read_ahead.stats()
 
     def _next_response_content(self, get_first_chunk_sequentially=False):
         if self._response_iterator is None:
+            self._read_ahead.restart()
             self._response_iterator = dxpy.utils.response_iterator(
                 self._request_iterator,
                 self._http_threadpool,
+                max_active_tasks=lambda: self._read_ahead.max_requests,
                 do_first_task_sequentially=get_first_chunk_sequentially
             )
         try:
-            return next(self._response_iterator)
+            content = next(self._response_iterator)
+            self._read_ahead.record_response(len(content))
+            return content
         except:
             # If an exception is raised, the iterator is unusable for
             # retrieving any more items. Destroy it so we'll reinitialize it
@@ -875,30 +1055,12 @@ class DXFile(DXDataObject):
             self._request_iterator = None
             raise
 
-    def _read2(self, length=None, use_compression=None, project=None, **kwargs):
+    def _read_chunks(self, length=None, project=None, **kwargs):
         '''
-        :param length: Maximum number of bytes to be read
-        :type length: integer
-        :param project: project to use as context for this download (may affect
-            which billing account is billed for this download). If specified,
-            must be a project in which this file exists. If not specified, the
-            project ID specified in the handler is used for the download, IF it
-            contains this file. If set to DXFile.NO_PROJECT_HINT, no project ID
-            is supplied for the download, even if the handler specifies a
-            project ID.
-        :type project: str or None
-        :rtype: string
-        :raises: :exc:`~dxpy.exceptions.ResourceNotFound` if *project* is supplied
-           and it does not contain this file
-
-        Returns the next *length* bytes, or all the bytes until the end of file
-        (if no *length* is given or there are fewer than *length* bytes left in
-        the file).
-
-        .. note:: After the first call to read(), the project arg and
-           passthrough kwargs are not respected while using the same response
-           iterator (i.e. until next seek).
-
+        Generates the next *length* bytes of the file (or all the bytes
+        until the end of file) as (buffer, start, stop) tuples, where
+        the data is ``buffer.content[start:stop]``. The file position
+        is advanced as the tuples are generated.
         '''
         if self._file_length == None:
             desc = self.describe(**kwargs)
@@ -916,42 +1078,83 @@ class DXFile(DXDataObject):
         # anyway).
         get_first_chunk_sequentially = (self._file_length > 128 * 1024 and self._pos == 0 and dxpy.JOB_ID)
 
-        if self._pos == self._file_length:
-            return b""
-
         if length == None or length > self._file_length - self._pos:
             length = self._file_length - self._pos
 
-        buf = self._read_buf
-        buf_remaining_bytes = dxpy.utils.string_buffer_length(buf) - buf.tell()
-        if length <= buf_remaining_bytes:
-            self._pos += length
-            return buf.read(length)
-        else:
-            orig_buf_pos = buf.tell()
-            orig_file_pos = self._pos
-            buf.seek(0, os.SEEK_END)
-            self._pos += buf_remaining_bytes
-            while self._pos < orig_file_pos + length:
-                remaining_len = orig_file_pos + length - self._pos
-
+        while length > 0:
+            buf = self._read_buf
+            if buf.remaining() == 0 and self._block_cache is not None:
+                buf = self._read_buf = self._read_cached_block(project=project, **kwargs)
+            elif buf.remaining() == 0:
                 if self._response_iterator is None:
                     self._request_iterator = self._generate_read_requests(
                         start_pos=self._pos, project=project, **kwargs)
-
                 content = self._next_response_content(get_first_chunk_sequentially=get_first_chunk_sequentially)
+                if len(content) == 0:
+                    raise DXFileError("Received no data for {} at position {}".format(self._dxid, self._pos))
+                buf = self._read_buf = _ReadBuffer(content)
+            start, stop = buf.advance(length)
+            self._pos += stop - start
+            length -= stop - start
+            yield buf, start, stop
+
+    def _read_cached_block(self, project=None, **kwargs):
+        '''
+        Returns a read buffer holding the block of the file that
+        contains the current position, positioned there. The block is
+        fetched (and added to the block cache) if it is not cached.
+        '''
+        block_size = self._block_cache.block_size
+        block_index = self._pos // block_size
+        key = (self._dxid, block_index)
+        content = self._block_cache.get(key)
+        if content is None:
+            url, headers = self.get_download_url(project=project, **kwargs)
+            block_start = block_index * block_size
+            block_end = min(block_start + block_size, self._file_length) - 1
+            content = dxpy._dxhttp_read_range(url, headers, block_start, block_end, FILE_REQUEST_TIMEOUT)
+            if len(content) != block_end - block_start + 1:
+                raise DXFileError("Received {} bytes for {} at position {} (expected {})".format(
+                    len(content), self._dxid, block_start, block_end - block_start + 1))
+            self._block_cache.put(key, content)
+        buf = _ReadBuffer(content)
+        buf.pos = self._pos - block_index * block_size
+        return buf
+
+    def _read2(self, length=None, use_compression=None, project=None, **kwargs):
+        '''
+        :param length: Maximum number of bytes to be read
+        :type length: integer
+        :param project: project to use as context for this download (may affect
+            which billing account is billed for this download). If specified,
+            must be a project in which this file exists. If not specified, the
+            project ID specified in the handler is used for the download, IF it
+            contains this file. If set to DXFile.NO_PROJECT_HINT, no project ID
+            is supplied for the download, even if the handler specifies a
+            project ID.
+        :type project: str or None
+        :rtype: string
+        :raises: :exc:`~dxpy.exceptions.ResourceNotFound` if *project* is supplied
+           and it does not contain this file
 
-                if len(content) < remaining_len:
-                    buf.write(content)
-                    self._pos += len(content)
-                else: # response goes beyond requested length
-                    buf.write(content[:remaining_len])
-                    self._pos += remaining_len
-                    self._read_buf = BytesIO()
-                    self._read_buf.write(content[remaining_len:])
-                    self._read_buf.seek(0)
-            buf.seek(orig_buf_pos)
-            return buf.read()
+        Returns the next *length* bytes, or all the bytes until the end of file
+        (if no *length* is given or there are fewer than *length* bytes left in
+        the file).
+
+        .. note:: After the first call to read(), the project arg and
+           passthrough kwargs are not respected while using the same response
+           iterator (i.e. until next seek).
+
+        '''
+        chunks = list(self._read_chunks(length, project=project, **kwargs))
+        if len(chunks) == 1:
+            buf, start, stop = chunks[0]
+            if start == 0 and stop == len(buf):
+                # The read covers exactly one response; return it as is
+                return buf.content
+        if USING_PYTHON2:
+            return b"".join(buf.content[start:stop] for buf, start, stop in chunks)
+        return b"".join(buf.view[start:stop] for buf, start, stop in chunks)
 
         # Debug fallback
         # import urllib2
@@ -967,7 +1170,50 @@ class DXFile(DXDataObject):
         if self._binary_mode is True:
             return data
         return data.decode("utf-8")
-    
+
+    def readinto(self, b, project=None, **kwargs):
+        '''
+        :param b: Writable buffer (e.g. a :class:`bytearray` or :class:`memoryview`)
+        :param project: project to use as context for this download; see :meth:`read`
+        :type project: str or None
+        :returns: Number of bytes read (0 at the end of the file)
+        :rtype: int
+
+        Reads up to ``len(b)`` bytes directly into *b*, copying each
+        byte once on its way from the network to *b*.
+
+        '''
+        target = memoryview(b)
+        if not USING_PYTHON2:
+            target = target.cast("B")
+        num_bytes = 0
+        for buf, start, stop in self._read_chunks(len(target), project=project, **kwargs):
+            target[num_bytes:num_bytes + stop - start] = buf.view[start:stop]
+            num_bytes += stop - start
+        return num_bytes
+
+    def raw_io(self, **kwargs):
+        '''
+        :returns: Read-only raw stream that reads from this file
+        :rtype: :class:`io.RawIOBase`
+
+        Returns a view of the file as a standard raw binary stream,
+        which can be wrapped in the classes of the :mod:`io` module.
+        Reading from and seeking the stream reads from and seeks this
+        handler. Keyword arguments (e.g. *project*) are passed to
+        :meth:`readinto`.
+
+        Example::
+
+            with io.BufferedReader(dxfile.raw_io()) as fh:
+                header = fh.read(4)
+
+            for line in io.TextIOWrapper(io.BufferedReader(dxfile.raw_io())):
+                ...
+
+        '''
+        return _DXFileRawIO(self, **kwargs)
+
     def archive(self, all_copies=False):
         '''
         :param all_copies: Force the transition of files into the archived state. Requesting user must be the ADMIN of the project billTo org. 
@@ -28,10 +28,12 @@ import os, sys, math, mmap, stat
 import hashlib
 import traceback
 import warnings
-from collections import defaultdict
+from collections import defaultdict, deque
 import multiprocessing
+import concurrent.futures
+import threading
 from random import randint
-from time import sleep
+from time import sleep, time
 
 import dxpy
 from .. import logger
@@ -42,10 +44,60 @@ from ..compat import open, md5_hasher, USING_PYTHON2
 from ..utils import response_iterator
 import subprocess
 
-def open_dxfile(dxid, project=None, mode=None, read_buffer_size=dxfile.DEFAULT_BUFFER_SIZE):
+# Number of threads making file/new and file/close calls in upload_local_files
+UPLOAD_API_THREADS = 8
+# Number of threads hashing local data when verifying partial downloads
+CHECKSUM_THREADS = multiprocessing.cpu_count()
+# Suffix of the sidecar file recording the verified parts of a partial download
+PART_JOURNAL_SUFFIX = ".dxparts"
+# Amount of data at the start of each journaled part which is hashed
+# again on resume, to detect local files that were replaced
+PART_JOURNAL_SAMPLE_SIZE = 4096
+# Minimum number of seconds between syncs of the journal to disk
+PART_JOURNAL_SYNC_INTERVAL = 5
+
+_checksum_threadpool = None
+_checksum_threadpool_mutex = threading.Lock()
+
+def _get_checksum_threadpool():
+    global _checksum_threadpool
+    with _checksum_threadpool_mutex:
+        if _checksum_threadpool is None:
+            _checksum_threadpool = dxpy.utils.get_futures_threadpool(max_workers=CHECKSUM_THREADS)
+        return _checksum_threadpool
+
+
+class _PrecomputedHash(object):
+    '''
+    Stands in for the hasher of a part whose data was hashed as a whole
+    on a download thread.
+    '''
+    def __init__(self, hexdigest):
+        self._hexdigest = hexdigest
+
+    def hexdigest(self):
+        return self._hexdigest
+
+
+def _hash_whole_part(part_info, start, end, data):
+    '''
+    Returns the MD5 of *data* if it is the whole part described by
+    *part_info* (so that it can be computed on the download thread that
+    fetched it, in parallel with other downloads), and None otherwise.
+    '''
+    if "md5" not in part_info or start != part_info["start"] or end - start + 1 != part_info["size"]:
+        return None
+    hasher = md5_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def open_dxfile(dxid, project=None, mode=None, read_buffer_size=dxfile.DEFAULT_BUFFER_SIZE, block_cache=None):
     '''
     :param dxid: file ID
     :type dxid: string
+    :param block_cache: cache of file blocks to read through (for random access)
+    :type block_cache: :class:`~dxpy.utils.block_cache.DXBlockCache`
     :rtype: :class:`~dxpy.bindings.dxfile.DXFile`
 
     Given the object ID of an uploaded file, returns a remote file
@@ -62,7 +114,7 @@ def open_dxfile(dxid, project=None, mode=None, read_buffer_size=dxfile.DEFAULT_B
       DXFile(dxid)
 
     '''
-    return DXFile(dxid, project=project, mode=mode, read_buffer_size=read_buffer_size)
+    return DXFile(dxid, project=project, mode=mode, read_buffer_size=read_buffer_size, block_cache=block_cache)
 
 
 def new_dxfile(mode=None, write_buffer_size=dxfile.DEFAULT_BUFFER_SIZE, expected_file_size=None, file_is_mmapd=False,
@@ -222,6 +274,199 @@ def _download_symbolic_link(dxid, md5digest, project, dest_filename, symlink_max
     if md5digest is not None:
         _verify(dest_filename, md5digest)
 
+def _get_part_sample(data):
+    '''
+    Returns the size and MD5 of the beginning of a part whose data
+    starts with *data*.
+    '''
+    hasher = md5_hasher()
+    hasher.update(data[:PART_JOURNAL_SAMPLE_SIZE])
+    return min(len(data), PART_JOURNAL_SAMPLE_SIZE), hasher.hexdigest()
+
+
+class _PartJournal(object):
+    '''
+    Sidecar file, next to a partially downloaded file, which records the
+    parts that are known to be intact so that they are not hashed again
+    when the download is resumed.
+
+    The first line holds the ID of the remote file. Each further line
+    holds a part ID, its MD5, and the size and MD5 of a sample from the
+    beginning of the part. A recorded part is trusted if its MD5 still
+    matches the file's description and the local data still matches
+    the sample, which catches local files that were replaced.
+
+    The journal is only an optimization: if it cannot be written (e.g.
+    the directory is read-only), the download goes on without it. It is
+    kept open while parts are recorded, and synced to disk at most every
+    PART_JOURNAL_SYNC_INTERVAL seconds; an entry for data that did not
+    reach the disk fails the sample check when the download is resumed.
+    '''
+    def __init__(self, filename, file_id):
+        self.path = filename + PART_JOURNAL_SUFFIX
+        self.file_id = file_id
+        self.disabled = False
+        self._fh = None
+        self._last_sync = 0
+
+    def _write(self, mode, data):
+        if self.disabled:
+            return
+        try:
+            if self._fh is None or mode == "w":
+                self.close()
+                self._fh = open(self.path, mode)
+            self._fh.write(data)
+            self._fh.flush()
+            if time() - self._last_sync >= PART_JOURNAL_SYNC_INTERVAL:
+                os.fsync(self._fh.fileno())
+                self._last_sync = time()
+        except (IOError, OSError) as e:
+            logger.debug("Not keeping a journal of downloaded parts in %s: %s", self.path, e)
+            self.disabled = True
+            self.close()
+
+    def load(self):
+        '''
+        Returns the recorded parts as a dict of part ID to (MD5, sample
+        size, sample MD5).
+        '''
+        try:
+            with open(self.path, "r") as journal_fh:
+                lines = journal_fh.read().splitlines()
+        except IOError:
+            return {}
+        if not lines or lines[0] != self.file_id:
+            return {}
+        entries = {}
+        for line in lines[1:]:
+            fields = line.split(" ")
+            if len(fields) == 4 and fields[2].isdigit():
+                entries[fields[0]] = (fields[1], int(fields[2]), fields[3])
+        return entries
+
+    def _format_entry(self, part_id, md5, sample):
+        return "{} {} {} {}\n".format(part_id, md5, sample[0], sample[1])
+
+    def reset(self, verified_parts=()):
+        '''
+        Rewrites the journal to hold only *verified_parts*, a sequence
+        of (part ID, MD5, sample) tuples.
+        '''
+        self._write("w", self.file_id + "\n" + "".join(self._format_entry(part_id, md5, sample)
+                                                        for part_id, md5, sample in verified_parts))
+
+    def record(self, part_id, md5, sample):
+        self._write("a", self._format_entry(part_id, md5, sample))
+
+    def close(self):
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except (IOError, OSError):
+                pass
+            self._fh = None
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _hash_local_range(local_data, start, size):
+    hasher = md5_hasher()
+    if USING_PYTHON2:
+        hasher.update(local_data[start:start + size])
+    else:
+        with memoryview(local_data)[start:start + size] as view:
+            hasher.update(view)
+    return hasher.hexdigest()
+
+def _verify_downloaded_parts(fh, file_id, parts, parts_to_get, progress_callback=None, journal=None):
+    '''
+    Verifies that the parts of file *file_id* already present at the
+    beginning of the local file *fh* (open in "rb+" mode) match their
+    checksums. The local file is truncated after the last intact part,
+    and the intact parts are removed from *parts_to_get*. If given,
+    *progress_callback* is called with the size of the verified data
+    after each part is verified.
+
+    The local file is memory-mapped and its parts are hashed on a pool
+    of CHECKSUM_THREADS threads. Of the parts recorded in *journal* (a
+    :class:`_PartJournal`) only a small sample is hashed again, and the
+    journal is rewritten to list the intact parts.
+
+    Returns the size of the verified data.
+    '''
+    last_verified_part, last_verified_pos = None, 0
+    verified_parts = []
+    local_size = os.fstat(fh.fileno()).st_size
+    journaled_parts = journal.load() if journal is not None else {}
+    local_data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if local_size > 0 else b""
+    thread_pool = _get_checksum_threadpool()
+    # (part ID, start position, end position, expected MD5, future of
+    # the MD5 of the local data), in order
+    in_flight = deque()
+
+    def part_tasks():
+        # Stops at the first part that cannot be intact, so that the
+        # parts before it are still verified
+        part_start = 0
+        for part_id in parts_to_get:
+            part_info = parts[part_id]
+            if "md5" not in part_info:
+                logger.debug("File %s does not contain part md5 checksums", file_id)
+                return
+            if part_start + part_info["size"] > local_size:
+                logger.debug("Local data for part %s is truncated", part_id)
+                return
+            yield part_id, part_start, part_info["size"]
+            part_start += part_info["size"]
+
+    try:
+        tasks = part_tasks()
+        while True:
+            for part_id, part_start, part_size in tasks:
+                journaled_md5, sample_size, sample_md5 = journaled_parts.get(part_id, (None, None, None))
+                if journaled_md5 == parts[part_id]["md5"] and sample_size <= part_size:
+                    expected_md5, hash_size = sample_md5, sample_size
+                else:
+                    expected_md5, hash_size = parts[part_id]["md5"], part_size
+                future = thread_pool.submit(_hash_local_range, local_data, part_start, hash_size)
+                in_flight.append((part_id, part_start, part_start + part_size, expected_md5, future))
+                if len(in_flight) >= CHECKSUM_THREADS * 2:
+                    break
+            if not in_flight:
+                break
+            part_id, part_start, part_end, expected_md5, future = in_flight.popleft()
+            if future.result() != expected_md5:
+                raise DXFileError("Checksum mismatch when verifying downloaded part {}".format(part_id))
+            last_verified_part, last_verified_pos = part_id, part_end
+            verified_parts.append((part_id, parts[part_id]["md5"],
+                                   _get_part_sample(local_data[part_start:min(part_end, part_start + PART_JOURNAL_SAMPLE_SIZE)])))
+            if progress_callback is not None:
+                progress_callback(last_verified_pos)
+    except (IOError, DXFileError) as e:
+        logger.debug(e)
+    finally:
+        # Don't unmap or truncate the file while it is still being read
+        futures = [in_flight_part[-1] for in_flight_part in in_flight]
+        for future in futures:
+            future.cancel()
+        concurrent.futures.wait(futures)
+        if local_size > 0:
+            local_data.close()
+    fh.seek(last_verified_pos)
+    fh.truncate()
+    if journal is not None:
+        journal.reset(verified_parts)
+    if last_verified_part is not None:
+        del parts_to_get[:parts_to_get.index(last_verified_part)+1]
+    logger.debug("Verified %s/%d downloaded parts", last_verified_part, len(parts_to_get))
+    return last_verified_pos
+
 def _download_dxfile(dxid, filename, part_retry_counter,
                      chunksize=dxfile.DEFAULT_BUFFER_SIZE, append=False, show_progress=False,
                      project=None, describe_output=None, symlink_max_tries=15, **kwargs):
@@ -308,7 +553,7 @@ def _download_dxfile(dxid, filename, part_retry_counter,
         if len(parts) > 1 or (start > 0) or (end - start + 1 < parts[part_id_to_get]["size"]):
             sub_range = True
         data = dxpy._dxhttp_read_range(url, headers, start, end, FILE_REQUEST_TIMEOUT, sub_range)
-        return part_id_to_get, data
+        return part_id_to_get, data, _hash_whole_part(parts[part_id_to_get], start, end, data)
 
     def chunk_requests():
         for part_id_to_chunk in parts_to_get:
@@ -329,61 +574,58 @@ def _download_dxfile(dxid, filename, part_retry_counter,
             msg = msg.format(dxfile.get_id(), _part_id, parts[_part_id]["md5"], hasher.hexdigest())
             raise DXChecksumMismatchError(msg)
 
+    # Files with a single part have nothing to resume from
+    journal = _PartJournal(filename, dxfile.get_id()) if len(parts) > 1 and not append else None
+
+    def record_part(_part_id, sample):
+        if journal is not None and _part_id is not None and "md5" in parts[_part_id]:
+            # Make sure the part is in the file before it is recorded
+            fh.flush()
+            journal.record(_part_id, parts[_part_id]["md5"], sample)
+
     with fh:
         last_verified_pos = 0
 
+        if journal is not None and fh.mode == "wb":
+            journal.reset()
+
         if fh.mode == "rb+":
             # We already downloaded the beginning of the file, verify that the
             # chunk checksums match the metadata.
-            last_verified_part, max_verify_chunk_size = None, 1024*1024
-            try:
-                for part_id in parts_to_get:
-                    part_info = parts[part_id]
-                    if "md5" not in part_info:
-                        raise DXFileError("File {} does not contain part md5 checksums".format(dxfile.get_id()))
-                    bytes_to_read = part_info["size"]
-                    hasher = md5_hasher()
-                    while bytes_to_read > 0:
-                        chunk = fh.read(min(max_verify_chunk_size, bytes_to_read))
-                        if len(chunk) < min(max_verify_chunk_size, bytes_to_read):
-                            raise DXFileError("Local data for part {} is truncated".format(part_id))
-                        hasher.update(chunk)
-                        bytes_to_read -= max_verify_chunk_size
-                    if hasher.hexdigest() != part_info["md5"]:
-                        raise DXFileError("Checksum mismatch when verifying downloaded part {}".format(part_id))
-                    else:
-                        last_verified_part = part_id
-                        last_verified_pos = fh.tell()
-                        if show_progress:
-                            _bytes += part_info["size"]
-                            print_progress(_bytes, file_size, action="Verified")
-            except (IOError, DXFileError) as e:
-                logger.debug(e)
-            fh.seek(last_verified_pos)
-            fh.truncate()
-            if last_verified_part is not None:
-                del parts_to_get[:parts_to_get.index(last_verified_part)+1]
+            def print_verified(verified_pos):
+                if show_progress:
+                    print_progress(verified_pos, file_size, action="Verified")
+            last_verified_pos = _verify_downloaded_parts(fh, dxfile.get_id(), parts, parts_to_get,
+                                                         progress_callback=print_verified, journal=journal)
+            _bytes = last_verified_pos
             if show_progress and len(parts_to_get) < len(parts):
                 print_progress(last_verified_pos, file_size, action="Resuming at")
-            logger.debug("Verified %s/%d downloaded parts", last_verified_part, len(parts_to_get))
 
         try:
             # Main loop. In parallel: download chunks, verify them, and write them to disk.
             get_first_chunk_sequentially = (file_size > 128 * 1024 and last_verified_pos == 0 and dxpy.JOB_ID)
-            cur_part, got_bytes, hasher = None, None, None
-            for chunk_part, chunk_data in response_iterator(chunk_requests(),
-                                                            dxfile._http_threadpool,
-                                                            do_first_task_sequentially=get_first_chunk_sequentially):
+            cur_part, got_bytes, hasher, sample = None, None, None, None
+            for chunk_part, chunk_data, chunk_md5 in response_iterator(chunk_requests(),
+                                                                       dxfile._http_threadpool,
+                                                                       do_first_task_sequentially=get_first_chunk_sequentially):
                 if chunk_part != cur_part:
                     verify_part(cur_part, got_bytes, hasher)
+                    record_part(cur_part, sample)
                     cur_part, got_bytes, hasher = chunk_part, 0, md5_hasher()
+                    sample = _get_part_sample(chunk_data)
                 got_bytes += len(chunk_data)
-                hasher.update(chunk_data)
+                if chunk_md5 is not None:
+                    # The chunk is the whole part and was hashed by the download thread
+                    hasher = _PrecomputedHash(chunk_md5)
+                else:
+                    hasher.update(chunk_data)
                 fh.write(chunk_data)
                 if show_progress:
                     _bytes += len(chunk_data)
                     print_progress(_bytes, file_size)
             verify_part(cur_part, got_bytes, hasher)
+            if journal is not None:
+                journal.remove()
             if show_progress:
                 print_progress(_bytes, file_size, action="Completed")
         except DXFileError:
@@ -394,12 +636,323 @@ def _download_dxfile(dxid, filename, part_retry_counter,
                       file=sys.stderr)
                 return False
             raise
+        finally:
+            if journal is not None:
+                journal.close()
 
         if show_progress:
             sys.stderr.write("\n")
 
         return True
 
+class _MultiFileDownload(object):
+    '''
+    State of one file being downloaded by :func:`download_dxfiles`.
+
+    Chunks of a part may complete in any order; they are hashed and
+    written in order, and chunks that arrive ahead of their turn are
+    kept in memory until then.
+    '''
+    def __init__(self, dxfile, filename, project, parts, parts_to_get, fh, journal=None):
+        self.dxfile = dxfile
+        self.filename = filename
+        self.project = project
+        self.parts = parts
+        self.fh = fh
+        self.journal = journal
+        # part ID -> sample of the beginning of the part, for the journal
+        self.samples = {}
+        self.parts_remaining = set(parts_to_get)
+        # part ID -> number of the current attempt at downloading the part
+        self.attempts = {part_id: 0 for part_id in parts_to_get}
+        # part ID -> (position of the next chunk to hash, hasher, early chunks by position)
+        self.part_progress = {}
+        for part_id in parts_to_get:
+            self.reset_part(part_id)
+
+    def reset_part(self, part_id):
+        self.part_progress[part_id] = (self.parts[part_id]["start"], md5_hasher(), {})
+
+    def part_end(self, part_id):
+        return self.parts[part_id]["start"] + self.parts[part_id]["size"]
+
+    def chunk_ranges(self, part_id, chunksize):
+        for chunk_start in range(self.parts[part_id]["start"], self.part_end(part_id), chunksize):
+            yield chunk_start, min(chunk_start + chunksize, self.part_end(part_id)) - 1
+
+    def add_chunk(self, part_id, start, data, md5=None):
+        '''
+        Hashes and writes all data of *part_id* that has arrived in
+        order. If *md5* is given, *data* is the whole part and *md5* is
+        its checksum. Returns the number of bytes that were written, and
+        whether the part is now complete.
+        '''
+        next_pos, hasher, early_chunks = self.part_progress[part_id]
+        if md5 is not None:
+            hasher = _PrecomputedHash(md5)
+        early_chunks[start] = data
+        bytes_written = 0
+        while next_pos in early_chunks:
+            chunk = early_chunks.pop(next_pos)
+            if next_pos == self.parts[part_id]["start"]:
+                self.samples[part_id] = _get_part_sample(chunk)
+            if md5 is None:
+                hasher.update(chunk)
+            self.fh.seek(next_pos)
+            self.fh.write(chunk)
+            next_pos += len(chunk)
+            bytes_written += len(chunk)
+        self.part_progress[part_id] = (next_pos, hasher, early_chunks)
+        return bytes_written, next_pos == self.part_end(part_id)
+
+    def discard_part(self, part_id):
+        '''
+        Forgets the chunks of *part_id* that were received but not
+        written. Returns their total size.
+        '''
+        early_chunks = self.part_progress[part_id][2]
+        return sum(len(chunk) for chunk in early_chunks.values())
+
+    def record_part(self, part_id):
+        if self.journal is not None and "md5" in self.parts[part_id]:
+            # Make sure the part is in the file before it is recorded
+            self.fh.flush()
+            self.journal.record(part_id, self.parts[part_id]["md5"], self.samples.pop(part_id))
+
+    def verify_part(self, part_id):
+        hasher = self.part_progress[part_id][1]
+        if "md5" not in self.parts[part_id]:
+            warnings.warn("Download of file {} is not being checked for integrity".format(self.dxfile.get_id()))
+        elif hasher.hexdigest() != self.parts[part_id]["md5"]:
+            msg = "Checksum mismatch in {} part {} (expected {}, got {})"
+            msg = msg.format(self.dxfile.get_id(), part_id, self.parts[part_id]["md5"], hasher.hexdigest())
+            raise DXChecksumMismatchError(msg)
+
+
+def _get_chunk(download, part_id, attempt, start, end, **kwargs):
+    url, headers = download.dxfile.get_download_url(project=download.project, **kwargs)
+    # If we're fetching the whole object in one shot, avoid setting the Range header to take advantage of gzip
+    # transfer compression
+    sub_range = len(download.parts) > 1 or start > 0 or end - start + 1 < download.parts[part_id]["size"]
+    data = dxpy._dxhttp_read_range(url, headers, start, end, FILE_REQUEST_TIMEOUT, sub_range)
+    return download, part_id, attempt, start, end, data, _hash_whole_part(download.parts[part_id], start, end, data)
+
+
+def download_dxfiles(downloads, chunksize=dxfile.DEFAULT_BUFFER_SIZE, max_bytes_in_flight=None,
+                     show_progress=False, symlink_max_tries=15, **kwargs):
+    '''
+    :param downloads: Files to download, each given as a dict with the keys "dxid" and "filename", and optionally "project" and "describe_output", with the same meaning as the corresponding arguments of :func:`download_dxfile`
+    :type downloads: iterable of dict
+    :param chunksize: Maximum size of a single HTTP request for file data
+    :type chunksize: int
+    :param max_bytes_in_flight: Maximum amount of file data which has been requested but not yet written to disk, across all files (defaults to *chunksize* times the number of download threads)
+    :type max_bytes_in_flight: int
+    :param show_progress: If True, report the overall progress on stderr
+    :type show_progress: boolean
+    :param symlink_max_tries: Maximum amount of tries when downloading a symlink with aria2c.
+    :type symlink_max_tries: int
+
+    Downloads many remote files. Instead of downloading the files one
+    after another, the byte ranges of all files are scheduled on a
+    single work queue and fetched on the thread pool shared by all
+    :class:`~dxpy.bindings.dxfile.DXFile` handlers, so that small files
+    are downloaded concurrently with each other and with the parts of
+    large files.
+
+    As in :func:`download_dxfile`, the checksum of each part is verified
+    (a part that fails verification is downloaded again, up to 3
+    times), and local files which already exist are treated as
+    interrupted downloads: their intact parts are kept and only the
+    remaining parts are fetched.
+
+    *downloads* is consumed lazily, so it may be a generator over a
+    very large number of files. A file may not be downloaded to a path
+    which another file is still being downloaded to.
+
+    Example::
+
+        download_dxfiles([{"dxid": "file-xxxx", "filename": "a.fastq"},
+                          {"dxid": "file-yyyy", "filename": "b.fastq"}])
+
+    '''
+    if max_bytes_in_flight is None:
+        max_bytes_in_flight = chunksize * DXFile._http_threadpool_size
+    max_tasks_in_flight = DXFile._http_threadpool_size * 4
+    # (file ID, part ID) -> number of tries remaining
+    part_retry_counter = defaultdict(lambda: 3)
+    progress = {"files": 0, "bytes": 0}
+
+    def print_progress():
+        sys.stderr.write("\33[2K")
+        sys.stderr.write("Downloaded {done_bytes:,} bytes in {done_files:,} files".format(done_bytes=progress["bytes"],
+                                                                                           done_files=progress["files"]))
+        sys.stderr.flush()
+        sys.stderr.write("\r")
+        sys.stderr.flush()
+
+    # Files which have been opened and are not yet complete
+    open_downloads = set()
+
+    def file_done(fh, journal=None):
+        if fh is not None:
+            fh.close()
+        if journal is not None:
+            journal.remove()
+        progress["files"] += 1
+        if show_progress:
+            print_progress()
+
+    def start_download(request):
+        project = request.get("project")
+        describe_output = request.get("describe_output")
+        if isinstance(request["dxid"], DXFile):
+            handler = request["dxid"]
+        else:
+            handler = DXFile(request["dxid"], mode="r", project=(project if project != DXFile.NO_PROJECT_HINT else None))
+        if any(os.path.abspath(download.filename) == os.path.abspath(request["filename"])
+               for download in open_downloads):
+            raise DXError("Cannot download {} to {}, which another file is still being downloaded to".format(
+                handler.get_id(), request["filename"]))
+
+        if describe_output and describe_output.get("parts") is not None:
+            desc = describe_output
+        else:
+            desc = handler.describe(fields={"parts"}, default_fields=True, **kwargs)
+
+        if 'drive' in desc:
+            _download_symbolic_link(handler.get_id(), desc.get('md5'), project, request["filename"],
+                                    symlink_max_tries=symlink_max_tries)
+            file_done(None)
+            return None
+
+        parts = desc["parts"]
+        parts_to_get = sorted(parts, key=int)
+        offset = 0
+        for part_id in parts_to_get:
+            parts[part_id]["start"] = offset
+            offset += parts[part_id]["size"]
+
+        # Files with a single part have nothing to resume from
+        journal = _PartJournal(request["filename"], handler.get_id()) if len(parts) > 1 else None
+        try:
+            fh = open(request["filename"], "rb+")
+        except IOError:
+            fh = open(request["filename"], "wb")
+            if journal is not None:
+                journal.reset()
+        else:
+            _verify_downloaded_parts(fh, handler.get_id(), parts, parts_to_get, journal=journal)
+
+        download = _MultiFileDownload(handler, request["filename"], project, parts, parts_to_get, fh, journal)
+        # Empty parts have no data to request
+        for part_id in parts_to_get:
+            if parts[part_id]["size"] == 0:
+                download.verify_part(part_id)
+                download.parts_remaining.remove(part_id)
+        if not download.parts_remaining:
+            file_done(fh, journal)
+            return None
+        open_downloads.add(download)
+        return download
+
+    def part_tasks(download, part_id):
+        attempt = download.attempts[part_id]
+        for start, end in download.chunk_ranges(part_id, chunksize):
+            yield download, part_id, attempt, start, end
+
+    def new_tasks():
+        for request in downloads:
+            download = start_download(request)
+            if download is not None:
+                for part_id in sorted(download.parts_remaining, key=int):
+                    for task in part_tasks(download, part_id):
+                        yield task
+
+    # Chunks of parts that failed verification; they are downloaded
+    # again before moving on to new work.
+    retry_tasks = deque()
+
+    def retry_part(download, part_id, error):
+        print(error, file=sys.stderr)
+        retry_key = (download.dxfile.get_id(), part_id)
+        part_retry_counter[retry_key] -= 1
+        if part_retry_counter[retry_key] <= 0:
+            raise error
+        print("Retrying {} ({} tries remain for part {})".format(download.dxfile.get_id(),
+                                                                 part_retry_counter[retry_key], part_id),
+              file=sys.stderr)
+        download.attempts[part_id] += 1
+        download.reset_part(part_id)
+        retry_tasks.extend(part_tasks(download, part_id))
+
+    tasks = new_tasks()
+    next_task = None
+    in_flight = {}
+    bytes_in_flight = 0
+    try:
+        while True:
+            # Keep as much work in flight as the limits allow. A task
+            # is started even if it exceeds the byte budget when nothing
+            # else is in flight, so that chunks larger than the budget
+            # can still be downloaded.
+            while len(in_flight) < max_tasks_in_flight:
+                if next_task is None:
+                    next_task = retry_tasks.popleft() if retry_tasks else next(tasks, None)
+                    if next_task is None:
+                        break
+                download, part_id, attempt, start, end = next_task
+                if bytes_in_flight > 0 and bytes_in_flight + (end - start + 1) > max_bytes_in_flight:
+                    break
+                future = DXFile._http_threadpool.submit(_get_chunk, download, part_id, attempt, start, end, **kwargs)
+                in_flight[future] = end - start + 1
+                bytes_in_flight += end - start + 1
+                next_task = None
+
+            if not in_flight:
+                break
+
+            future = dxpy.utils.wait_for_a_future(in_flight)
+            bytes_in_flight -= in_flight.pop(future)
+            download, part_id, attempt, start, end, data, md5 = future.result()
+            if attempt != download.attempts[part_id]:
+                # Left over from an attempt that already failed
+                continue
+            if len(data) != end - start + 1:
+                bytes_in_flight -= download.discard_part(part_id)
+                msg = "Unexpected chunk data size in {} part {} (expected {}, got {})"
+                retry_part(download, part_id, DXPartLengthMismatchError(
+                    msg.format(download.dxfile.get_id(), part_id, end - start + 1, len(data))))
+                continue
+            # The chunk stays accounted for until it is written
+            bytes_in_flight += len(data)
+            bytes_written, part_complete = download.add_chunk(part_id, start, data, md5)
+            bytes_in_flight -= bytes_written
+            progress["bytes"] += bytes_written
+            if show_progress and bytes_written > 0:
+                print_progress()
+            if part_complete:
+                try:
+                    download.verify_part(part_id)
+                except DXChecksumMismatchError as e:
+                    retry_part(download, part_id, e)
+                    continue
+                download.parts_remaining.remove(part_id)
+                download.record_part(part_id)
+                if not download.parts_remaining:
+                    open_downloads.remove(download)
+                    file_done(download.fh, download.journal)
+    except:
+        for future in in_flight:
+            future.cancel()
+        for download in open_downloads:
+            download.fh.close()
+            if download.journal is not None:
+                download.journal.close()
+        raise
+    finally:
+        if show_progress:
+            sys.stderr.write("\n")
+
 def upload_local_file(filename=None, file=None, media_type=None, keep_open=False,
                       wait_on_close=False, use_existing_dxfile=None, show_progress=False,
                       write_buffer_size=None, multithread=True, **kwargs):
@@ -576,6 +1129,211 @@ def upload_local_file(filename=None, file=None, media_type=None, keep_open=False
 
     return handler
 
+class _MultiFileUpload(object):
+    '''
+    State of one local file being uploaded by :func:`upload_local_files`.
+    '''
+    def __init__(self, dxfile, filename, file_size):
+        self.dxfile = dxfile
+        self.filename = filename
+        self.file_size = file_size
+        self.parts_remaining = 0
+
+    def part_ranges(self):
+        for index, start in enumerate(range(0, self.file_size, self.dxfile._write_bufsize)):
+            yield index + 1, start, min(self.dxfile._write_bufsize, self.file_size - start)
+
+
+def _upload_part_from_local_file(upload, index, start, size, **kwargs):
+    with open(upload.filename, 'rb') as fh:
+        fh.seek(start)
+        data = fh.read(size)
+    if len(data) != size:
+        raise DXFileError("Local file {} changed while it was being uploaded".format(upload.filename))
+    upload.dxfile.upload_part(data, index, **kwargs)
+    return upload, size
+
+
+def _wait_for_files_to_close(file_ids, timeout=3600*24*7, **kwargs):
+    '''
+    Waits until all of *file_ids* are closed, describing the files
+    still in the "closing" state with one batched call per poll.
+    '''
+    elapsed = 0
+    i = 0
+    while True:
+        still_closing = []
+        for file_id, desc in zip(file_ids, dxpy.bulk_describe(file_ids, fields={'state'}, **kwargs)):
+            state = desc["state"] if desc is not None else None
+            if state == "closing":
+                still_closing.append(file_id)
+            elif state != "closed":
+                raise DXError("Unexpected state of {}: {}".format(file_id, state))
+        file_ids = still_closing
+        if not file_ids:
+            break
+
+        if elapsed >= timeout or elapsed < 0:
+            raise DXError("Reached timeout while waiting for the remote files to close")
+
+        wait = min(2**7, 2**i)
+        sleep(wait)
+        i += 1
+        elapsed += wait
+
+
+def upload_local_files(uploads, write_buffer_size=None, max_parts_in_flight=None, wait_on_close=False,
+                       show_progress=False, **kwargs):
+    '''
+    :param uploads: Files to upload, each given as a dict with the key "filename" and optionally any of the data object creation parameters accepted by :func:`upload_local_file` (e.g. "name", "folder", "properties"), which take precedence over those given in *kwargs*
+    :type uploads: iterable of dict
+    :param write_buffer_size: Buffer size to use for upload
+    :type write_buffer_size: int
+    :param max_parts_in_flight: Maximum number of parts, across all files, which have been read from disk but not yet uploaded (defaults to twice the number of upload threads)
+    :type max_parts_in_flight: int
+    :param wait_on_close: If True, waits for all the files to close
+    :type wait_on_close: boolean
+    :param show_progress: If True, report the overall progress on stderr
+    :type show_progress: boolean
+    :returns: Remote file handlers, in the order of *uploads*
+    :rtype: list of :class:`~dxpy.bindings.dxfile.DXFile`
+
+    Additional optional parameters not listed: all those under
+    :func:`dxpy.bindings.DXDataObject.new`.
+
+    Uploads many local files into new closed file objects. Instead of
+    uploading the files one after another, the parts of all files are
+    placed on a single bounded queue and uploaded on the thread pool
+    shared by all :class:`~dxpy.bindings.dxfile.DXFile` handlers, while
+    the :meth:`~dxpy.api.file_new` and :meth:`~dxpy.api.file_close`
+    calls for other files are made concurrently on a separate pool.
+    The upload parameters of each project are only described once.
+
+    The destination folders must already exist unless ``parents=True``
+    is given. When *wait_on_close* is True, the files are waited on
+    together after all of them have been closed.
+
+    Example::
+
+        upload_local_files([{"filename": "a.fastq", "folder": "/reads"},
+                            {"filename": "b.fastq", "folder": "/reads"}],
+                           project="project-xxxx")
+
+    '''
+    if write_buffer_size is None:
+        write_buffer_size = dxfile.DEFAULT_BUFFER_SIZE
+    if max_parts_in_flight is None:
+        max_parts_in_flight = DXFile._http_threadpool_size * 2
+    _, remaining_kwargs = dxpy.DXDataObject._get_creation_params(kwargs)
+
+    # project ID -> fileUploadParameters
+    file_upload_params = {}
+    file_upload_params_lock = threading.Lock()
+
+    def get_file_upload_params(project):
+        with file_upload_params_lock:
+            if project not in file_upload_params:
+                file_upload_params[project] = dxpy.api.project_describe(
+                    project,
+                    {'fields': {'fileUploadParameters': True}},
+                    **remaining_kwargs
+                )['fileUploadParameters']
+            return file_upload_params[project]
+
+    def new_upload(request):
+        creation_kwargs = kwargs.copy()
+        creation_kwargs.update(request)
+        filename = creation_kwargs.pop('filename')
+        creation_kwargs.setdefault('name', os.path.basename(filename))
+        file_size = os.path.getsize(filename)
+        handler = new_dxfile(mode='a', write_buffer_size=write_buffer_size, expected_file_size=file_size,
+                             **creation_kwargs)
+        params = get_file_upload_params(handler.get_proj_id())
+        handler._empty_last_part_allowed = params['emptyLastPartAllowed']
+        handler._write_bufsize = dxfile._get_write_buf_size(write_buffer_size, params, file_size)
+        return _MultiFileUpload(handler, filename, file_size)
+
+    def close_upload(upload):
+        upload.dxfile.close(**remaining_kwargs)
+
+    progress = {"files": 0, "bytes": 0}
+
+    def print_progress():
+        sys.stderr.write("\33[2K")
+        sys.stderr.write("Uploaded {done_bytes:,} bytes in {done_files:,} files".format(done_bytes=progress["bytes"],
+                                                                                         done_files=progress["files"]))
+        sys.stderr.flush()
+        sys.stderr.write("\r")
+        sys.stderr.flush()
+
+    api_threadpool = dxpy.utils.get_futures_threadpool(UPLOAD_API_THREADS)
+    handlers = []
+    requests = iter(uploads)
+    # Futures of file/new calls -> position of the file in *uploads*
+    pending_new = {}
+    part_tasks = deque()
+    in_flight = set()
+    closing = []
+    try:
+        while True:
+            # Create new files only while the part queue is short, so
+            # that file/new calls run ahead of the part uploads without
+            # piling up parts that cannot be started yet.
+            while len(pending_new) < UPLOAD_API_THREADS and len(part_tasks) < max_parts_in_flight:
+                request = next(requests, None)
+                if request is None:
+                    break
+                pending_new[api_threadpool.submit(new_upload, request)] = len(handlers)
+                handlers.append(None)
+
+            while part_tasks and len(in_flight) < max_parts_in_flight:
+                upload, index, start, size = part_tasks.popleft()
+                in_flight.add(DXFile._http_threadpool.submit(_upload_part_from_local_file, upload, index, start,
+                                                              size, **remaining_kwargs))
+
+            if not (pending_new or in_flight):
+                break
+
+            future = dxpy.utils.wait_for_a_future(set(pending_new) | in_flight)
+            if future in pending_new:
+                upload = future.result()
+                handlers[pending_new.pop(future)] = upload.dxfile
+                for index, start, size in upload.part_ranges():
+                    part_tasks.append((upload, index, start, size))
+                    upload.parts_remaining += 1
+                if upload.parts_remaining > 0:
+                    continue
+            else:
+                in_flight.remove(future)
+                upload, size = future.result()
+                upload.parts_remaining -= 1
+                progress["bytes"] += size
+                if show_progress:
+                    print_progress()
+                if upload.parts_remaining > 0:
+                    continue
+            # All parts of the file have been uploaded
+            closing.append(api_threadpool.submit(close_upload, upload))
+            progress["files"] += 1
+            if show_progress:
+                print_progress()
+
+        for future in closing:
+            future.result()
+    except:
+        for future in list(pending_new) + list(in_flight) + closing:
+            future.cancel()
+        raise
+    finally:
+        api_threadpool.shutdown(wait=False)
+        if show_progress:
+            sys.stderr.write("\n")
+
+    if wait_on_close:
+        _wait_for_files_to_close([handler.get_id() for handler in handlers], **remaining_kwargs)
+
+    return handlers
+
 def upload_string(to_upload, media_type=None, keep_open=False, wait_on_close=False, **kwargs):
     """
     :param to_upload: String to upload into a file
@@ -704,23 +1462,25 @@ def download_folder(project, destdir, folder="/", overwrite=False, chunksize=dxf
         return
 
     # Now it is safe, in both python 2 and 3, to iterate on the generator
-    for remote_file in files_gen:
-        local_filename = os.path.join(compose_local_dir(normalized_dest_dir,
-                                                        normalized_folder,
-                                                        remote_file['describe']['folder']),
-                                      remote_file['describe']['name'])
-        if os.path.exists(local_filename) and not overwrite:
-            raise DXFileError(
-                "Destination file '{}' already exists but no overwrite option is provided".format(local_filename)
-            )
-        logger.debug("Downloading '%s/%s' remote file to '%s' location",
-                     ("" if remote_file['describe']['folder'] == "/" else remote_file['describe']['folder']),
-                     remote_file['describe']['name'],
-                     local_filename)
-        download_dxfile(remote_file['describe']['id'],
-                        local_filename,
-                        chunksize=chunksize,
-                        project=project,
-                        show_progress=show_progress,
-                        describe_output=remote_file['describe'],
-                        **kwargs)
+    def file_downloads():
+        for remote_file in files_gen:
+            local_filename = os.path.join(compose_local_dir(normalized_dest_dir,
+                                                            normalized_folder,
+                                                            remote_file['describe']['folder']),
+                                          remote_file['describe']['name'])
+            if os.path.exists(local_filename) and not overwrite:
+                raise DXFileError(
+                    "Destination file '{}' already exists but no overwrite option is provided".format(local_filename)
+                )
+            logger.debug("Downloading '%s/%s' remote file to '%s' location",
+                         ("" if remote_file['describe']['folder'] == "/" else remote_file['describe']['folder']),
+                         remote_file['describe']['name'],
+                         local_filename)
+            yield dict(dxid=remote_file['describe']['id'],
+                       filename=local_filename,
+                       project=project,
+                       describe_output=remote_file['describe'])
+
+    # All files are downloaded concurrently, which matters most when
+    # there are many small files
+    download_dxfiles(file_downloads(), chunksize=chunksize, show_progress=show_progress, **kwargs)
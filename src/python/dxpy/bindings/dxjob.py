@@ -25,11 +25,14 @@ app or applet. They can be created from either
 via :func:`new_dxjob` or :func:`DXJob.new` in the case of an existing
 job creating a subjob.
 
+Many jobs and analyses can be waited on together with
+:func:`wait_on_many`.
+
 """
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import os, time
+import os, random, time
 
 import dxpy
 from . import DXObject, DXDataObject, DXJobFailureError, verify_string_dxid
@@ -38,6 +41,9 @@ from ..system_requirements import SystemRequirementsDict
 from ..utils.local_exec_utils import queue_entry_point
 from ..compat import basestring
 
+DESCRIBE_EXECUTIONS_BATCH_SIZE = 1000
+WAIT_ON_MANY_MAX_INTERVAL = 60
+
 #########
 # DXJob #
 #########
@@ -384,3 +390,92 @@ class DXJob(DXObject):
         '''
 
         return self.describe(fields=dict(state=True), **kwargs)["state"]
+
+
+################
+# wait_on_many #
+################
+
+def _get_failure_error(desc):
+    kind = "Analysis" if desc["id"].startswith("analysis-") else "Job"
+    if desc["state"] == "terminated":
+        return DXJobFailureError("{} {} was terminated.".format(kind, desc["id"]))
+    err_msg = "{kind} {id} has failed because of {failureReason}: {failureMessage}".format(kind=kind, **desc)
+    if desc.get("failureFrom") != None and desc["failureFrom"]["id"] != desc["id"]:
+        err_msg += " (failure from {id})".format(id=desc['failureFrom']['id'])
+    return DXJobFailureError(err_msg)
+
+def wait_on_many(executions, interval=2, max_interval=WAIT_ON_MANY_MAX_INTERVAL, timeout=3600*24*7,
+                 fail_fast=True, **kwargs):
+    '''
+    :param executions: Jobs and analyses to wait for
+    :type executions: iterable of strings (execution IDs), :class:`DXJob`, or :class:`~dxpy.bindings.dxanalysis.DXAnalysis`
+    :param interval: Initial number of seconds between queries of the executions' states
+    :type interval: integer
+    :param max_interval: Maximum number of seconds between queries of the executions' states
+    :type max_interval: integer
+    :param timeout: Maximum amount of time to wait, in seconds, until all executions are done
+    :type timeout: integer
+    :param fail_fast: If True, raise an error as soon as any execution fails or is terminated; otherwise, failed executions are yielded like the others
+    :type fail_fast: boolean
+    :returns: Generator of the descriptions (including "id", "state", and the failure fields) of the executions, in the order in which they finish
+    :rtype: generator of dict
+    :raises: :exc:`~dxpy.exceptions.DXJobFailureError` if the timeout is reached before all executions have finished, or, if *fail_fast* is True, if any execution fails or is terminated
+
+    Waits until all of the given executions have finished running.
+    Instead of polling each execution separately, as
+    :meth:`DXJob.wait_on_done` does, the states of all executions that
+    are still running are queried together with
+    :meth:`~dxpy.api.system_describe_executions` (in batches of up to
+    1000). The time between queries starts at *interval* and doubles
+    after each query, up to *max_interval*; it goes back to *interval*
+    whenever an execution finishes. Each wait is shortened by a random
+    amount of up to half, so that many clients do not query in step.
+
+    Example::
+
+        for desc in wait_on_many(job_ids):
+            print(desc["id"], "is done")
+
+    '''
+    pending, seen = [], set()
+    for execution in executions:
+        execution_id = execution.get_id() if isinstance(execution, DXObject) else execution
+        if execution_id not in seen:
+            pending.append(execution_id)
+            seen.add(execution_id)
+
+    describe_input = {"fields": {field: True for field in ("id", "state", "failureReason", "failureMessage",
+                                                           "failureFrom")}}
+    current_interval = interval
+    time_started = time.time()
+    while pending:
+        still_running = []
+        for batch_start in range(0, len(pending), DESCRIBE_EXECUTIONS_BATCH_SIZE):
+            batch = pending[batch_start:batch_start + DESCRIBE_EXECUTIONS_BATCH_SIZE]
+            executions_input = [{"id": execution_id, "describe": describe_input} for execution_id in batch]
+            results = dxpy.api.system_describe_executions({"executions": executions_input}, **kwargs)["results"]
+            for execution_id, result in zip(batch, results):
+                desc = result.get("describe")
+                if desc is None:
+                    raise DXError("Could not describe execution {}".format(execution_id))
+                if desc["state"] in ("failed", "partially_failed", "terminated"):
+                    if fail_fast:
+                        raise _get_failure_error(desc)
+                    yield desc
+                elif desc["state"] == "done":
+                    yield desc
+                else:
+                    still_running.append(execution_id)
+
+        if not still_running:
+            break
+        if len(still_running) < len(pending):
+            current_interval = interval
+        pending = still_running
+
+        elapsed = time.time() - time_started
+        if elapsed >= timeout or elapsed < 0:
+            raise DXJobFailureError("Reached timeout while waiting for {} executions to finish".format(len(pending)))
+        time.sleep(min(random.uniform(current_interval / 2.0, current_interval), timeout - elapsed))
+        current_interval = min(current_interval * 2, max_interval)
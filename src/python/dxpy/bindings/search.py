@@ -24,12 +24,28 @@ provides search functionality over all data objects in the system. The
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+from threading import Lock
+
 import dxpy
 from . import DXApplet, DXApp, DXWorkflow, DXProject, DXJob, DXAnalysis
 from ..exceptions import DXError, DXSearchError
+from ..utils import get_futures_threadpool, response_iterator
+
+RESOLVE_DATA_OBJECTS_THREADS = 4
+
+_resolve_threadpool = None
+_resolve_threadpool_mutex = Lock()
+
+def _get_resolve_threadpool():
+    global _resolve_threadpool
+    with _resolve_threadpool_mutex:
+        if _resolve_threadpool is None:
+            _resolve_threadpool = get_futures_threadpool(max_workers=RESOLVE_DATA_OBJECTS_THREADS)
+        return _resolve_threadpool
 
 
-def resolve_data_objects(objects, project=None, folder=None, batchsize=1000):
+def resolve_data_objects(objects, project=None, folder=None, batchsize=1000,
+                         max_active_batches=RESOLVE_DATA_OBJECTS_THREADS, max_retries=dxpy.DEFAULT_RETRIES):
     """
     :param objects: Data object specifications, each with fields "name"
                     (required), "folder", and "project"
@@ -45,6 +61,12 @@ def resolve_data_objects(objects, project=None, folder=None, batchsize=1000):
                       only used for testing (must be a positive integer not
                       exceeding 1000)
     :type batchsize: int
+    :param max_active_batches: Maximum number of batch calls in flight at
+                               any time; 1 makes the calls one after another
+    :type max_active_batches: int
+    :param max_retries: Maximum number of times each batch call is retried
+                        after a failure
+    :type max_retries: int
     :returns: List of results parallel to input objects, where each
               entry is a list containing 0 or more dicts, each corresponding
               to a resolved object
@@ -52,6 +74,9 @@ def resolve_data_objects(objects, project=None, folder=None, batchsize=1000):
 
     Each returned element is a list of dictionaries with keys "project" and
     "id". The number of dictionaries for each element may be 0, 1, or more.
+
+    The batches are resolved concurrently, and their results are
+    collected in the order of *objects*.
     """
     if not isinstance(batchsize, int) or batchsize <= 0 or batchsize > 1000:
         raise ValueError("batchsize for resolve_data_objects must be a positive integer not exceeding 1000")
@@ -61,12 +86,19 @@ def resolve_data_objects(objects, project=None, folder=None, batchsize=1000):
     if folder:
         args.update({'folder': folder})
 
-    results = []
+    def resolve_batch(batch):
+        return dxpy.api.system_resolve_data_objects(dict(args, objects=batch), max_retries=max_retries)['results']
 
     # Call API method /system/resolveDataObjects in groups of size batchsize
-    for i in range(0, len(objects), batchsize):
-        args.update({'objects': objects[i:(i+batchsize)]})
-        results.extend(dxpy.api.system_resolve_data_objects(args)['results'])
+    requests = ((resolve_batch, [objects[i:(i+batchsize)]], {}) for i in range(0, len(objects), batchsize))
+    results = []
+    if max_active_batches <= 1 or len(objects) <= batchsize:
+        for func, func_args, _kwargs in requests:
+            results.extend(func(*func_args))
+        return results
+    for batch_results in response_iterator(requests, _get_resolve_threadpool(), max_active_tasks=max_active_batches,
+                                           do_first_task_sequentially=False):
+        results.extend(batch_results)
     return results
 
 
@@ -21,9 +21,12 @@ almost exclusively by command-line tools such as dx.
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import sys
+import sys, importlib
 
-INTERACTIVE_CLI = sys.stdin and sys.stdin.isatty() and sys.stdout and sys.stdout.isatty()
+def is_interactive():
+    return bool(sys.stdin and sys.stdin.isatty() and sys.stdout and sys.stdout.isatty())
+
+INTERACTIVE_CLI = is_interactive()
 
 from ..exceptions import err_exit, default_expected_exceptions, DXError
 from ..compat import input
@@ -37,6 +40,22 @@ def try_call(func, *args, **kwargs):
     except:
         try_call_err_exit()
 
+def lazy_handler(module_name, func_name):
+    '''
+    :param module_name: Fully qualified name of the module defining the handler
+    :type module_name: string
+    :param func_name: Name of the handler in that module
+    :type func_name: string
+    :returns: Function which imports the module on its first call and then calls the handler
+
+    Used for the handlers of subcommands whose modules are slow to
+    import, so that they are only imported when the subcommand is run.
+    '''
+    def handler(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), func_name)(*args, **kwargs)
+    handler.__name__ = str(func_name)
+    return handler
+
 def prompt_for_yn(prompt_str, default=None):
     if default == True:
         prompt = prompt_str + ' [Y/n]: '
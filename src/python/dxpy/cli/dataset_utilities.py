@@ -34,6 +34,7 @@ from ..bindings.dxdataobject_functions import is_dxlink
 from ..bindings.dxfile import DXFile
 from ..utils.resolver import resolve_existing_path, is_hashid, ResolutionError
 from ..utils.file_handle import as_handle
+from ..utils.json_stream import JSONStreamReader
 from ..exceptions import (
     err_exit,
     PermissionDenied,
@@ -123,6 +124,18 @@ def raw_query_api_call(resp, payload):
     return sql_results
 
 
+def raw_api_error_message(error, sql_message=True):
+    if error["type"] == "InvalidInput":
+        err_message = "Insufficient permissions due to the project policy.\n" + error["message"]
+    elif sql_message and error["type"] == "QueryTimeOut":
+        err_message = "Please consider using `--sql` option to generate the SQL query and query via a private compute cluster.\n" + error["message"]
+    elif error["type"] == "QueryBuilderError" and error["details"] == "rsid exists in request filters without rsid entries in rsid_lookup_table.":
+        err_message = "At least one rsID provided in the filter is not present in the provided dataset or cohort"
+    else:
+        err_message = error
+    return err_message
+
+
 def raw_api_call(resp, payload, sql_message=True):
     resource_val = resp["url"] + "/data/3.0/" + resp["dataset"] + "/raw"
     try:
@@ -130,22 +143,49 @@ def raw_api_call(resp, payload, sql_message=True):
             resource=resource_val, data=payload, prepend_srv=False
         )
         if "error" in resp_raw.keys():
-            if resp_raw["error"]["type"] == "InvalidInput":
-                err_message = "Insufficient permissions due to the project policy.\n" + resp_raw["error"]["message"]
-                
-            elif sql_message and resp_raw["error"]["type"] == "QueryTimeOut":
-
-                err_message = "Please consider using `--sql` option to generate the SQL query and query via a private compute cluster.\n" + resp_raw["error"]["message"]        
-            elif resp_raw["error"]["type"] == "QueryBuilderError" and resp_raw["error"]["details"] == "rsid exists in request filters without rsid entries in rsid_lookup_table.":
-                err_message = "At least one rsID provided in the filter is not present in the provided dataset or cohort"
-            else:
-                err_message = resp_raw["error"]
-            err_exit(err_message)
+            err_exit(raw_api_error_message(resp_raw["error"], sql_message))
     except Exception as details:
         err_exit(str(details))
     return resp_raw
 
 
+def stream_raw_api_call(resp, payload, sql_message=True):
+    """
+    Same query as raw_api_call, but returns an iterator over the "results" of the query, which are parsed as
+    they are received, so that memory use does not grow with the number of results. Errors returned before
+    the results are reported before this function returns.
+    """
+    resource_val = resp["url"] + "/data/3.0/" + resp["dataset"] + "/raw"
+    try:
+        response = dxpy.DXHTTPRequest(
+            resource=resource_val, data=payload, prepend_srv=False, want_full_response=True, preload_content=False
+        )
+        items = JSONStreamReader(response).iter_items(stream_keys={"results"})
+        results = iter(())
+        for key, value in items:
+            if key == "error":
+                err_exit(raw_api_error_message(value, sql_message))
+            elif key == "results":
+                results = value
+                break
+    except Exception as details:
+        err_exit(str(details))
+
+    def iter_results():
+        try:
+            for row in results:
+                yield row
+            for key, value in items:
+                if key == "error":
+                    err_exit(raw_api_error_message(value, sql_message))
+        except Exception as details:
+            err_exit(str(details))
+        finally:
+            response.release_conn()
+
+    return iter_results()
+
+
 def extract_dataset(args):
     """
     Retrieves the data or generates SQL to retrieve the data from a dataset or cohort for a set of entity.fields. Additionally, the dataset’s dictionary can be extracted independently or in conjunction with data.
@@ -382,12 +422,11 @@ def extract_dataset(args):
                 with open(out_file_field, "w") as f:
                     print(sql_results, file=f)
         else:
-            resp_raw = raw_api_call(resp, payload)
             csv_from_json(
                 out_file_name=out_file_field,
                 print_to_stdout=print_to_stdout,
                 sep=delimiter,
-                raw_results=resp_raw["results"],
+                raw_results=stream_raw_api_call(resp, payload),
                 column_names=fields_list,
             )
 
@@ -786,17 +825,19 @@ def extract_assay_germline(args):
                 with open(out_file, "w") as sql_file:
                     print(sql_results, file=sql_file)
         else:
-            resp_raw = raw_api_call(resp, payload)
+            raw_results = stream_raw_api_call(resp, payload)
             if args.retrieve_genotype:
-                for r in resp_raw["results"]:
+                def rename_hom_genotype(r):
                     if r["genotype_type"] == "hom":
                         r["genotype_type"] = "hom-alt"
+                    return r
+                raw_results = (rename_hom_genotype(r) for r in raw_results)
 
             csv_from_json(
                 out_file_name=out_file,
                 print_to_stdout=print_to_stdout,
                 sep="\t",
-                raw_results=resp_raw["results"],
+                raw_results=raw_results,
                 column_names=fields_list,
                 quote_char=str("|"),
             )
@@ -1031,13 +1072,11 @@ def extract_assay_somatic(args):
                 with open(out_file, "w") as sql_file:
                     print(sql_results, file=sql_file)
         else:
-            resp_raw = raw_api_call(resp, payload)
-
             csv_from_json(
                 out_file_name=out_file,
                 print_to_stdout=print_to_stdout,
                 sep="\t",
-                raw_results=resp_raw["results"],
+                raw_results=stream_raw_api_call(resp, payload),
                 column_names=fields_list,
                 quote_char=str("\t"),
                 quoting=csv.QUOTE_NONE,
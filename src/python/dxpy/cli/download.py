@@ -30,7 +30,7 @@ import logging
 import dxpy
 from ..utils.resolver import (resolve_existing_path, get_first_pos_of_char, is_project_explicit,
                               object_exists_in_project, is_jbor_str)
-from ..exceptions import err_exit
+from ..exceptions import err_exit, DXCLIError
 from . import try_call
 from dxpy.utils.printing import (fill)
 from dxpy.utils import pathmatch
@@ -160,11 +160,45 @@ def _rel2abs(path, project):
 
 
 def _download_files(files, destdir, args, dest_filename=None):
-    for project in files:
-        for f in files[project]:
-            file_desc = f['describe']
-            dest = dest_filename or os.path.join(destdir, file_desc['name'].replace('/', '%2F'))
-            download_one_file(project, file_desc, dest, args)
+    if sum(len(files[project]) for project in files) <= 1:
+        for project in files:
+            for f in files[project]:
+                file_desc = f['describe']
+                dest = dest_filename or os.path.join(destdir, file_desc['name'].replace('/', '%2F'))
+                download_one_file(project, file_desc, dest, args)
+        return
+
+    # Many files: download them all concurrently. Names are not unique, so
+    # files whose destination was already taken by an earlier file are
+    # downloaded afterwards, one at a time, as they would be one by one
+    dests, later_downloads = set(), []
+
+    def file_downloads():
+        for project in files:
+            for f in files[project]:
+                file_desc = f['describe']
+                dest = dest_filename or os.path.join(destdir, file_desc['name'].replace('/', '%2F'))
+                if os.path.abspath(dest) in dests:
+                    later_downloads.append((project, file_desc, dest))
+                    continue
+                dests.add(os.path.abspath(dest))
+                if not args.overwrite and os.path.exists(dest):
+                    raise DXCLIError('path "' + dest + '" already exists but -f/--overwrite was not set')
+                if file_desc['class'] != 'file':
+                    print("Skipping non-file data object {name} ({id})".format(**file_desc), file=sys.stderr)
+                elif file_desc['state'] != 'closed':
+                    print("Skipping file {name} ({id}) because it is not closed".format(**file_desc), file=sys.stderr)
+                else:
+                    yield dict(dxid=file_desc['id'], filename=dest, project=project, describe_output=file_desc)
+
+    try:
+        dxpy.download_dxfiles(file_downloads(),
+                              show_progress=vars(args).get('show_progress', False),
+                              symlink_max_tries=vars(args).get('symlink_max_tries') or 15)
+    except:
+        err_exit()
+    for project, file_desc, dest in later_downloads:
+        download_one_file(project, file_desc, dest, args)
 
 
 def _download_folders(folders, destdir, args):
@@ -2,9 +2,9 @@ import json
 
 from ..exceptions import err_exit, ResourceNotFound
 from .input_validation import validate_filter
+from .. import logger
 import os
 import dxpy
-import subprocess
 
 extract_utils_basepath = os.path.join(
     os.path.dirname(dxpy.__file__), "dx_extract_utils"
@@ -25,6 +25,67 @@ with open(
     column_conditions = json.load(infile)
 
 
+GENO_BINS_CACHE_DIRNAME = "geno_bins"
+
+# Manifests and gene-to-bin indexes already loaded by this process
+_geno_bin_manifests = {}
+_geno_bin_indexes = {}
+
+
+def load_geno_bin_manifest(filename):
+    """
+    Returns the manifest of gene bin files, by genome reference and region, stored in *filename*
+    """
+    if filename not in _geno_bin_manifests:
+        with open(os.path.join(extract_utils_basepath, filename), "r") as geno_bin_manifest:
+            _geno_bin_manifests[filename] = json.load(geno_bin_manifest)
+    return _geno_bin_manifests[filename]
+
+
+def get_geno_bins_cache_path(file_id):
+    return os.path.join(dxpy.config.get_user_conf_dir(), GENO_BINS_CACHE_DIRNAME, file_id + ".json")
+
+
+def load_geno_bins(file_id):
+    """
+    Returns the index from gene names and IDs to geno bins stored in the file *file_id*.
+    The file is downloaded once and the index is kept in the dxpy user configuration directory;
+    files cannot be modified once closed, so the local copy never needs to be refreshed.
+    """
+    if file_id in _geno_bin_indexes:
+        return _geno_bin_indexes[file_id]
+
+    cache_path = get_geno_bins_cache_path(file_id)
+    geno_bins = None
+    try:
+        with open(cache_path, "r") as cached_geno_bins:
+            geno_bins = json.load(cached_geno_bins)
+    except (IOError, OSError, ValueError):
+        pass
+
+    if geno_bins is None:
+        with dxpy.DXFile(file_id, mode="rb") as geno_bins_file:
+            geno_bins = json.loads(geno_bins_file.read().decode("utf-8"))
+        # The strand is not used in the payload, so it is not kept
+        for bin in geno_bins.values():
+            bin.pop("strand", None)
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, 0o700)
+            # Written under a temporary name first, so that concurrent
+            # processes never read a partial index
+            temp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+            with open(temp_path, "w") as cached_geno_bins:
+                json.dump(geno_bins, cached_geno_bins, separators=(",", ":"))
+            os.rename(temp_path, cache_path)
+        except (IOError, OSError) as e:
+            logger.debug("Unable to cache the geno bins of %s: %s", file_id, e)
+
+    _geno_bin_indexes[file_id] = geno_bins
+    return geno_bins
+
+
 def retrieve_geno_bins(list_of_genes, project, genome_reference):
     """
     A function for determining appropriate geno bins to attach to a given annotation$gene_name
@@ -33,35 +94,24 @@ def retrieve_geno_bins(list_of_genes, project, genome_reference):
     project_desc = dxpy.describe(project)
     geno_positions = []
 
-    try:
-        with open(
-            os.path.join(extract_utils_basepath, "Homo_sapiens_genes_manifest.json"),
-            "r",
-        ) as geno_bin_manifest:
-            r = json.load(geno_bin_manifest)
-        dxpy.describe(r[genome_reference][project_desc["region"]])
-    except ResourceNotFound:
-        with open(
-            os.path.join(
-                extract_utils_basepath, "Homo_sapiens_genes_manifest_staging.json"
-            ),
-            "r",
-        ) as geno_bin_manifest:
-            r = json.load(geno_bin_manifest)
-
-    geno_bins = subprocess.check_output(
-        ["dx", "cat", r[genome_reference][project_desc["region"]]]
-    )
-    geno_bins_json = json.loads(geno_bins)
+    file_id = load_geno_bin_manifest("Homo_sapiens_genes_manifest.json")[genome_reference][project_desc["region"]]
+    if file_id not in _geno_bin_indexes and not os.path.exists(get_geno_bins_cache_path(file_id)):
+        try:
+            dxpy.describe(file_id)
+        except ResourceNotFound:
+            file_id = load_geno_bin_manifest("Homo_sapiens_genes_manifest_staging.json")[genome_reference][
+                project_desc["region"]
+            ]
+
+    geno_bins = load_geno_bins(file_id)
     invalid_genes = []
 
     for gene in list_of_genes:
-        bin = geno_bins_json.get(gene)
+        bin = geno_bins.get(gene)
         if bin is None:
             invalid_genes.append(gene)
         else:
-            bin.pop("strand")
-            geno_positions.append(bin)
+            geno_positions.append(dict(bin))
 
     if invalid_genes:
         err_exit("Following gene names or IDs are invalid: %r" % invalid_genes)
@@ -16,7 +16,8 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import socket, json, time, os, logging
+import socket, json, time, os, logging, threading
+from collections import deque
 
 from logging.handlers import SysLogHandler
 
@@ -38,10 +39,22 @@ class DXLogHandler(SysLogHandler):
         from dxpy.dxlog import DXLogHandler
         logging.getLogger().addHandler(DXLogHandler())
 
+    By default, each record is serialized and sent on the thread that
+    logs it. If *queue_size* is given, records are instead queued and
+    sent from a background thread, so that logging does not slow down
+    the application. At most *queue_size* records wait in the queue:
+    while it is full, a record with the same level and message as the
+    last queued one is coalesced with it (and sent once, with the
+    number of repeats), other records are dropped (and a message
+    reporting how many were dropped is sent later), and critical
+    records wait for room. Counters are available through
+    :meth:`get_queue_stats`; :meth:`flush` waits until the queue is
+    empty.
+
     '''
     def __init__(self, priority_log_address="/opt/dnanexus/log/priority",
                  bulk_log_address="/opt/dnanexus/log/bulk",
-                 source="DX_APP"):
+                 source="DX_APP", queue_size=None):
         logging.Handler.__init__(self)
 
         self.priority_log_address = priority_log_address
@@ -60,11 +73,50 @@ class DXLogHandler(SysLogHandler):
 
         self.source = source
 
+        self.queue_size = queue_size
+        self.sent, self.dropped, self.coalesced = 0, 0, 0
+        self._dropped_unreported = 0
+        # Queued records, as [record, priority name, message, timestamp, repeats]
+        self._queue = deque()
+        self._queue_cond = threading.Condition()
+        self._sending = False
+        self._closing = False
+        self._sender = None
+        if queue_size is not None:
+            if queue_size < 1:
+                raise DXError("queue_size must be positive")
+            self._sender = threading.Thread(target=self._send_queued_records)
+            self._sender.daemon = True
+            self._sender.start()
+
+    def flush(self):
+        '''
+        Waits until all queued records have been sent.
+        '''
+        with self._queue_cond:
+            while self._queue or self._sending:
+                self._queue_cond.wait()
+
     def close(self):
+        if self._sender is not None:
+            with self._queue_cond:
+                self._closing = True
+                self._queue_cond.notify_all()
+            self._sender.join()
+            self._sender = None
         self.priority_log_socket.close()
         self.bulk_log_socket.close()
         logging.Handler.close(self)
 
+    def get_queue_stats(self):
+        '''
+        :returns: Number of records sent, dropped because the queue was full, and coalesced with a queued record with the same message, and the number of records in the queue
+        :rtype: dict
+        '''
+        with self._queue_cond:
+            return {"sent": self.sent, "dropped": self.dropped, "coalesced": self.coalesced,
+                    "queued": len(self._queue)}
+
     def encodePriority(self, record):
         # See logging.handlers.SysLogHandler for an explanation of this.
         return self.priority_names[self.priority_map.get(record.levelname, "warning")]
@@ -75,12 +127,18 @@ class DXLogHandler(SysLogHandler):
         if len(json.dumps(message)) <= 8015:
             return message
 
-        msg_bytes = msg_bytes[:8000]
-        while len(json.dumps(_bytes2utf8(msg_bytes))) > 8000:
-            msg_bytes = msg_bytes[:-1]
-
-        message = _bytes2utf8(msg_bytes)
-        message = message.encode('utf-8') if USING_PYTHON2 else message
+        # Keep the longest prefix of the first 8000 bytes whose JSON
+        # encoding (with its quotes) is at most 8000 characters long,
+        # adding up the encoded length of each character in one pass
+        text = _bytes2utf8(msg_bytes[:8000])
+        json_length = 2
+        for i, char in enumerate(text):
+            json_length += _json_escaped_length(char)
+            if json_length > 8000:
+                text = text[:i]
+                break
+
+        message = text.encode('utf-8') if USING_PYTHON2 else text
         return message + "... [truncated]"
 
     def is_resource_log(self, message):
@@ -91,6 +149,54 @@ class DXLogHandler(SysLogHandler):
     def emit(self, record):
         level = self.encodePriority(record)
         message = record.getMessage()
+        timestamp = int(round(time.time() * 1000))
+        if self._sender is None:
+            self._send(record, level, message, timestamp)
+            return
+
+        with self._queue_cond:
+            if self._closing:
+                return
+            if len(self._queue) >= self.queue_size:
+                last = self._queue[-1]
+                if last[0].levelno == record.levelno and last[2] == message:
+                    last[4] += 1
+                    self.coalesced += 1
+                    return
+                if record.levelno < logging.CRITICAL:
+                    self.dropped += 1
+                    self._dropped_unreported += 1
+                    return
+                while len(self._queue) >= self.queue_size and not self._closing:
+                    self._queue_cond.wait()
+            self._queue.append([record, level, message, timestamp, 0])
+            self._queue_cond.notify_all()
+
+    def _send_queued_records(self):
+        while True:
+            with self._queue_cond:
+                while not self._queue and not self._closing:
+                    self._queue_cond.wait()
+                if not self._queue:
+                    return
+                record, level, message, timestamp, repeats = self._queue.popleft()
+                dropped, self._dropped_unreported = self._dropped_unreported, 0
+                self._sending = True
+                self._queue_cond.notify_all()
+            try:
+                if repeats > 0:
+                    message = "{} [repeated {} more times]".format(message, repeats)
+                self._send(record, level, message, timestamp)
+                if dropped > 0:
+                    self._send(record, self.priority_names["warning"],
+                               "{} log messages were dropped because the log queue was full".format(dropped),
+                               int(round(time.time() * 1000)), priority=False)
+            finally:
+                with self._queue_cond:
+                    self._sending = False
+                    self._queue_cond.notify_all()
+
+    def _send(self, record, level, message, timestamp, priority=None):
         # The Linux domain socket datagram size limit is 8 KB, but
         # with the extra padding introduced by the log function, the
         # incoming message needs to be smaller - we truncate it to
@@ -100,11 +206,13 @@ class DXLogHandler(SysLogHandler):
         # with wide chars, its byte length would exceed the limit.
         message = self.truncate_message(message)
 
-        data = json.dumps({"source": self.source, "timestamp": int(round(time.time() * 1000)),
+        data = json.dumps({"source": self.source, "timestamp": timestamp,
                            "level": level, "msg": message}).encode('utf-8', 'ignore')
 
-        levelno = int(record.levelno)
-        if levelno >= logging.CRITICAL or (levelno == logging.INFO and self.is_resource_log(message)):
+        if priority is None:
+            levelno = int(record.levelno)
+            priority = levelno >= logging.CRITICAL or (levelno == logging.INFO and self.is_resource_log(message))
+        if priority:
             # Critical, alert, emerg, or resource status
             cur_socket = self.priority_log_socket
             cur_socket_address = self.priority_log_address
@@ -114,14 +222,30 @@ class DXLogHandler(SysLogHandler):
 
         try:
             cur_socket.send(data)
+            self.sent += 1
         except socket.error:
             cur_socket.connect(cur_socket_address)
             cur_socket.send(data)
+            self.sent += 1
         except (KeyboardInterrupt, SystemExit):
             raise
         except:
             self.handleError(record)
 
+def _json_escaped_length(char):
+    """
+    Returns the length of *char* in the output of json.dumps, which escapes control characters, quotes, and
+    backslashes, and writes non-ASCII characters as \\uXXXX (or as a surrogate pair of them).
+    """
+    codepoint = ord(char)
+    if char in '"\\\b\f\n\r\t':
+        return 2
+    elif codepoint < 0x20 or 0x80 <= codepoint < 0x10000:
+        return 6
+    elif codepoint < 0x80:
+        return 1
+    return 12
+
 def _bytes2utf8(bytes):
     """
     Convert bytes to a UTF-8 string and ignore UnicodeDecodeError for chars that could have been messed up by truncating.
@@ -32,9 +32,12 @@ import re
 import collections
 
 from .utils.resolver import resolve_path, is_container_id
+from .utils import get_futures_threadpool
 from .cli import try_call
 import dxpy
 
+MAX_REGION_THREADS = 16
+
 GLOBAL_EXEC_NAME_RE = re.compile("^[a-zA-Z0-9._\-]+$")
 GLOBAL_EXEC_VERSION_RE = re.compile("^([1-9][0-9]*|0)\.([1-9][0-9]*|0)\.([1-9][0-9]*|0)(-[-0-9A-Za-z]+(\.[-0-9A-Za-z]+)*)?(\+[-0-9A-Za-z]+(\.[-0-9A-Za-z]+)*)?$")
 
@@ -88,15 +91,51 @@ def inline_documentation_files(json_spec, src_dir):
                 break
 
 
+def run_in_regions(fn, args_by_region):
+    """
+    :param fn: Function called as fn(region, arg) for each region
+    :type fn: function
+    :param args_by_region: Argument for each region
+    :type args_by_region: dict
+    :returns: Values returned by *fn* by region, and the first exception raised by *fn* (or None)
+    :rtype: tuple
+
+    Calls *fn* for all regions concurrently, and waits for all calls to
+    finish even if some fail, so that the caller can clean up after the
+    calls that succeeded.
+    """
+    results_by_region, error = {}, None
+    if len(args_by_region) <= 1:
+        for region, arg in args_by_region.items():
+            try:
+                results_by_region[region] = fn(region, arg)
+            except Exception as e:
+                error = e
+        return results_by_region, error
+
+    threadpool = get_futures_threadpool(max_workers=min(len(args_by_region), MAX_REGION_THREADS))
+    try:
+        futures = dict((region, threadpool.submit(fn, region, arg)) for region, arg in args_by_region.items())
+        for region, future in futures.items():
+            try:
+                results_by_region[region] = future.result()
+            except Exception as e:
+                error = error or e
+    finally:
+        threadpool.shutdown(wait=True)
+    return results_by_region, error
+
+
 def delete_temporary_projects(projects):
     """
     Destroys all projects from the list.
     """
-    for project in projects:
+    def destroy(_, project):
         try:
             dxpy.api.project_destroy(project)
         except Exception:
             pass
+    run_in_regions(destroy, dict(enumerate(projects)))
 
 def get_valid_bill_to(bill_to, executable_builder_exception):
     """
@@ -14,7 +14,6 @@ from dxpy.cli.exec_io import parse_obj
 from dxpy.cli import try_call
 from dxpy.utils.resolver import resolve_existing_path
 
-from distutils.dir_util import copy_tree
 
 parser = argparse.ArgumentParser(description="Uploads a DNAnexus App.")
 
@@ -97,6 +96,9 @@ def prepare_nextflow(resources_dir, profile, region):
     if not glob(os.path.join(resources_dir, "*.nf")):
         raise dxpy.app_builder.AppBuilderException(
             "Directory %s does not contain Nextflow file (*.nf): not a valid Nextflow directory" % resources_dir)
+    # distutils pulls in setuptools, which is slow to import, so it is
+    # only imported when a Nextflow applet is actually being built
+    from distutils.dir_util import copy_tree
     dxapp_dir = tempfile.mkdtemp(prefix=".dx.nextflow")
 
     custom_inputs = prepare_custom_inputs(schema_file=os.path.join(resources_dir, "nextflow_schema.json"))
@@ -33,14 +33,11 @@ wrap_stdio_in_codecs()
 decode_command_line_args()
 
 import dxpy
-from dxpy.scripts import dx_build_app
-from dxpy import workflow_builder
 from dxpy.exceptions import PermissionDenied, InvalidState, ResourceNotFound
 
-from ..cli import try_call, prompt_for_yn, INTERACTIVE_CLI
+from ..cli import try_call, prompt_for_yn, lazy_handler, INTERACTIVE_CLI
 from ..cli import workflow as workflow_cli
 from ..cli.cp import cp
-from ..cli.dataset_utilities import extract_dataset, extract_assay_germline, extract_assay_somatic
 from ..cli.download import (download_one_file, download_one_database_file, download)
 from ..cli.parsers import (no_color_arg, delim_arg, env_args, stdout_args, all_arg, json_arg, try_arg, parser_dataobject_args,
                            parser_single_dataobject_output_args, process_properties_args,
@@ -52,6 +49,7 @@ from ..cli.parsers import (no_color_arg, delim_arg, env_args, stdout_args, all_a
 from ..cli.exec_io import (ExecutableInputs, format_choices_or_suggestions)
 from ..cli.org import (get_org_invite_args, add_membership, remove_membership, update_membership, new_org, update_org,
                        find_orgs, org_find_members, org_find_projects, org_find_apps)
+from ..bindings.dxjob import DESCRIBE_EXECUTIONS_BATCH_SIZE
 from ..exceptions import (err_exit, DXError, DXCLIError, DXAPIError, network_exceptions, default_expected_exceptions,
                           format_exception)
 from ..utils import warn, group_array_by_field, normalize_timedelta, normalize_time_input, merge
@@ -67,10 +65,12 @@ from ..utils.resolver import (clean_folder_path, pick, paginate_and_pick, is_has
                               resolve_existing_path, get_app_from_path, resolve_app, resolve_global_executable, get_exec_handler,
                               split_unescaped, ResolutionError, resolve_to_objects_or_project, is_project_explicit,
                               object_exists_in_project, is_jbor_str, parse_input_keyval)
+from ..utils.completion_cache import discard_completion_cache
 from ..utils.completer import (path_completer, DXPathCompleter, DXAppCompleter, LocalCompleter,
                                ListCompleter, MultiCompleter)
 from ..utils.describe import (print_data_obj_desc, print_desc, print_ls_desc, get_ls_l_desc, print_ls_l_header,
-                              print_ls_l_desc, get_ls_l_desc_fields, get_io_desc, get_find_executions_string)
+                              print_ls_l_desc, get_ls_l_desc_fields, get_io_desc, get_find_executions_string,
+                              get_size_str)
 from ..system_requirements import SystemRequirementsDict
 try:
    from urllib.parse import urlparse
@@ -173,10 +173,13 @@ def set_delim(args=argparse.Namespace()):
 args_list = sys.argv[1:]
 
 # Loading other variables used for pretty-printing
-if "LESS" in os.environ:
-    os.environ["LESS"] = os.environ["LESS"] + " -RS"
-else:
-    os.environ["LESS"] = "-RS"
+def set_pager_env():
+    if "LESS" in os.environ:
+        os.environ["LESS"] = os.environ["LESS"] + " -RS"
+    else:
+        os.environ["LESS"] = "-RS"
+
+set_pager_env()
 
 # This completer is for the command line in the shell (i.e., `dx sh`). It
 # assumes the first word is always a subcommand and that if the first word is a
@@ -1114,7 +1117,46 @@ def tree(args):
     except:
         err_exit()
 
+def describe_data_objects(args):
+    '''
+    Describes several data objects, given by ID, using as few API calls as
+    possible.
+    '''
+    try:
+        if not all(is_data_obj_id(path) for path in args.path):
+            raise DXCLIError('When describing more than one path, each must be a data object ID')
+        if args.name and (args.verbose or args.details or args.json):
+            raise DXCLIError('Cannot request --name in addition to one of --verbose, --details, or --json')
+        if args.job_try is not None:
+            raise DXCLIError('Parameter --try T can be used only when describing jobs')
+
+        json_output = []
+        missing = []
+        get_result_str = ResultCounter()
+        descs = dxpy.bulk_describe(args.path, describe={"properties": True, "details": True},
+                                   project=dxpy.WORKSPACE_ID)
+        for path, desc in zip(args.path, descs):
+            if desc is None:
+                missing.append(path)
+            elif args.json:
+                json_output.append(desc)
+            elif args.name:
+                print(desc['name'])
+            else:
+                print(get_result_str())
+                print_desc(desc, args.verbose or args.details)
+
+        if missing:
+            raise DXCLIError('No match found for ' + ', '.join(missing))
+        if args.json:
+            print(json.dumps(json_output, indent=4))
+    except:
+        err_exit()
+
 def describe(args):
+    if len(args.path) > 1:
+        return describe_data_objects(args)
+    args.path = args.path[0]
 
     def describe_global_executable(json_output, args, exec_type):
         """
@@ -2020,6 +2062,8 @@ def cat(args):
 
 
 def download_or_cat(args):
+    if args.show_progress is None:
+        args.show_progress = sys.stderr.isatty()
     if args.output == '-':
         cat_args = parser.parse_args(['cat'] + args.paths)
         cat_args.unicode_text = args.unicode_text
@@ -2061,6 +2105,8 @@ def head(args):
             err_exit()
 
 def upload(args, **kwargs):
+    if args.show_progress is None:
+        args.show_progress = sys.stderr.isatty()
     if args.output is not None and args.path is not None:
         raise DXParserError('Error: Cannot provide both the -o/--output and --path/--destination arguments')
     elif args.path is None:
@@ -2100,25 +2146,10 @@ def upload_one(args):
     if os.path.isdir(args.filename):
         if not args.recursive:
             err_exit('Error: {f} is a directory but the -r/--recursive option was not given'.format(f=args.filename), 3)
-        norm_path = os.path.realpath(args.filename)
-        if norm_path in upload_seen_paths:
-            print("Skipping {f}: directory loop".format(f=args.filename), file=sys.stderr)
-            return
-        else:
-            upload_seen_paths.add(norm_path)
-
-        dir_listing = os.listdir(args.filename)
-        if len(dir_listing) == 0: # Create empty folder
-            dxpy.api.project_new_folder(project, {"folder": os.path.join(folder, os.path.basename(args.filename)),
-                                                  "parents": True})
-        else:
-            for f in dir_listing:
-                sub_args = copy.copy(args)
-                sub_args.mute = True
-                sub_args.filename = os.path.join(args.filename, f)
-                sub_args.path = "{p}:{f}/{sf}/".format(p=project, f=folder, sf=os.path.basename(args.filename))
-                sub_args.parents = True
-                upload_one(sub_args)
+        # A directory given with a trailing slash ("dir/") has an empty
+        # basename, and its contents are uploaded into the folder itself
+        dir_name = os.path.basename(args.filename)
+        upload_directory(args, project, os.path.join(folder, dir_name) if dir_name else folder)
     else:
         try:
             dxfile = dxpy.upload_local_file(filename=(None if args.filename == '-' else args.filename),
@@ -2145,6 +2176,63 @@ def upload_one(args):
         except:
             err_exit()
 
+def upload_directory(args, project, folder):
+    # Collect the whole tree first, so that the remote folders can be
+    # created up front and all files uploaded together.
+    uploads = []
+    folders = set()
+
+    def add_directory(local_dir, remote_folder):
+        norm_path = os.path.realpath(local_dir)
+        if norm_path in upload_seen_paths:
+            print("Skipping {f}: directory loop".format(f=local_dir), file=sys.stderr)
+            return
+        upload_seen_paths.add(norm_path)
+
+        dir_listing = os.listdir(local_dir)
+        if len(dir_listing) == 0:
+            folders.add(remote_folder)
+        for f in dir_listing:
+            local_path = os.path.join(local_dir, f)
+            if os.path.isdir(local_path):
+                add_directory(local_path, os.path.join(remote_folder, f))
+            else:
+                uploads.append({"filename": local_path, "name": f, "folder": remote_folder})
+                folders.add(remote_folder)
+
+    add_directory(args.filename, folder)
+
+    try:
+        # Creating the deepest folders also creates all their parents
+        for remote_folder in sorted(folders):
+            if not any(other.startswith(remote_folder.rstrip("/") + "/") for other in folders):
+                dxpy.api.project_new_folder(project, {"folder": remote_folder, "parents": True})
+
+        dxfiles = dxpy.upload_local_files(uploads,
+                                          write_buffer_size=(None if args.write_buffer_size is None
+                                                             else int(args.write_buffer_size)),
+                                          max_parts_in_flight=(None if args.multithread else 1),
+                                          wait_on_close=args.wait,
+                                          show_progress=args.show_progress,
+                                          tags=args.tags,
+                                          types=args.types,
+                                          hidden=args.hidden,
+                                          project=project,
+                                          properties=args.properties,
+                                          details=args.details)
+    except:
+        err_exit()
+
+    if args.brief:
+        for dxfile in dxfiles:
+            print(dxfile.get_id())
+    elif not args.mute:
+        total_size = sum(os.path.getsize(upload["filename"]) for upload in uploads)
+        print("Uploaded {n} file(s) ({size}) to {project}:{folder}".format(n=len(dxfiles),
+                                                                           size=get_size_str(total_size),
+                                                                           project=project,
+                                                                           folder=folder))
+
 def find_executions(args):
     try_call(process_find_by_property_args, args)
     if not (args.origin_jobs or args.all_jobs):
@@ -2667,27 +2755,38 @@ def wait(args):
             raise DXCLIError(
                 'Could not open {}. The problem was: {}' % (args.path[0], e))
 
+    # All jobs and analyses are waited on together, with one query for
+    # the states of all executions that are still running
+    execution_ids = [path for path in args.path if is_job_id(path) or is_analysis_id(path)]
+    if len(execution_ids) == 1:
+        print("Waiting for " + execution_ids[0] + " to finish running...")
+        try_call(lambda: list(dxpy.wait_on_many(execution_ids)))
+        print("Done")
+    elif execution_ids:
+        print("Waiting for {} jobs and analyses to finish running...".format(len(execution_ids)))
+        def wait_on_executions():
+            for desc in dxpy.wait_on_many(execution_ids):
+                print(desc["id"] + " is done")
+        try_call(wait_on_executions)
+        print("Done")
+
     for path in args.path:
         if is_job_id(path) or is_analysis_id(path):
-            dxexecution = dxpy.get_handler(path)
-            print("Waiting for " + path + " to finish running...")
-            try_call(dxexecution.wait_on_done)
-            print("Done")
-        else:
-            # Attempt to resolve name
-            try:
-                project, _folderpath, entity_result = resolve_existing_path(path, expected='entity')
-            except:
-                project, entity_result = None, None
+            continue
+        # Attempt to resolve name
+        try:
+            project, _folderpath, entity_result = resolve_existing_path(path, expected='entity')
+        except:
+            project, entity_result = None, None
 
-            if entity_result is None:
-                print(fill('Could not resolve ' + path + ' to a data object'))
-                had_error = True
-            else:
-                handler = dxpy.get_handler(entity_result['id'], project=entity_result['describe']['project'])
-                print("Waiting for " + path + " to close...")
-                try_call(handler._wait_on_close)
-                print("Done")
+        if entity_result is None:
+            print(fill('Could not resolve ' + path + ' to a data object'))
+            had_error = True
+        else:
+            handler = dxpy.get_handler(entity_result['id'], project=entity_result['describe']['project'])
+            print("Waiting for " + path + " to close...")
+            try_call(handler._wait_on_close)
+            print("Done")
 
     if had_error:
         err_exit('', 3)
@@ -2877,8 +2976,10 @@ def build(args):
 
         handle_arg_conflicts(args)
         if args.mode in ("app", "applet"):
+            from dxpy.scripts import dx_build_app
             dx_build_app.build(args)
         elif args.mode in ("workflow", "globalworkflow"):
+            from dxpy import workflow_builder
             workflow_builder.build(args, build_parser)
         else:
             msg = "Unrecognized mode. Accepted options: --app, --applet, --workflow, --globalworkflow."
@@ -3753,9 +3854,27 @@ def watch(args):
         if iarg:
             incompatible_args = ("--metrics csv", iarg)
 
+    if incompatible_args is None and args.jsonl:
+        if args.metrics in ("top", "csv"):
+            incompatible_args = ("--jsonl", "--metrics " + args.metrics)
+        else:
+            iarg = check_args_compatibility(["format", "get_stdout", "get_stderr", "get_streams"])
+            if iarg:
+                incompatible_args = ("--jsonl", iarg)
+    if incompatible_args is None and len(args.jobid) > 1:
+        if args.metrics == "top":
+            incompatible_args = ("--metrics top", "several job IDs")
+        elif args.job_try is not None:
+            incompatible_args = ("--try", "several job IDs")
+
     if incompatible_args:
         err_exit(exception=DXCLIError("Can not specify both '%s' and '%s'" % incompatible_args))
 
+    if args.max_connections is not None and args.max_connections < 1:
+        err_exit(exception=DXCLIError("--max-connections must be at least 1"))
+
+    job_ids, args.jobid = args.jobid, args.jobid[0]
+
     def enrich_msg(log_client, message):
         message['timestamp'] = str(datetime.datetime.fromtimestamp(message.get('timestamp', 0)//1000))
         message['level_color'] = level_colors.get(message.get('level', ''), '')
@@ -3763,24 +3882,33 @@ def watch(args):
         message['job_name'] = log_client.seen_jobs[message['job']]['name'] if message['job'] in log_client.seen_jobs else message['job']
 
     is_try_provided = args.job_try is not None
-    msg_callback, log_client = None, None
+    log_client = None
     if args.get_stdout:
+        msg_callback = None
         args.levels = ['STDOUT']
         args.format = "{msg}"
         args.job_info = False
     elif args.get_stderr:
+        msg_callback = None
         args.levels = ['STDERR']
         args.format = "{msg}"
         args.job_info = False
     elif args.get_streams:
+        msg_callback = None
         args.levels = ['STDOUT', 'STDERR']
         args.format = "{msg}"
         args.job_info = False
     elif args.metrics == "csv":
+        msg_callback = None
         args.levels = ['METRICS']
         args.format = "{msg}"
         args.job_info = False
         args.quiet = True
+    elif args.jsonl:
+        args.job_info = False
+
+        def msg_callback(message):
+            print(json.dumps(message))
     elif args.format is None:
         if args.job_ids:
             format = BLUE("{job_name} ({job}" + (" try {jobTry}" if is_try_provided else "") + ")") + " {level_color}{level}" + ENDC() + " {msg}"
@@ -3792,8 +3920,10 @@ def watch(args):
         def msg_callback(message):
             enrich_msg(log_client, message)
             print(format.format(**message))
+    else:
+        msg_callback = None
 
-    from dxpy.utils.job_log_client import DXJobLogStreamClient, metrics_top
+    from dxpy.utils.job_log_client import DXJobLogStreamClient, DXMultiJobLogStreamClient, metrics_top
 
     input_params = {"numRecentMessages": args.num_recent_messages,
                     "recurseJobs": args.tree,
@@ -3802,10 +3932,23 @@ def watch(args):
     if is_try_provided:
         input_params['try'] = args.job_try
 
-    if not re.match("^job-[0-9a-zA-Z]{24}$", args.jobid):
-        err_exit(args.jobid + " does not look like a DNAnexus job ID")
-
-    job_describe = dxpy.describe(args.jobid)
+    for job_id in job_ids:
+        if not re.match("^job-[0-9a-zA-Z]{24}$", job_id):
+            err_exit(job_id + " does not look like a DNAnexus job ID")
+
+    if len(job_ids) > 1:
+        job_describes = []
+        for batch_start in range(0, len(job_ids), DESCRIBE_EXECUTIONS_BATCH_SIZE):
+            batch = job_ids[batch_start:batch_start + DESCRIBE_EXECUTIONS_BATCH_SIZE]
+            executions_input = [{"id": job_id, "describe": True} for job_id in batch]
+            results = dxpy.api.system_describe_executions({"executions": executions_input})["results"]
+            for job_id, result in zip(batch, results):
+                if result.get("describe") is None:
+                    err_exit(exception=DXCLIError("Could not describe job " + job_id))
+                job_describes.append(result["describe"])
+    else:
+        job_describes = [dxpy.describe(args.jobid)]
+    job_describe = job_describes[0]
 
     # For finished jobs and --metrics top, behave like --metrics none
     if args.metrics == "top" and job_describe['state'] in ('terminated', 'failed', 'done'):
@@ -3813,10 +3956,12 @@ def watch(args):
         if args.levels and "METRICS" in args.levels:
             args.levels.remove("METRICS")
 
-    if 'outputReusedFrom' in job_describe and job_describe['outputReusedFrom'] is not None:
-      args.jobid = job_describe['outputReusedFrom']
-      if not args.quiet:
-        print("Output reused from %s" % args.jobid)
+    for i, job_describe in enumerate(job_describes):
+      if 'outputReusedFrom' in job_describe and job_describe['outputReusedFrom'] is not None:
+        job_ids[i] = job_describe['outputReusedFrom']
+        if not args.quiet:
+          print("Output reused from %s" % job_ids[i])
+    args.jobid = job_ids[0]
 
     if args.levels:
         input_params['levels'] = args.levels
@@ -3828,14 +3973,34 @@ def watch(args):
     else:
         input_params['metricsFormat'] = "text"
 
+    msg_filter = None
+    if args.exclude_jobs:
+        excluded_jobs = set(args.exclude_jobs)
+        msg_filter = lambda message: message.get('job') not in excluded_jobs
+
     # Note: currently, the client is synchronous and blocks until the socket is closed.
     # If this changes, some refactoring may be needed below
     try:
         if args.metrics == "top":
             metrics_top(args, input_params, enrich_msg)
+        elif len(job_ids) > 1:
+            log_client = DXMultiJobLogStreamClient(job_ids, input_params=input_params, msg_callback=msg_callback,
+                                                   msg_filter=msg_filter, msg_output_format=args.format,
+                                                   print_job_info=args.job_info, max_connections=args.max_connections)
+
+            if not args.quiet:
+                if args.max_connections is not None and len(job_ids) > args.max_connections:
+                    print(fill(BOLD("WARNING") + ": --max-connections is lower than the number of jobs; the "
+                               "messages of jobs watched after others finish are not printed in order of time."),
+                          file=sys.stderr)
+                print("Watching %d jobs%s. Press Ctrl+C to stop watching." % (
+                    len(job_ids), (" and sub-jobs" if args.tree else "")
+                ), file=sys.stderr)
+
+            log_client.connect()
         else:
             log_client = DXJobLogStreamClient(args.jobid, job_try=args.job_try, input_params=input_params, msg_callback=msg_callback,
-                                              msg_output_format=args.format, print_job_info=args.job_info)
+                                              msg_filter=msg_filter, msg_output_format=args.format, print_job_info=args.job_info)
 
             if not args.quiet:
                 print("Watching job %s%s. Press Ctrl+C to stop watching." % (
@@ -4833,7 +4998,7 @@ parser_describe.add_argument('--multi', help=fill('If the flag --json is also pr
 parser_describe.add_argument('--try', metavar="T", dest="job_try", type=int,
                              help=fill('When describing a job that was restarted, describe job try T. T=0 refers to the first try. Default is the last job try.', width_adjustment=-24))
 
-describe_path_action = parser_describe.add_argument('path', help=fill('Object ID or path to an object (possibly in another project) to describe.', width_adjustment=-24))
+describe_path_action = parser_describe.add_argument('path', nargs='+', help=fill('Object ID or path to an object (possibly in another project) to describe. If more than one is given, each must be a data object ID; they are described in bulk, and --json prints a JSON array of their describe hashes.', width_adjustment=-24))
 describe_path_action.completer = DXPathCompleter()
 parser_describe.set_defaults(func=describe)
 register_parser(parser_describe, categories=('data', 'metadata'))
@@ -4855,7 +5020,7 @@ parser_upload.add_argument('--path', '--destination',
 parser_upload.add_argument('-r', '--recursive', help='Upload directories recursively', action='store_true')
 parser_upload.add_argument('--wait', help='Wait until the file has finished closing', action='store_true')
 parser_upload.add_argument('--no-progress', help='Do not show a progress bar', dest='show_progress',
-                           action='store_false', default=sys.stderr.isatty())
+                           action='store_false', default=None)
 parser_upload.add_argument('--buffer-size', help='Set the write buffer size (in bytes)', dest='write_buffer_size')
 parser_upload.add_argument('--singlethread', help='Enable singlethreaded uploading', dest='singlethread', action='store_true')
 parser_upload.set_defaults(func=upload, mute=False)
@@ -4877,7 +5042,7 @@ parser_download.add_argument('-r', '--recursive', help='Download folders recursi
 parser_download.add_argument('-a', '--all', help='If multiple objects match the input, download all of them',
                              action='store_true')
 parser_download.add_argument('--no-progress', help='Do not show a progress bar', dest='show_progress',
-                             action='store_false', default=sys.stderr.isatty())
+                             action='store_false', default=None)
 parser_download.add_argument('--lightweight', help='Skip some validation steps to make fewer API calls',
                              action='store_true')
 parser_download.add_argument('--symlink-max-tries', help='Set maximum number of tries for downloading symlinked files using aria2c',
@@ -5547,7 +5712,8 @@ register_parser(parser_run, categories='exec')
 parser_watch = subparsers.add_parser('watch', help='Watch logs of a job and its subjobs', prog='dx watch',
                                      description='Monitors logging output from a running or finished job',
                                      parents=[env_args, no_color_arg])
-parser_watch.add_argument('jobid', help='ID of the job to watch')
+parser_watch.add_argument('jobid', nargs='+',
+                          help='ID of the job to watch; the logs of several jobs are merged in order of time')
 # .completer = TODO
 parser_watch.add_argument('-n', '--num-recent-messages', help='Number of recent messages to get',
                           type=int, default=1024*256)
@@ -5567,6 +5733,12 @@ parser_watch.add_argument('--no-job-info', help='Omit job info and status update
                           dest='job_info')
 parser_watch.add_argument('-q', '--quiet', help='Do not print extra info messages', action='store_true')
 parser_watch.add_argument('-f', '--format', help='Message format. Available fields: job, try, level, msg, date')
+parser_watch.add_argument('--jsonl', action='store_true',
+                          help=fill('Print each message as a JSON object on its own line, as received from the API (e.g. to be read by another program); implies --no-job-info', width_adjustment=-24))
+parser_watch.add_argument('--exclude-job', metavar='JOB_ID', action='append', dest='exclude_jobs',
+                          help='Omit the messages of this job (e.g. a subjob, with --tree); can be repeated')
+parser_watch.add_argument('--max-connections', metavar='N', type=int,
+                          help=fill('Number of jobs watched at a time when several jobs are given (default: all of them); a running job is watched until it is done, and the messages of jobs watched later are not merged in order of time with those already printed', width_adjustment=-24))
 parser_watch.add_argument('--no-wait', '--no-follow', action='store_false', dest='tail',
                           help='Exit after the first new message is received, instead of waiting for all logs')
 parser_watch.add_argument('--metrics', help=fill('Select display mode for detailed job metrics if they were collected and are available based on retention policy; see --metrics-help for details', width_adjustment=-24),
@@ -5922,7 +6094,7 @@ register_parser(parser_close, categories=('data', 'metadata'))
 # wait
 #####################################
 parser_wait = subparsers.add_parser('wait', help='Wait for data object(s) to close or job(s) to finish',
-                                    description='Polls the state of specified data object(s) or job(s) until they are all in the desired state.  Waits until the "closed" state for a data object, and for any terminal state for a job ("terminated", "failed", or "done").  Exits with a non-zero code if a job reaches a terminal state that is not "done".  Can also provide a local file containing a list of data object(s) or job(s), one per line; the file will be read if "--from-file" argument is added.',
+                                    description='Polls the state of specified data object(s) or job(s) until they are all in the desired state.  The states of all specified jobs and analyses are polled together.  Waits until the "closed" state for a data object, and for any terminal state for a job ("terminated", "failed", or "done").  Exits with a non-zero code if a job reaches a terminal state that is not "done".  Can also provide a local file containing a list of data object(s) or job(s), one per line; the file will be read if "--from-file" argument is added.',
                                     prog='dx wait',
                                     parents=[env_args])
 path_action = parser_wait.add_argument('path', help='Path to a data object, job ID, or file with IDs to wait for', nargs='+')
@@ -6436,7 +6608,7 @@ parser_extract_dataset.add_argument('-o', '--output', help='Local filename or di
 parser_extract_dataset.add_argument( "--list-fields", action="store_true", default=False, help='List the names and titles of all fields available in the dataset specified. When not specified together with "–-entities", it will return all the fields from the main entity. Output will be a two column table, field names and field titles, separated by a tab, where field names will be of the format, "<entity name>.<field name>" and field titles will be of the format, "<field title>".')
 parser_extract_dataset.add_argument( "--list-entities", action="store_true", default=False, help='List the names and titles of all the entities available in the dataset specified. Output will be a two column table, entity names and entity titles, separated by a tab.')
 parser_extract_dataset.add_argument("--entities", help='Similar output to "--list-fields", however using "--entities" will allow for specific entities to be specified. When multiple entities are specified, use comma as the delimiter. For example: "--list-fields --entities entityA,entityB,entityC"')
-parser_extract_dataset.set_defaults(func=extract_dataset)
+parser_extract_dataset.set_defaults(func=lazy_handler("dxpy.cli.dataset_utilities", "extract_dataset"))
 register_parser(parser_extract_dataset)
 
 #####################################
@@ -6524,7 +6696,7 @@ parser_extract_assay_germline.add_argument(
     default=None,
     help = 'A local filename or directory to be used, where "-" indicates printing to STDOUT. If -o/--output is not supplied, default behavior is to create a file with a constructed name in the current folder.'
 )
-parser_extract_assay_germline.set_defaults(func=extract_assay_germline)
+parser_extract_assay_germline.set_defaults(func=lazy_handler("dxpy.cli.dataset_utilities", "extract_assay_germline"))
 register_parser(parser_extract_assay_germline)
 
 #####################################
@@ -6607,7 +6779,7 @@ parser_extract_assay_somatic.add_argument(
     help='A local filename or directory to be used, where "-" indicates printing to STDOUT. If -o/--output is not supplied, default behavior is to create a file with a constructed name in the current folder.'
 )
 
-parser_extract_assay_somatic.set_defaults(func=extract_assay_somatic)
+parser_extract_assay_somatic.set_defaults(func=lazy_handler("dxpy.cli.dataset_utilities", "extract_assay_somatic"))
 register_parser(parser_extract_assay_somatic)
 
 
@@ -6666,6 +6838,8 @@ def main():
             # this particular combination of command line words.
             parser.parse_args(args_list + ["--help"])
             sys.exit(1)
+        # Listings cached for tab completion may be changed by the command
+        discard_completion_cache()
         try:
             args.func(args)
             # Flush buffered data in stdout before interpreter shutdown to ignore broken pipes
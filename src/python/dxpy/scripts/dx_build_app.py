@@ -799,23 +799,26 @@ def build_and_upload_locally(src_dir, mode, overwrite=False, archive=False, publ
     elif mode == "app" and use_temp_build_project and not dry_run:
         projects_by_region = {}
         if enabled_regions is not None:
-            # Create temporary projects in each enabled region.
-            try:
-                for region in enabled_regions:
-                    project_input = {
-                        "name": "Temporary build project for dx-build-app in {r}".format(r=region),
-                        "region": region
-                    }
-                    if bill_to_override:
-                        project_input["billTo"] = bill_to_override
-                    working_project = dxpy.api.project_new(project_input)["id"]
-                    projects_by_region[region] = working_project
-                    logger.debug("Created temporary project %s to build in" % (working_project,))
-            except:
+            # Create temporary projects in each enabled region, in all
+            # regions at once.
+            def create_project(region, _):
+                project_input = {
+                    "name": "Temporary build project for dx-build-app in {r}".format(r=region),
+                    "region": region
+                }
+                if bill_to_override:
+                    project_input["billTo"] = bill_to_override
+                working_project = dxpy.api.project_new(project_input)["id"]
+                logger.debug("Created temporary project %s to build in" % (working_project,))
+                return working_project
+
+            projects_by_region, error = dxpy.executable_builder.run_in_regions(
+                create_project, dict((region, None) for region in enabled_regions))
+            if error is not None:
                 # A /project/new request may fail if the requesting user is
                 # not authorized to create projects in a certain region.
                 dxpy.executable_builder.delete_temporary_projects(list(projects_by_region.values()))
-                err_exit()
+                err_exit(exception=error)
         else:
             # Create a temp project
             try:
@@ -890,37 +893,45 @@ def build_and_upload_locally(src_dir, mode, overwrite=False, archive=False, publ
             error_message += "the app is enabled in multiple regions"
             raise dxpy.app_builder.AppBuilderException(error_message)
 
-        resources_bundles_by_region = {}
-        for region, project in list(projects_by_region.items()):
-            resources_bundles_by_region[region] = dxpy.app_builder.upload_resources(
+        # The resources bundle is built once and uploaded to all regions
+        # at the same time
+        if dry_run:
+            resources_bundles_by_region = dict((region, []) for region in projects_by_region)
+        else:
+            resources_bundles_by_region = dxpy.app_builder.upload_resources_to_regions(
                 src_dir,
-                project=project,
+                projects_by_region,
                 folder=override_folder,
                 ensure_upload=ensure_upload,
                 force_symlinks=force_symlinks,
                 brief=brief,
                 resources_dir=resources_dir,
-                worker_resources_subpath=worker_resources_subpath) if not dry_run else []
+                worker_resources_subpath=worker_resources_subpath)
+
+        def upload_applet(region, project):
+            applet_id, applet_spec = dxpy.app_builder.upload_applet(
+                src_dir,
+                resources_bundles_by_region[region],
+                check_name_collisions=(mode == "applet"),
+                overwrite=overwrite and mode == "applet",
+                archive=archive and mode == "applet",
+                project=project,
+                override_folder=override_folder,
+                override_name=override_applet_name,
+                dry_run=dry_run,
+                brief=brief,
+                **kwargs)
+            if not dry_run:
+                logger.debug("Created applet " + applet_id + " successfully")
+            return applet_id, applet_spec
 
         # TODO: Clean up these applets if the app build fails.
-        applet_ids_by_region = {}
         try:
-            for region, project in list(projects_by_region.items()):
-                applet_id, applet_spec = dxpy.app_builder.upload_applet(
-                    src_dir,
-                    resources_bundles_by_region[region],
-                    check_name_collisions=(mode == "applet"),
-                    overwrite=overwrite and mode == "applet",
-                    archive=archive and mode == "applet",
-                    project=project,
-                    override_folder=override_folder,
-                    override_name=override_applet_name,
-                    dry_run=dry_run,
-                    brief=brief,
-                    **kwargs)
-                if not dry_run:
-                    logger.debug("Created applet " + applet_id + " successfully")
-                applet_ids_by_region[region] = applet_id
+            applets_by_region, error = dxpy.executable_builder.run_in_regions(upload_applet, projects_by_region)
+            if error is not None:
+                raise error
+            applet_ids_by_region = dict((region, applet_id) for region, (applet_id, _) in applets_by_region.items())
+            applet_id, applet_spec = list(applets_by_region.values())[-1]
         except:
             # Avoid leaking any bundled_resources files we may have
             # created, if applet creation fails. Note that if
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Runs dx commands sent by dx-client in processes which have already
+started up, so that scripts which run many short dx commands do not pay
+for starting a new dx each time.
+
+Start the server in the background, then use dx-client in place of dx:
+
+  $ dx-server &
+  $ dx-client ls
+  $ dx-server --stop
+
+The socket is given by DX_COMMAND_SERVER (by default, dx-server.sock in
+the dxpy user configuration directory). dx-client runs dx itself when no
+server is listening.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import sys, argparse, logging
+
+from dxpy.utils.command_server import (DXCommandServer, get_socket_path, stop_server, DEFAULT_SPARES,
+                                       DEFAULT_IDLE_TIMEOUT)
+from dxpy.exceptions import err_exit, default_expected_exceptions, DXError
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+                                 prog="dx-server")
+parser.add_argument("--socket", help="Path of the socket to listen on")
+parser.add_argument("--spares", type=int, default=DEFAULT_SPARES,
+                    help="Number of processes kept ready to run commands (default: %(default)s)")
+parser.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT,
+                    help="Seconds after which an idle process is replaced (default: %(default)s)")
+parser.add_argument("--stop", action="store_true", help="Stop the server listening on the socket")
+
+
+def main():
+    args = parser.parse_args()
+    if sys.version_info < (3, 3):
+        parser.error("dx-server requires Python 3")
+    if args.spares < 1:
+        parser.error("--spares must be at least 1")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    path = args.socket or get_socket_path()
+    try:
+        if args.stop:
+            stop_server(path)
+        else:
+            DXCommandServer(path, spares=args.spares, idle_timeout=args.idle_timeout).serve_forever()
+    except Exception:
+        err_exit(expected_exceptions=default_expected_exceptions + (DXError, OSError))
+
+if __name__ == '__main__':
+    main()
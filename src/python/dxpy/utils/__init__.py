@@ -95,8 +95,10 @@ def response_iterator(request_iterator, thread_pool, max_active_tasks=None, do_f
     :param max_active_tasks:
         The maximum number of tasks that may be either running or
         waiting for consumption of their result. If not given, defaults
-        to the number of CPU cores on the machine.
-    :type max_active_tasks: int
+        to the number of CPU cores on the machine. May also be a
+        function returning the current maximum, which is called
+        whenever a task could be submitted.
+    :type max_active_tasks: int or callable
     :param do_first_task_sequentially:
         If True, executes (and returns the result of) the first request
         before submitting any other requests (the subsequent requests
@@ -113,6 +115,10 @@ def response_iterator(request_iterator, thread_pool, max_active_tasks=None, do_f
     tasks_in_progress = collections.deque()
     if max_active_tasks is None:
         max_active_tasks = cpu_count()
+    if callable(max_active_tasks):
+        get_max_active_tasks = max_active_tasks
+    else:
+        get_max_active_tasks = lambda: max_active_tasks
 
     # The following two functions facilitate GC by not adding extra variables to the enclosing scope.
     def submit_task(task_iterator, executor, futures_queue):
@@ -137,14 +143,16 @@ def response_iterator(request_iterator, thread_pool, max_active_tasks=None, do_f
         task_callable, task_args, task_kwargs = next(request_iterator)
         yield task_callable(*task_args, **task_kwargs)
 
-    for _i in range(max_active_tasks):
-        retval = submit_task(request_iterator, thread_pool, tasks_in_progress)
-        if not retval:
-            break
+    def submit_tasks(task_iterator, executor, futures_queue):
+        while len(futures_queue) < get_max_active_tasks():
+            if not submit_task(task_iterator, executor, futures_queue):
+                break
+
+    submit_tasks(request_iterator, thread_pool, tasks_in_progress)
 
     while len(tasks_in_progress) > 0:
         result = next_result(tasks_in_progress)
-        submit_task(request_iterator, thread_pool, tasks_in_progress)
+        submit_tasks(request_iterator, thread_pool, tasks_in_progress)
         yield result
         del result
 
@@ -0,0 +1,193 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Block cache for random-access reads of remote files.
+
+A :class:`DXBlockCache` holds fixed-size, block-aligned pieces of file
+data keyed on (file ID, block index). The contents of a closed file
+never change, so cached blocks never need to be revalidated. Blocks are
+kept in memory up to a size limit; least recently used blocks beyond it
+are either dropped or, if a spill directory is given, moved to local
+files (which are bounded by a separate size limit).
+
+A cache is used by passing it to :class:`~dxpy.bindings.dxfile.DXFile`
+as *block_cache*; one cache may be shared by any number of handlers and
+threads::
+
+    cache = DXBlockCache(block_size=1024*1024, spill_dir="/tmp/blocks")
+    with DXFile("file-xxxx", mode="rb", block_cache=cache) as fh:
+        fh.seek(offset)
+        fh.read(length)
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os
+from collections import OrderedDict
+from threading import Lock
+
+from .. import logger
+
+DEFAULT_BLOCK_SIZE = 1024*1024
+DEFAULT_MAX_MEMORY = 1024*1024*256
+DEFAULT_MAX_SPILL = 1024*1024*1024*4
+
+
+class DXBlockCache(object):
+    '''
+    :param block_size: Size of each block in bytes (the last block of a file may be shorter)
+    :type block_size: int
+    :param max_memory: Maximum number of bytes of blocks to retain in memory
+    :type max_memory: int
+    :param spill_dir: Directory in which to keep blocks evicted from memory; if None, they are dropped
+    :type spill_dir: string
+    :param max_spill: Maximum number of bytes of blocks to retain in *spill_dir*
+    :type max_spill: int
+
+    Size-bounded LRU cache of file blocks. Counters of cache hits
+    (in memory and on disk), misses, and evictions are available through
+    :meth:`stats`.
+    '''
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE, max_memory=DEFAULT_MAX_MEMORY, spill_dir=None,
+                 max_spill=DEFAULT_MAX_SPILL):
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self.block_size = block_size
+        self.max_memory = max_memory
+        self.spill_dir = spill_dir
+        self.max_spill = max_spill
+        self.hits, self.spill_hits, self.misses, self.evictions = 0, 0, 0, 0
+        self._lock = Lock()
+        # key -> block data, least recently used first
+        self._memory_blocks = OrderedDict()
+        self._memory_size = 0
+        # key -> block size, least recently used first
+        self._spilled_blocks = OrderedDict()
+        self._spill_size = 0
+
+        if spill_dir is not None and not os.path.isdir(spill_dir):
+            os.makedirs(spill_dir, 0o700)
+
+    def _get_spill_path(self, key):
+        return os.path.join(self.spill_dir, "{}.{}".format(*key))
+
+    def get(self, key):
+        '''
+        :param key: (file ID, block index)
+        :type key: tuple
+        :returns: The cached block, or None if it is not in the cache
+        :rtype: bytes or None
+        '''
+        with self._lock:
+            data = self._memory_blocks.pop(key, None)
+            if data is not None:
+                self._memory_blocks[key] = data
+                self.hits += 1
+                return data
+            if key not in self._spilled_blocks:
+                self.misses += 1
+                return None
+            self._spill_size -= self._spilled_blocks.pop(key)
+            spill_path = self._get_spill_path(key)
+        try:
+            with open(spill_path, "rb") as fh:
+                data = fh.read()
+            os.remove(spill_path)
+        except (IOError, OSError) as e:
+            logger.debug("Unable to read spilled block %s: %s", spill_path, e)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.spill_hits += 1
+        self.put(key, data)
+        return data
+
+    def put(self, key, data):
+        '''
+        :param key: (file ID, block index)
+        :type key: tuple
+        :param data: Contents of the block
+        :type data: bytes
+
+        Adds a block to the cache, evicting the least recently used
+        blocks as needed.
+        '''
+        with self._lock:
+            if key in self._memory_blocks:
+                return
+            self._memory_blocks[key] = data
+            self._memory_size += len(data)
+            evicted = []
+            while self._memory_size > self.max_memory and len(self._memory_blocks) > 1:
+                evicted_key, evicted_data = self._memory_blocks.popitem(last=False)
+                self._memory_size -= len(evicted_data)
+                evicted.append((evicted_key, evicted_data))
+            self.evictions += len(evicted)
+        if self.spill_dir is not None:
+            for evicted_key, evicted_data in evicted:
+                self._spill(evicted_key, evicted_data)
+
+    def _spill(self, key, data):
+        spill_path = self._get_spill_path(key)
+        try:
+            with open(spill_path + ".tmp", "wb") as fh:
+                fh.write(data)
+            os.rename(spill_path + ".tmp", spill_path)
+        except (IOError, OSError) as e:
+            logger.debug("Unable to spill block %s: %s", spill_path, e)
+            return
+        with self._lock:
+            self._spilled_blocks[key] = len(data)
+            self._spill_size += len(data)
+            removed = []
+            while self._spill_size > self.max_spill and self._spilled_blocks:
+                removed_key, removed_size = self._spilled_blocks.popitem(last=False)
+                self._spill_size -= removed_size
+                removed.append(removed_key)
+        for removed_key in removed:
+            try:
+                os.remove(self._get_spill_path(removed_key))
+            except OSError:
+                pass
+
+    def clear(self):
+        '''
+        Removes all blocks from the cache, including spilled ones.
+        '''
+        with self._lock:
+            spilled = list(self._spilled_blocks)
+            self._memory_blocks.clear()
+            self._spilled_blocks.clear()
+            self._memory_size, self._spill_size = 0, 0
+        for key in spilled:
+            try:
+                os.remove(self._get_spill_path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        '''
+        :returns: Counters, and the number and total size of the blocks in memory and spilled to disk
+        :rtype: dict
+        '''
+        with self._lock:
+            return {"hits": self.hits, "spill_hits": self.spill_hits, "misses": self.misses,
+                    "evictions": self.evictions, "memory_blocks": len(self._memory_blocks),
+                    "memory_bytes": self._memory_size, "spilled_blocks": len(self._spilled_blocks),
+                    "spilled_bytes": self._spill_size}
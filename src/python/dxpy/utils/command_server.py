@@ -0,0 +1,383 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Server which runs ``dx`` commands in processes that are ready to run them.
+
+Every ``dx`` invocation normally starts a Python interpreter, imports
+dxpy and builds the ``dx`` command line parser, reads the configuration,
+and opens a new connection to the API server. Scripts which run ``dx``
+thousands of times pay for this each time.
+
+A :class:`DXCommandServer` (started with ``dx-server``) listens on a
+Unix socket and keeps a number of spare processes which have already
+imported everything and opened a connection to the API server. The
+``dx-client`` script, which only uses the standard library, connects to
+the socket and hands over its command line arguments, environment,
+working directory, and its standard input, output, and error file
+descriptors. A spare process runs the command on them, with the
+configuration of the client (its environment variables and the session
+configuration of its shell), reports the exit status, and exits; the
+server starts another spare process in its place.
+
+Protocol: the client sends a 4-byte big-endian length followed by a
+JSON request ``{"argv": [...], "cwd": ..., "env": {...}, "pid": ...}``,
+with the three file descriptors attached to the first message
+(``SCM_RIGHTS``). The server replies with JSON lines: ``{"pid": ...}``
+when the command starts (signals received by the client are forwarded
+to that process) and ``{"exit": ...}`` when it is done. A request
+``{"stop": true}`` stops the server.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, sys, json, array, errno, select, signal, socket, struct, importlib, threading, traceback
+
+import dxpy
+from .. import logger
+from ..exceptions import DXError
+
+DEFAULT_SPARES = 4
+DEFAULT_IDLE_TIMEOUT = 45
+SOCKET_FILENAME = "dx-server.sock"
+MAX_REQUEST_SIZE = 64*1024*1024
+
+
+def get_socket_path():
+    '''
+    :returns: Path of the socket of the command server, given by ``DX_COMMAND_SERVER`` or in the dxpy user configuration directory
+    :rtype: string
+    '''
+    return os.environ.get("DX_COMMAND_SERVER") or os.path.join(dxpy.config.get_user_conf_dir(), SOCKET_FILENAME)
+
+
+def _send_request(sock, request, fds=()):
+    data = json.dumps(request).encode("utf-8")
+    data = struct.pack("!I", len(data)) + data
+    ancdata = []
+    if fds:
+        ancdata = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds).tobytes())]
+    sent = sock.sendmsg([data], ancdata)
+    if sent < len(data):
+        sock.sendall(data[sent:])
+
+
+def _recv_request(conn):
+    fds = array.array("i")
+    msg, ancdata, _, _ = conn.recvmsg(65536, socket.CMSG_SPACE(3 * fds.itemsize))
+    for level, cmsg_type, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and cmsg_type == socket.SCM_RIGHTS:
+            fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+    if len(msg) < 4:
+        raise DXError("Incomplete request")
+    length = struct.unpack("!I", msg[:4])[0]
+    if length > MAX_REQUEST_SIZE:
+        raise DXError("Request of {} bytes is too large".format(length))
+    data = bytearray(msg[4:])
+    while len(data) < length:
+        chunk = conn.recv(min(65536, length - len(data)))
+        if not chunk:
+            raise DXError("Connection closed while reading the request")
+        data.extend(chunk)
+    return json.loads(data.decode("utf-8")), list(fds)
+
+
+def _send_message(conn, message):
+    conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def _get_peer_uid(conn):
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def _open_api_connection():
+    # Connects (and completes the TLS handshake) ahead of the first
+    # request of the command that this process will run
+    try:
+        pool = dxpy._get_pool_manager(None, None, None).connection_from_url(dxpy.APISERVER)
+        conn = pool._get_conn()
+        conn.connect()
+        pool._put_conn(conn)
+    except Exception as e:
+        logger.debug("Unable to connect to %s ahead of a command: %s", dxpy.APISERVER, e)
+
+
+# Settings which depend on whether the standard streams are terminals,
+# and which modules import by name
+_TERMINAL_SETTINGS = ("INTERACTIVE_CLI", "tty_rows", "tty_cols")
+
+
+def _refresh_terminal_settings():
+    # The dx modules were imported by the server, whose standard streams
+    # are not those of the client
+    from .. import cli
+    from . import printing
+    printing.refresh_terminal_settings()
+    settings = {"INTERACTIVE_CLI": cli.is_interactive(), "tty_rows": printing.tty_rows,
+                "tty_cols": printing.tty_cols}
+    cli.INTERACTIVE_CLI = settings["INTERACTIVE_CLI"]
+    for name, module in list(sys.modules.items()):
+        if module is None or not (name == "dxpy" or name.startswith("dxpy.")):
+            continue
+        for setting in _TERMINAL_SETTINGS:
+            if setting in vars(module):
+                setattr(module, setting, settings[setting])
+
+
+def _get_exit_code(e):
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def run_command(request, fds):
+    '''
+    :param request: Command line arguments ("argv"), working directory ("cwd"), environment ("env"), and PID ("pid") of the client
+    :type request: dict
+    :param fds: Standard input, output, and error of the client
+    :type fds: list of int
+    :returns: Exit status of the command
+    :rtype: int
+
+    Runs a ``dx`` command in this process as if it had been started by
+    the client. This replaces the standard streams, environment, and
+    working directory of the process, so it is only used in processes
+    that exit afterwards.
+    '''
+    for target_fd, fd in enumerate(fds):
+        os.dup2(fd, target_fd)
+        os.close(fd)
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(line_buffering=stream.isatty())
+    _refresh_terminal_settings()
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.argv = ["dx"] + request["argv"]
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    from ..scripts import dx
+    from .config import DXConfig
+    try:
+        # Settings which the client's configuration leaves unset take
+        # their default values, as they would in a new process
+        dxpy.set_api_server_info(host=dxpy.DEFAULT_APISERVER_HOST, port=dxpy.DEFAULT_APISERVER_PORT,
+                                 protocol=dxpy.DEFAULT_APISERVER_PROTOCOL)
+        dxpy.AUTH_HELPER, dxpy.SECURITY_CONTEXT = None, None
+        dxpy.config = DXConfig(session_pid=request["pid"])
+        dx.args_list = request["argv"]
+        dx.set_pager_env()
+        dx.main()
+        return 0
+    except SystemExit as e:
+        return _get_exit_code(e)
+    except KeyboardInterrupt:
+        return 128 + signal.SIGINT
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (IOError, OSError):
+                pass
+
+
+class DXCommandServer(object):
+    '''
+    :param path: Path of the Unix socket to listen on
+    :type path: string
+    :param spares: Number of processes kept ready to run commands
+    :type spares: int
+    :param idle_timeout: Number of seconds after which an idle spare process is replaced, so that its connection to the API server does not go stale
+    :type idle_timeout: int
+
+    Pre-forking server of ``dx`` commands; see the module documentation.
+    Only clients running as the same user are served.
+    '''
+
+    def __init__(self, path, spares=DEFAULT_SPARES, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.path = path
+        self.spares = spares
+        self.idle_timeout = idle_timeout
+        self._idle = set()
+        self._busy = set()
+        self._stopping = False
+
+    def _listen(self):
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except socket.error:
+                # Left behind by a server which did not exit cleanly
+                os.remove(self.path)
+            else:
+                raise DXError("A dx command server is already listening on " + self.path)
+            finally:
+                probe.close()
+        socket_dir = os.path.dirname(self.path)
+        if socket_dir and not os.path.isdir(socket_dir):
+            os.makedirs(socket_dir, 0o700)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        listener.listen(128)
+        return listener
+
+    def _start_spare(self, listener, notify_fd):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                exit_code = self._run_spare(listener, notify_fd)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(exit_code)
+        self._idle.add(pid)
+
+    def _run_spare(self, listener, notify_fd):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        # Interrupting the server (e.g. with ^C in its terminal) stops it,
+        # which stops the idle processes
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        prewarm = threading.Thread(target=_open_api_connection)
+        prewarm.daemon = True
+        prewarm.start()
+
+        listener.settimeout(self.idle_timeout)
+        try:
+            conn = listener.accept()[0]
+        except socket.timeout:
+            return 0
+        os.write(notify_fd, struct.pack("!I", os.getpid()))
+        listener.close()
+        os.close(notify_fd)
+
+        try:
+            conn.settimeout(None)
+            peer_uid = _get_peer_uid(conn)
+            if peer_uid is not None and peer_uid != os.getuid():
+                logger.warning("Refusing a command from user ID %d", peer_uid)
+                return 1
+            request, fds = _recv_request(conn)
+            if request.get("stop"):
+                os.kill(os.getppid(), signal.SIGTERM)
+                return 0
+            if len(fds) != 3:
+                raise DXError("Expected 3 file descriptors, got {}".format(len(fds)))
+            _send_message(conn, {"pid": os.getpid()})
+            exit_code = run_command(request, fds)
+            try:
+                _send_message(conn, {"exit": exit_code})
+            except socket.error:
+                # The client is gone
+                pass
+            return 0
+        finally:
+            conn.close()
+
+    def _reap(self):
+        while True:
+            try:
+                pid = os.waitpid(-1, os.WNOHANG)[0]
+            except OSError as e:
+                if e.errno == errno.ECHILD:
+                    return
+                raise
+            if pid == 0:
+                return
+            self._idle.discard(pid)
+            self._busy.discard(pid)
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+
+    def serve_forever(self):
+        '''
+        Serves commands until the server receives SIGTERM or SIGINT or a
+        stop request.
+        '''
+        # Imported before forking, so that each spare process starts
+        # with the dx command line parser ready (dx takes its program
+        # name from sys.argv when it is imported)
+        sys.argv = ["dx"]
+        importlib.import_module("dxpy.scripts.dx")
+        listener = self._listen()
+        notify_r, notify_w = os.pipe()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        logger.info("Serving dx commands on %s", self.path)
+        try:
+            while not self._stopping:
+                while len(self._idle) < self.spares:
+                    self._start_spare(listener, notify_w)
+                try:
+                    readable = select.select([notify_r], [], [], 1)[0]
+                except (select.error, OSError) as e:
+                    if e.args[0] != errno.EINTR:
+                        raise
+                    readable = []
+                if readable:
+                    # Spare processes report that they took a command
+                    data = os.read(notify_r, 4096)
+                    for i in range(0, len(data) - 3, 4):
+                        pid = struct.unpack("!I", data[i:i + 4])[0]
+                        self._idle.discard(pid)
+                        self._busy.add(pid)
+                self._reap()
+        finally:
+            listener.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            for pid in self._idle:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+            os.close(notify_r)
+            os.close(notify_w)
+            self._reap()
+
+
+def stop_server(path):
+    '''
+    :param path: Path of the socket of the command server
+    :type path: string
+
+    Asks the command server listening on *path* to stop. Commands which
+    are running are not interrupted.
+    '''
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        _send_request(sock, {"stop": True})
+        sock.recv(1)
+    finally:
+        sock.close()
@@ -28,8 +28,83 @@ import dxpy
 from .resolver import (get_first_pos_of_char, get_last_pos_of_char, clean_folder_path, resolve_path,
                        split_unescaped, ResolutionError)
 from .printing import fill
+from .completion_cache import get_completion_cache
 from ..compat import str
 
+# Maximum number of data object names fetched for one completion
+DATA_MATCHES_LIMIT = 100
+# Maximum number of subfolders whose listings are prefetched after a
+# folder is listed
+PREFETCH_FOLDERS = 10
+
+def _cached(key, fetch_fn):
+    cache = get_completion_cache()
+    if cache is None:
+        return fetch_fn()
+    return cache.get(key, fetch_fn)
+
+def _list_folders(dxproj, folderpath):
+    return dxproj.list_folder(folder=folderpath, only='folders')['folders']
+
+def _find_data_names(dxproj, folderpath, name_prefix, classname, typespec, visibility="either"):
+    results = dxpy.find_data_objects(project=dxproj.get_id(),
+                                     folder=folderpath,
+                                     name=name_prefix + "*",
+                                     name_mode="glob",
+                                     recurse=False,
+                                     visibility=visibility,
+                                     classname=classname,
+                                     limit=DATA_MATCHES_LIMIT,
+                                     describe=dict(fields=dict(name=True, hidden=True)),
+                                     typename=typespec)
+    return [[result['describe']['name'], result['describe'].get('hidden', False)] for result in results]
+
+def _filter_data_names(listing, name_prefix, visibility):
+    return [name for name, hidden in listing
+            if name.startswith(name_prefix) and (visibility == "either" or hidden == (visibility == "hidden"))]
+
+def _get_data_names(dxproj, folderpath, name_prefix, classname, typespec, visibility):
+    cache = get_completion_cache()
+    if cache is None:
+        return [name for name, _hidden in _find_data_names(dxproj, folderpath, name_prefix, classname, typespec,
+                                                           visibility)]
+    # Objects of either visibility are listed, so that one listing serves
+    # all visibilities. A listing for a prefix of *name_prefix* which was
+    # not cut off by the limit contains all names that start with it.
+    key = ("data", dxproj.get_id(), folderpath, classname, typespec)
+    if not any(char in name_prefix for char in '*?[\\'):
+        for length in range(len(name_prefix), -1, -1):
+            listing = cache.peek(key + (name_prefix[:length],))
+            if listing is not None and len(listing) < DATA_MATCHES_LIMIT:
+                return _filter_data_names(listing, name_prefix, visibility)
+    listing = cache.get(key + (name_prefix,),
+                        lambda: _find_data_names(dxproj, folderpath, name_prefix, classname, typespec))
+    if len(listing) < DATA_MATCHES_LIMIT or visibility == "either":
+        return _filter_data_names(listing, name_prefix, visibility)
+    # The listing may have been filled up by objects of the other visibility
+    listing = cache.get(key + (name_prefix, visibility),
+                        lambda: _find_data_names(dxproj, folderpath, name_prefix, classname, typespec, visibility))
+    return [name for name, _hidden in listing]
+
+def _prefetch_subfolders(dxproj, folderpath, expected=None, classes=None, typespec=None):
+    '''
+    Fetches, in the background, the listings that completing in each
+    subfolder of *folderpath* would need.
+    '''
+    cache = get_completion_cache()
+    if cache is None or not cache.background:
+        return
+    for subfolder in _cached(("folders", dxproj.get_id(), folderpath),
+                             lambda: _list_folders(dxproj, folderpath))[:PREFETCH_FOLDERS]:
+        cache.prefetch(("folders", dxproj.get_id(), subfolder),
+                       lambda subfolder=subfolder: _list_folders(dxproj, subfolder))
+        if expected == 'folder':
+            continue
+        for classname in (classes or [None]):
+            key = ("data", dxproj.get_id(), subfolder, classname, typespec, "")
+            cache.prefetch(key, lambda subfolder=subfolder, classname=classname: _find_data_names(
+                dxproj, subfolder, "", classname, typespec))
+
 def startswith(text):
     return (lambda string: string.startswith(text))
 
@@ -101,7 +176,7 @@ def get_folder_matches(text, delim_pos, dxproj, folderpath):
     and be in escaped form for consumption by the command-line.
     '''
     try:
-        folders = dxproj.list_folder(folder=folderpath, only='folders')['folders']
+        folders = _cached(("folders", dxproj.get_id(), folderpath), lambda: _list_folders(dxproj, folderpath))
         folder_names = [name[name.rfind('/') + 1:] for name in folders]
         if text != '' and delim_pos != len(text) - 1:
             folder_names += ['.', '..']
@@ -141,18 +216,9 @@ def get_data_matches(text, delim_pos, dxproj, folderpath, classname=None,
             visibility = "visible"
 
     try:
-        results = list(dxpy.find_data_objects(project=dxproj.get_id(),
-                                              folder=folderpath,
-                                              name=unescaped_text + "*",
-                                              name_mode="glob",
-                                              recurse=False,
-                                              visibility=visibility,
-                                              classname=classname,
-                                              limit=100,
-                                              describe=dict(fields=dict(name=True)),
-                                              typename=typespec))
+        names = _get_data_names(dxproj, folderpath, unescaped_text, classname, typespec, visibility)
         prefix = '' if text == '' else text[:delim_pos + 1]
-        return [prefix + escape_name(result['describe']['name']) for result in results]
+        return [prefix + escape_name(name) for name in names]
     except:
         return []
 
@@ -190,10 +256,13 @@ def path_completer(text, expected=None, classes=None, perm_level=None,
         # Also, don't bother if text=="" and expected is NOT "project"
         # Also, add space if expected == "project"
         if text != "" or expected == 'project':
-            results = dxpy.find_projects(describe=True, level=perm_level)
+            results = _cached(("projects", perm_level),
+                              lambda: [[r['id'], r['describe']['name']]
+                                       for r in dxpy.find_projects(describe={"fields": {"name": True}},
+                                                                   level=perm_level)])
             if not include_current_proj:
-                results = [r for r in results if r['id'] != dxpy.WORKSPACE_ID]
-            matches += [escape_colon(r['describe']['name'])+':' for r in results if r['describe']['name'].startswith(text)]
+                results = [r for r in results if r[0] != dxpy.WORKSPACE_ID]
+            matches += [escape_colon(name)+':' for _id, name in results if name.startswith(text)]
 
     if expected == 'project':
         return matches
@@ -219,6 +288,7 @@ def path_completer(text, expected=None, classes=None, perm_level=None,
                         matches += get_data_matches(text, slash_pos, dxproj,
                                                     folderpath, typespec=typespec,
                                                     visibility=visibility)
+                _prefetch_subfolders(dxproj, folderpath, expected, classes, typespec)
             except:
                 pass
     else:
@@ -244,6 +314,7 @@ def path_completer(text, expected=None, classes=None, perm_level=None,
                         matches += get_data_matches(text, delim_pos, dxproj,
                                                     folderpath, typespec=typespec,
                                                     visibility=visibility)
+                _prefetch_subfolders(dxproj, folderpath, expected, classes, typespec)
             except:
                 pass
     return matches
@@ -294,7 +365,10 @@ class DXAppCompleter():
                     name_query = prefix[4:] + "*"
                 elif len(prefix) > 4 or not "app-".startswith(prefix):
                     name_query = prefix + "*"
-            appnames = [result['describe']['name'] for result in dxpy.find_apps(name=name_query, name_mode="glob", describe={"fields": {"name": True, "installed": (self.installed is not None)}}) if self.installed is None or (self.installed == result['describe']['installed'])]
+            apps = _cached(("apps", name_query, self.installed is not None),
+                           lambda: [[result['describe']['name'], result['describe'].get('installed')]
+                                    for result in dxpy.find_apps(name=name_query, name_mode="glob", describe={"fields": {"name": True, "installed": (self.installed is not None)}})])
+            appnames = [name for name, installed in apps if self.installed is None or (self.installed == installed)]
         except:
             # This is for (temporary) backwards-compatibility
             appnames = [result['describe']['name'] for result in dxpy.find_apps(describe=True) if self.installed is None or (self.installed == result['describe']['installed'])]
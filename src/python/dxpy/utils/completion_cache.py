@@ -0,0 +1,271 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Short-lived cache of the listings used for tab completion.
+
+Folder listings, data object names, project names, and app names fetched
+by :mod:`dxpy.utils.completer` are kept for ``DX_COMPLETION_CACHE_TTL``
+seconds (30 by default) in memory and in an SQLite database in the dxpy
+user configuration directory, so that repeated TAB presses (each of
+which runs a new ``dx`` process under bash completion) are answered
+without contacting the API server. The listings on disk are discarded
+whenever a ``dx`` command runs, since it may change what they list.
+Setting ``DX_COMPLETION_CACHE`` to ``0`` disables the cache.
+
+In long-lived processes, such as the interactive prompts of ``dx run``,
+listings are also refreshed and prefetched in the background: an
+expired listing is returned while a fresh one is fetched, and the
+listings of the folders shown in a completion are fetched before they
+are asked for.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, json, time, hashlib, sqlite3
+from threading import Lock
+
+import dxpy
+from . import get_futures_threadpool
+from .. import logger
+from ..compat import environ
+
+DEFAULT_TTL = 30
+DEFAULT_MAX_STALE = 600
+DEFAULT_MAX_ENTRIES = 2000
+CACHE_FILENAME = "completion_cache.sqlite"
+COMPLETION_CACHE_THREADS = 4
+
+
+class DXCompletionCache(object):
+    '''
+    :param path: Path of the SQLite database backing the cache, or None to keep listings in memory only
+    :type path: string
+    :param ttl: Number of seconds for which a listing is used without being fetched again
+    :type ttl: int
+    :param max_stale: Number of seconds for which an expired listing may still be returned while it is refreshed in the background
+    :type max_stale: int
+    :param max_entries: Maximum number of listings to retain on disk
+    :type max_entries: int
+    :param background: Whether listings may be fetched in the background (only useful in processes that outlive a single completion)
+    :type background: boolean
+
+    Cache of completion listings keyed on a tuple (e.g. the kind of
+    listing, the project, and the folder). Listings must be
+    JSON-serializable. Counters of hits (fresh and expired), misses,
+    and background fetches are available through :meth:`stats`.
+    '''
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_stale=DEFAULT_MAX_STALE, max_entries=DEFAULT_MAX_ENTRIES,
+                 background=True):
+        self.path = path
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.background = background
+        self.hits, self.stale_hits, self.misses, self.background_fetches = 0, 0, 0, 0
+        self._lock = Lock()
+        # key -> (time fetched, listing)
+        self._memory = {}
+        # keys being fetched in the background
+        self._pending = set()
+        self._threadpool = None
+
+        self._conn = None
+        if path is not None:
+            cache_dir = os.path.dirname(path)
+            if cache_dir and not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, 0o700)
+            self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS completion_cache ("
+                               "key TEXT PRIMARY KEY, "
+                               "fetched REAL NOT NULL, "
+                               "listing TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS completion_cache_age ON completion_cache (fetched)")
+            os.chmod(path, 0o600)
+
+    @staticmethod
+    def _get_key(key):
+        # As in the describe cache, entries are scoped to the API server
+        # and the credentials in use.
+        auth_token = (dxpy.SECURITY_CONTEXT or {}).get("auth_token", "")
+        scope = hashlib.sha1((dxpy.APISERVER + " " + auth_token).encode("utf-8")).hexdigest()
+        return json.dumps([scope[:16]] + list(key))
+
+    def _lookup(self, cache_key):
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is not None or self._conn is None:
+                return entry
+            try:
+                row = self._conn.execute("SELECT fetched, listing FROM completion_cache WHERE key = ?",
+                                         (cache_key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.debug("Completion cache lookup failed: %s", e)
+                return None
+            if row is None:
+                return None
+            entry = (row[0], json.loads(row[1]))
+            self._memory[cache_key] = entry
+            return entry
+
+    def _store(self, cache_key, listing):
+        entry = (time.time(), listing)
+        with self._lock:
+            self._memory[cache_key] = entry
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO completion_cache (key, fetched, listing) VALUES (?, ?, ?)",
+                                   (cache_key, entry[0], json.dumps(listing)))
+                num_entries = self._conn.execute("SELECT COUNT(*) FROM completion_cache").fetchone()[0]
+                if num_entries > self.max_entries:
+                    self._conn.execute("DELETE FROM completion_cache WHERE key IN "
+                                       "(SELECT key FROM completion_cache ORDER BY fetched ASC LIMIT ?)",
+                                       (num_entries - self.max_entries,))
+            except sqlite3.Error as e:
+                logger.debug("Completion cache update failed: %s", e)
+
+    def _fetch_in_background(self, cache_key, fetch_fn):
+        with self._lock:
+            if cache_key in self._pending:
+                return
+            self._pending.add(cache_key)
+            if self._threadpool is None:
+                self._threadpool = get_futures_threadpool(max_workers=COMPLETION_CACHE_THREADS)
+            self.background_fetches += 1
+
+        def fetch():
+            try:
+                self._store(cache_key, fetch_fn())
+            except Exception as e:
+                logger.debug("Background completion fetch failed: %s", e)
+            finally:
+                with self._lock:
+                    self._pending.discard(cache_key)
+        self._threadpool.submit(fetch)
+
+    def get(self, key, fetch_fn):
+        '''
+        :param key: Key of the listing
+        :type key: tuple
+        :param fetch_fn: Function which fetches the listing from the API server
+        :type fetch_fn: function
+        :returns: The listing
+
+        Returns the cached listing for *key*, calling *fetch_fn* if
+        there is none or it has expired (in the background, if an
+        expired listing may be returned in the meantime).
+        '''
+        cache_key = self._get_key(key)
+        entry = self._lookup(cache_key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if 0 <= age < self.ttl:
+                self.hits += 1
+                return entry[1]
+            if self.background and 0 <= age < self.max_stale:
+                self.stale_hits += 1
+                self._fetch_in_background(cache_key, fetch_fn)
+                return entry[1]
+        self.misses += 1
+        listing = fetch_fn()
+        self._store(cache_key, listing)
+        return listing
+
+    def peek(self, key):
+        '''
+        :param key: Key of the listing
+        :type key: tuple
+        :returns: The cached listing for *key* if it has not expired, or None
+        '''
+        entry = self._lookup(self._get_key(key))
+        if entry is not None and 0 <= time.time() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def prefetch(self, key, fetch_fn):
+        '''
+        :param key: Key of the listing
+        :type key: tuple
+        :param fetch_fn: Function which fetches the listing from the API server
+        :type fetch_fn: function
+
+        Fetches the listing for *key* in the background, unless a
+        listing that has not expired is cached or background fetches
+        are disabled.
+        '''
+        if self.background and self.peek(key) is None:
+            self._fetch_in_background(self._get_key(key), fetch_fn)
+
+    def clear(self):
+        '''
+        Removes all listings from the cache.
+        '''
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM completion_cache")
+
+    def stats(self):
+        '''
+        :returns: Counters for the current process
+        :rtype: dict
+        '''
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses,
+                "background_fetches": self.background_fetches}
+
+
+# Multiple threads can ask for the cache, so we need to protect the
+# initialization.
+_completion_cache_mutex = Lock()
+_completion_cache = None
+
+def completion_cache_enabled():
+    return environ.get("DX_COMPLETION_CACHE", "1") not in ("", "0")
+
+def get_completion_cache():
+    '''
+    :returns: The completion cache for this process, or None if the cache is not enabled
+    :rtype: :class:`DXCompletionCache` or None
+    '''
+    global _completion_cache
+    if not completion_cache_enabled():
+        return None
+    with _completion_cache_mutex:
+        if _completion_cache is None:
+            # Under bash completion, the process exits as soon as the
+            # completions are printed, so background work would be lost
+            background = "_ARGCOMPLETE" not in environ
+            try:
+                ttl = float(environ.get("DX_COMPLETION_CACHE_TTL", DEFAULT_TTL))
+                path = os.path.join(dxpy.config.get_user_conf_dir(), CACHE_FILENAME)
+                _completion_cache = DXCompletionCache(path, ttl=ttl, background=background)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                logger.debug("Unable to open the completion cache on disk, keeping it in memory: %s", e)
+                _completion_cache = DXCompletionCache(background=background)
+        return _completion_cache
+
+def discard_completion_cache():
+    '''
+    Removes the listings kept on disk, if any.
+    '''
+    path = os.path.join(dxpy.config.get_user_conf_dir(), CACHE_FILENAME)
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.debug("Unable to remove the completion cache: %s", e)
@@ -90,13 +90,18 @@ class DXConfig(MutableMapping):
     }
     _global_conf_dir = "/etc/dnanexus"
 
-    def __init__(self, suppress_warning=False):
+    def __init__(self, suppress_warning=False, session_pid=None):
         """
         :param suppress_warning:
             Whether to suppress the warning message for any mismatch found in the environment variables and the dx
             configuration file
         :type suppress_warning: boolean
+        :param session_pid:
+            PID of the process whose session configuration is used (defaults to this process); the dx command
+            server uses the PID of the client it is running a command for
+        :type session_pid: int
         """
+        self._session_pid = session_pid
         try:
             dxpy._DEBUG = int(environ.get("_DX_DEBUG", 0))
         except ValueError as e:
@@ -171,7 +176,8 @@ class DXConfig(MutableMapping):
     def get_session_conf_dir(self, cleanup=False):
         """
         Tries to find the session configuration directory by looking in ~/.dnanexus_config/sessions/<PID>,
-        where <PID> is pid of the parent of this process, then its parent, and so on.
+        where <PID> is pid of the parent of this process (or of the process given as *session_pid*), then its
+        parent, and so on.
         If none of those exist, the path for the immediate parent is given, even if it doesn't exist.
 
         If *cleanup* is True, looks up and deletes all session configuration directories that belong to nonexistent
@@ -200,9 +206,10 @@ class DXConfig(MutableMapping):
                     if not pid_exists(session_pid):
                         rmtree(os.path.join(sessions_dir, session_dir), ignore_errors=True)
 
-            parent_process = Process(os.getpid()).parent()
+            session_pid = self._session_pid or os.getpid()
+            parent_process = Process(session_pid).parent()
             if parent_process is None:
-                parent_process = Process(os.getpid())
+                parent_process = Process(session_pid)
             default_session_dir = os.path.join(sessions_dir, str(parent_process.pid))
             while parent_process is not None and parent_process.pid != 0:
                 session_dir = os.path.join(sessions_dir, str(parent_process.pid))
@@ -0,0 +1,236 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Opt-in, on-disk cache of data object describe hashes.
+
+The cache is shared by all processes of the same user (it is an SQLite
+database stored in the dxpy user configuration directory) and is enabled
+by setting the environment variable ``DX_DESCRIBE_CACHE`` to a nonempty
+value other than ``0``. ``DX_DESCRIBE_CACHE_SIZE`` bounds the number of
+entries kept (least recently used entries are evicted first).
+
+Descriptions of closed data objects are served from the cache without
+contacting the API server. Descriptions of open or closing objects are
+revalidated with a lightweight describe call which only fetches the
+``modified`` timestamp and the ``state`` of the object.
+
+.. note:: Project-specific metadata of a closed object (name, folder,
+   tags, properties) may still be changed by other clients; such changes
+   are not observed until the entry is evicted or the cache is cleared.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import os, json, time, hashlib, sqlite3
+from threading import Lock
+
+import dxpy
+from .. import logger
+from ..compat import environ
+
+DEFAULT_MAX_ENTRIES = 10000
+CACHE_FILENAME = "describe_cache.sqlite"
+
+_REVALIDATE_INPUT = {"fields": {"modified": True, "state": True}}
+
+
+class DXDescribeCache(object):
+    '''
+    :param path: Path of the SQLite database backing the cache
+    :type path: string
+    :param max_entries: Maximum number of descriptions to retain
+    :type max_entries: int
+
+    Size-bounded LRU cache of describe hashes, keyed on the object ID,
+    the project, and the describe input (requested field set). Counters
+    of cache hits, misses, revalidations, and evictions for the current
+    process are available through :meth:`stats`.
+    '''
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits, self.misses, self.revalidations, self.evictions = 0, 0, 0, 0
+        self._lock = Lock()
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o700)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS describe_cache ("
+                           "key TEXT PRIMARY KEY, "
+                           "object_id TEXT NOT NULL, "
+                           "state TEXT, "
+                           "modified INTEGER, "
+                           "describe TEXT NOT NULL, "
+                           "last_access REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS describe_cache_lru ON describe_cache (last_access)")
+        os.chmod(path, 0o600)
+
+    @staticmethod
+    def _get_key(obj_id, describe_input):
+        # Entries are scoped to the API server and the credentials in
+        # use, so that one user (or job token) can never be served
+        # descriptions fetched on behalf of another.
+        auth_token = (dxpy.SECURITY_CONTEXT or {}).get("auth_token", "")
+        scope = hashlib.sha1((dxpy.APISERVER + " " + auth_token).encode("utf-8")).hexdigest()
+        serialized_input = json.dumps(describe_input, sort_keys=True)
+        return "{}:{}:{}".format(obj_id, scope[:16], hashlib.sha1(serialized_input.encode("utf-8")).hexdigest())
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT state, modified, describe FROM describe_cache WHERE key = ?",
+                                     (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def put(self, key, obj_id, desc):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO describe_cache "
+                               "(key, object_id, state, modified, describe, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, obj_id, desc["state"], desc["modified"], json.dumps(desc), time.time()))
+            num_entries = self._conn.execute("SELECT COUNT(*) FROM describe_cache").fetchone()[0]
+            if num_entries > self.max_entries:
+                num_evicted = num_entries - self.max_entries
+                self._conn.execute("DELETE FROM describe_cache WHERE key IN "
+                                   "(SELECT key FROM describe_cache ORDER BY last_access ASC LIMIT ?)",
+                                   (num_evicted,))
+                self.evictions += num_evicted
+
+    def _touch(self, key):
+        with self._lock:
+            self._conn.execute("UPDATE describe_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+
+    def invalidate(self, obj_id):
+        '''
+        :param obj_id: ID of a data object
+        :type obj_id: string
+
+        Removes all cached descriptions of *obj_id*.
+        '''
+        with self._lock:
+            self._conn.execute("DELETE FROM describe_cache WHERE object_id = ?", (obj_id,))
+
+    def clear(self):
+        '''
+        Removes all entries from the cache.
+        '''
+        with self._lock:
+            self._conn.execute("DELETE FROM describe_cache")
+
+    def stats(self):
+        '''
+        :returns: Counters for the current process, and the number of entries in the cache
+        :rtype: dict
+        '''
+        with self._lock:
+            num_entries = self._conn.execute("SELECT COUNT(*) FROM describe_cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations,
+                "evictions": self.evictions, "entries": num_entries}
+
+    def describe(self, obj_id, describe_input, describe_fn):
+        '''
+        :param obj_id: ID of a data object
+        :type obj_id: string
+        :param describe_input: Input to the describe API call
+        :type describe_input: dict
+        :param describe_fn: Function which, given a describe input, performs the describe API call for *obj_id*
+        :type describe_fn: function
+        :returns: Description of the object
+        :rtype: dict
+
+        Returns the description of *obj_id*, from the cache if possible.
+        '''
+        key = self._get_key(obj_id, describe_input)
+        try:
+            cached = self.get(key)
+        except sqlite3.Error as e:
+            logger.debug("Describe cache lookup failed: %s", e)
+            return describe_fn(describe_input)
+
+        if cached is not None:
+            state, modified, desc = cached
+            if state != "closed":
+                revalidate_input = dict(_REVALIDATE_INPUT)
+                if "project" in describe_input:
+                    revalidate_input["project"] = describe_input["project"]
+                current = describe_fn(revalidate_input)
+                self.revalidations += 1
+                if current.get("state") != state or current.get("modified") != modified:
+                    cached = None
+            if cached is not None:
+                self.hits += 1
+                try:
+                    self._touch(key)
+                except sqlite3.Error as e:
+                    logger.debug("Describe cache update failed: %s", e)
+                return desc
+
+        self.misses += 1
+        desc = describe_fn(describe_input)
+        # Only descriptions that carry enough information to be
+        # revalidated later are retained.
+        if isinstance(desc, dict) and "state" in desc and "modified" in desc:
+            try:
+                self.put(key, obj_id, desc)
+            except sqlite3.Error as e:
+                logger.debug("Describe cache update failed: %s", e)
+        return desc
+
+
+# Multiple threads can ask for the cache, so we need to protect the
+# initialization.
+_describe_cache_mutex = Lock()
+_describe_cache = None
+
+def describe_cache_enabled():
+    return environ.get("DX_DESCRIBE_CACHE", "0") not in ("", "0")
+
+def get_describe_cache():
+    '''
+    :returns: The describe cache for this process, or None if the cache is not enabled
+    :rtype: :class:`DXDescribeCache` or None
+    '''
+    global _describe_cache
+    if not describe_cache_enabled():
+        return None
+    with _describe_cache_mutex:
+        if _describe_cache is None:
+            try:
+                max_entries = int(environ.get("DX_DESCRIBE_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+                path = os.path.join(dxpy.config.get_user_conf_dir(), CACHE_FILENAME)
+                _describe_cache = DXDescribeCache(path, max_entries=max_entries)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                logger.warning("Unable to open the describe cache, continuing without it: %s", e)
+                # Don't try again for the lifetime of this process
+                _describe_cache = False
+        return _describe_cache or None
+
+def invalidate(obj_id):
+    '''
+    :param obj_id: ID of a data object
+    :type obj_id: string
+
+    Removes all cached descriptions of *obj_id*, if the cache is enabled.
+    '''
+    cache = get_describe_cache()
+    if cache is not None:
+        try:
+            cache.invalidate(obj_id)
+        except sqlite3.Error as e:
+            logger.debug("Describe cache update failed: %s", e)
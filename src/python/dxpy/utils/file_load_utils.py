@@ -89,11 +89,15 @@ import fnmatch
 import sys
 import collections
 import errno
+import hashlib
 
 import dxpy
+from .. import logger
 from ..compat import environ, open, basestring
 from ..exceptions import DXError
 
+INPUT_MANIFEST_FILENAME = "job_input_manifest.json"
+
 
 def get_input_dir(job_homedir=None):
     '''
@@ -194,6 +198,64 @@ def make_unix_filename(fname):
     return fname.replace('/', '%2F')
 
 
+def get_input_manifest_file(job_input_file):
+    """
+    :param job_input_file: path to a JSON file describing the job inputs
+    :rtype: string
+    :returns: path to the input manifest, next to the job input file
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(job_input_file)), INPUT_MANIFEST_FILENAME)
+
+
+def describe_input_files(job_input_file, file_ids):
+    """
+    :param job_input_file: path to a JSON file describing the job inputs
+    :param file_ids: IDs of files linked from the job inputs
+    :type file_ids: list of strings
+    :returns: descriptions (including the parts) of the files that could be described, by file ID
+    :rtype: dict
+
+    Describes the input files of the job in bulk, with a few concurrent
+    API calls. The descriptions are kept in the input manifest, in the
+    home directory of the job, so that later calls (for example by
+    dx-download-all-inputs after the bash variables were set up) don't
+    describe the files again. The manifest is only used with the job
+    input file it was made for.
+    """
+    with open(job_input_file, "rb") as fh:
+        job_input_checksum = hashlib.sha1(fh.read()).hexdigest()
+    manifest_file = get_input_manifest_file(job_input_file)
+
+    file_descs = {}
+    try:
+        with open(manifest_file) as fh:
+            manifest = json.load(fh)
+        if manifest.get("jobInputChecksum") == job_input_checksum:
+            file_descs = manifest["files"]
+    except (IOError, OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    missing_ids = list(collections.OrderedDict.fromkeys(file_id for file_id in file_ids if file_id not in file_descs))
+    if not missing_ids:
+        return file_descs
+
+    descs = dxpy.bulk_describe(missing_ids, fields={"parts"}, default_fields=True, project=dxpy.WORKSPACE_ID)
+    for file_id, desc in zip(missing_ids, descs):
+        if desc is not None:
+            file_descs[file_id] = desc
+
+    try:
+        # Written under a temporary name first, so that the manifest is
+        # never read half-written
+        temp_file = "{}.{}.tmp".format(manifest_file, os.getpid())
+        with open(temp_file, "w") as fh:
+            json.dump({"jobInputChecksum": job_input_checksum, "files": file_descs}, fh)
+        os.rename(temp_file, manifest_file)
+    except (IOError, OSError) as e:
+        logger.debug("Unable to write the input manifest %s: %s", manifest_file, e)
+    return file_descs
+
+
 ## filter from a dictionary a list of matching keys
 def filter_dict(dict_, excl_keys):
     return {k: v for k, v in list(dict_.items()) if k not in excl_keys}
@@ -201,8 +263,9 @@ def filter_dict(dict_, excl_keys):
 
 def get_job_input_filenames(job_input_file):
     """Extract list of files, returns a set of directories to create, and
-    a set of files, with sources and destinations. The paths created are
-    relative to the input directory.
+    a set of files, with sources, destinations, and descriptions of the
+    sources (None if they could not be described in bulk). The paths
+    created are relative to the input directory.
 
     Note: we go through file names inside arrays, and create a
     separate subdirectory for each. This avoids clobbering files when
@@ -217,6 +280,18 @@ def get_job_input_filenames(job_input_file):
     files = collections.defaultdict(list)  # dictionary, with empty lists as default elements
     dirs = []  # directories to create under <idir>
 
+    # All the input files are described at once before the file names
+    # are needed, rather than one at a time through their handlers
+    file_links = []
+    for value in job_input.values():
+        for link in (value if isinstance(value, list) else [value]):
+            if dxpy.is_dxlink(link) and isinstance(dxpy.get_handler(link), dxpy.DXFile):
+                file_links.append(link)
+    file_descs = {}
+    if file_links:
+        file_descs = describe_input_files(job_input_file,
+                                          [dxpy.get_dxlink_ids(link)[0] for link in file_links])
+
     # Local function for adding a file to the list of files to be created
     # for example:
     #    iname == "seq1"
@@ -233,13 +308,15 @@ def get_job_input_filenames(job_input_file):
         handler = dxpy.get_handler(value)
         if not isinstance(handler, dxpy.DXFile):
             return
-        filename = make_unix_filename(handler.name)
+        desc = file_descs.get(handler.get_id())
+        filename = make_unix_filename(desc["name"] if desc is not None else handler.name)
         trg_dir = iname
         if subdir is not None:
             trg_dir = os.path.join(trg_dir, subdir)
         files[iname].append({'trg_fname': os.path.join(trg_dir, filename),
                              'handler': handler,
-                             'src_file_id': handler.id})
+                             'src_file_id': handler.get_id(),
+                             'src_file_desc': desc})
         dirs.append(trg_dir)
 
     # An array of inputs, for a single key. A directory
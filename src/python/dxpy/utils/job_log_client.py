@@ -21,6 +21,7 @@ Utilities for client-side usage of the streaming log API
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import heapq
 import json
 import logging
 import os
@@ -30,25 +31,44 @@ import sys
 import textwrap
 import time
 
+from collections import deque
+try:
+    # Python 3
+    from queue import Queue, Empty
+except ImportError:
+    # Python 2.7
+    from Queue import Queue, Empty
 from threading import Thread
 from websocket import WebSocketApp
 
 import dxpy
+from ..bindings.dxjob import DESCRIBE_EXECUTIONS_BATCH_SIZE
 from .describe import get_find_executions_string
 from ..exceptions import err_exit
 
 logger = logging.getLogger('websocket')
 logger.setLevel(logging.WARN)
 
+# Messages received but not yet printed; when the queue is full, the
+# websocket stops reading until messages have been printed
+MESSAGE_QUEUE_SIZE = 10000
+MAX_MESSAGE_BATCH = 1000
+
+# Watching many jobs: number of seconds for which messages are held so that
+# they can be merged in order
+ORDER_WINDOW = 1
+JOB_MESSAGE_QUEUE_SIZE = 100
+
 
 class DXJobLogStreamingException(Exception):
     pass
 
 
-class DXJobLogStreamClient:
+class DXJobLogStreamClient(object):
     def __init__(
         self, job_id, job_try=None, input_params=None, msg_output_format="{job} {level} {msg}",
-        msg_callback=None, print_job_info=True, exit_on_failed=True
+        msg_callback=None, print_job_info=True, exit_on_failed=True, max_queued_messages=MESSAGE_QUEUE_SIZE,
+        msg_filter=None
     ):
         """Initialize job log client.
 
@@ -76,8 +96,14 @@ class DXJobLogStreamClient:
         :param exit_on_failed: if True, will raise SystemExit with code of 3 if encountering a
         failed job (this is the default behavior)
         :type exit_on_failed: bool
+        :param max_queued_messages: number of messages received but not yet printed, after which
+        the client stops reading from the websocket until messages have been printed
+        :type max_queued_messages: int
+        :param msg_filter: single argument function that accepts a JSON blob with message
+        details and returns False if the message should be omitted, e.g. because of the job it
+        is from. Messages are filtered as they are received, so omitted messages are not queued.
+        :type msg_filter: callable
         """
-        # TODO: add unit tests; note it is a public class
 
         self.job_id = job_id
         self.job_try = job_try
@@ -85,6 +111,7 @@ class DXJobLogStreamClient:
         self.input_params = input_params
         self.msg_output_format = msg_output_format
         self.msg_callback = msg_callback
+        self.msg_filter = msg_filter
         self.print_job_info = print_job_info
         self.seen_jobs = {}
         self.error = False
@@ -99,6 +126,10 @@ class DXJobLogStreamClient:
             job_id=job_id
         )
         self._app = None
+        self._messages = Queue(maxsize=max_queued_messages)
+        self._worker = None
+        self._worker_exception = None
+        self._discard_messages = False
 
     def connect(self):
         while True:
@@ -151,6 +182,13 @@ class DXJobLogStreamClient:
         self.exception = exception
 
     def closed(self, code=None, reason=None):
+        # Messages which have not been printed when watching is
+        # interrupted (e.g. with Ctrl+C) are discarded
+        self._stop_worker(discard=type(self.exception) in {KeyboardInterrupt, SystemExit})
+        if self._worker_exception is not None:
+            exception, self._worker_exception = self._worker_exception, None
+            raise exception
+
         if code:
             self.closed_code = code
             self.closed_reason = reason
@@ -181,8 +219,8 @@ class DXJobLogStreamClient:
         elif self.print_job_info:
             if self.job_id not in self.seen_jobs:
                 self.seen_jobs[self.job_id] = {}
+            self.seen_jobs.update(self._describe_seen_jobs())
             for job_id in self.seen_jobs.keys():
-                self.seen_jobs[job_id] = self._describe_job(job_id)
                 print(
                     get_find_executions_string(
                         self.seen_jobs[job_id],
@@ -201,34 +239,268 @@ class DXJobLogStreamClient:
     def received_message(self, message):
         message_dict = json.loads(message)
 
-        if (
-            self.print_job_info and
-            'job' in message_dict and
-            message_dict['job'] not in self.seen_jobs
-        ):
-            self.seen_jobs[message_dict['job']] = self._describe_job(message_dict['job'])
-            print(
-                get_find_executions_string(
-                    self.seen_jobs[message_dict['job']],
-                    has_children=False,
-                    show_outputs=False,
-                    show_try=self.job_has_try
-                )
-            )
-
         if (
             message_dict.get('source') == 'SYSTEM' and
             message_dict.get('msg') == 'END_LOG'
         ):
             self._app.keep_running = False
-        elif self.msg_callback:
-            self.msg_callback(message_dict)
-        else:
-            print(self.msg_output_format.format(**message_dict))
+        elif self.msg_filter is not None and not self.msg_filter(message_dict):
+            return
+
+        # Jobs are described and messages are printed by the worker, so
+        # that describing new jobs does not hold up reading the logs
+        if self._worker is None:
+            self._worker = Thread(target=self._process_messages)
+            self._worker.daemon = True
+            self._worker.start()
+        self._messages.put(message_dict)
+
+    def _stop_worker(self, discard=False):
+        if self._worker is not None:
+            self._discard_messages = discard
+            self._messages.put(None)
+            self._worker.join()
+            self._worker = None
+            self._discard_messages = False
+
+    def _process_messages(self):
+        stopping = False
+        while not stopping:
+            batch = [self._messages.get()]
+            while len(batch) < MAX_MESSAGE_BATCH:
+                try:
+                    batch.append(self._messages.get_nowait())
+                except Empty:
+                    break
+            if None in batch:
+                batch = batch[:batch.index(None)]
+                stopping = True
+            if self._worker_exception is not None or self._discard_messages:
+                continue
+            try:
+                self._print_messages(batch)
+            except Exception as e:
+                # Handled like errors raised by the websocket callbacks
+                logger.error("error while printing job logs: %s", e)
+                self.errored(e)
+            except BaseException as e:
+                # E.g. SystemExit from a message callback, which stops
+                # the client once it has been closed
+                self._worker_exception = e
+                if self._app is not None:
+                    self._app.close()
+
+    def _print_messages(self, messages):
+        new_jobs = {}
+        if self.print_job_info:
+            new_job_ids = []
+            for message_dict in messages:
+                job_id = message_dict.get('job')
+                if job_id is not None and job_id not in self.seen_jobs and job_id not in new_job_ids:
+                    new_job_ids.append(job_id)
+            # Messages of jobs which cannot be described are printed
+            # with the job ID only
+            new_jobs = self._describe_jobs(new_job_ids)
+
+        for message_dict in messages:
+            job_id = message_dict.get('job')
+            if job_id in new_jobs and job_id not in self.seen_jobs:
+                self.seen_jobs[job_id] = new_jobs[job_id]
+                print(
+                    get_find_executions_string(
+                        self.seen_jobs[job_id],
+                        has_children=False,
+                        show_outputs=False,
+                        show_try=self.job_has_try
+                    )
+                )
+
+            if (
+                message_dict.get('source') == 'SYSTEM' and
+                message_dict.get('msg') == 'END_LOG'
+            ):
+                continue
+            elif self.msg_callback:
+                self.msg_callback(message_dict)
+            else:
+                print(self.msg_output_format.format(**message_dict))
 
     def _describe_job(self, job_id):
         return dxpy.api.job_describe(job_id, {'try': self.job_try} if self.job_has_try else {})
 
+    def _describe_jobs(self, job_ids):
+        # Describes the jobs together, in batches, leaving out those which
+        # cannot be described
+        describe_input = {'try': self.job_try} if self.job_has_try else True
+        descs = {}
+        for batch_start in range(0, len(job_ids), DESCRIBE_EXECUTIONS_BATCH_SIZE):
+            batch = job_ids[batch_start:batch_start + DESCRIBE_EXECUTIONS_BATCH_SIZE]
+            executions_input = [{"id": job_id, "describe": describe_input} for job_id in batch]
+            try:
+                results = dxpy.api.system_describe_executions({"executions": executions_input})["results"]
+            except Exception as e:
+                logger.debug("Unable to describe %s: %s", ", ".join(batch), e)
+                continue
+            for job_id, result in zip(batch, results):
+                if result.get("describe") is not None:
+                    descs[job_id] = result["describe"]
+                else:
+                    logger.debug("Unable to describe %s", job_id)
+        return descs
+
+    def _describe_seen_jobs(self):
+        # Jobs which cannot be described again keep their earlier
+        # descriptions
+        descs = self._describe_jobs([job_id for job_id in self.seen_jobs if job_id != self.job_id])
+        descs[self.job_id] = self._describe_job(self.job_id)
+        return descs
+
+
+class DXMultiJobLogStreamClient(DXJobLogStreamClient):
+    def __init__(
+        self, job_ids, input_params=None, msg_output_format="{job} {level} {msg}", msg_callback=None,
+        msg_filter=None, print_job_info=True, exit_on_failed=True, max_connections=None,
+        order_window=ORDER_WINDOW, max_queued_messages=MESSAGE_QUEUE_SIZE
+    ):
+        """Initialize a log client which watches several jobs at once.
+
+        Each job is watched over its own websocket, all at the same time unless
+        ``max_connections`` is given. The messages of all the jobs are merged into one stream
+        ordered by timestamp: each message is held for ``order_window`` seconds (or until
+        ``max_queued_messages`` messages are held), so that earlier messages of other jobs which
+        are received shortly after it are printed first.
+
+        With ``max_connections``, at most that many websockets are open at a time; a running job
+        keeps its websocket open until it is done, so further jobs are only watched as earlier
+        ones finish, and their messages are not ordered with those already printed.
+
+        :param job_ids: dxids of the jobs to watch
+        :type job_ids: list of str
+        :param input_params: blob with connection parameters for each job, see
+        :class:`DXJobLogStreamClient`
+        :type input_params: dict
+        :param max_connections: number of jobs watched at a time; by default, all of them
+        :type max_connections: int
+        :param order_window: number of seconds for which messages are held to be merged in order
+        :type order_window: int or float
+        :param max_queued_messages: number of messages held, after which the clients stop
+        reading from their websockets until messages have been printed
+        :type max_queued_messages: int
+
+        ``msg_output_format``, ``msg_callback``, ``msg_filter``, ``print_job_info``, and
+        ``exit_on_failed`` are as for :class:`DXJobLogStreamClient`, and apply to the messages
+        and jobs of all the watched jobs.
+        """
+        super(DXMultiJobLogStreamClient, self).__init__(
+            None, input_params=input_params, msg_output_format=msg_output_format, msg_callback=msg_callback,
+            print_job_info=print_job_info, exit_on_failed=exit_on_failed, max_queued_messages=max_queued_messages,
+            msg_filter=msg_filter
+        )
+        self.job_ids = list(job_ids)
+        self.max_connections = max_connections
+        self.order_window = order_window
+        self.max_queued_messages = max_queued_messages
+        self.clients = [
+            DXJobLogStreamClient(
+                job_id, input_params=input_params, msg_callback=self._messages.put, msg_filter=msg_filter,
+                print_job_info=False, exit_on_failed=False, max_queued_messages=JOB_MESSAGE_QUEUE_SIZE
+            )
+            for job_id in self.job_ids
+        ]
+        self.errors = {}
+
+    def connect(self):
+        clients = Queue()
+        for client in self.clients:
+            clients.put(client)
+        connections = len(self.clients)
+        if self.max_connections is not None:
+            connections = min(self.max_connections, connections)
+        for _ in range(connections):
+            worker = Thread(target=self._watch_jobs, args=(clients,))
+            worker.daemon = True
+            worker.start()
+
+        # Held messages, as (timestamp, sequence number, message) in a
+        # heap, and the times at which they were received in order
+        held, received = [], deque()
+        emitted = set()
+        sequence_number = 0
+        watching = len(self.clients)
+        while watching:
+            timeout = max(received[0][0] + self.order_window - time.time(), 0) if received else None
+            try:
+                message_dict = self._messages.get(timeout=timeout)
+            except Empty:
+                pass
+            else:
+                if message_dict is None:
+                    watching -= 1
+                else:
+                    heapq.heappush(held, (message_dict.get('timestamp', 0), sequence_number, message_dict))
+                    received.append((time.time(), sequence_number))
+                    sequence_number += 1
+
+            batch = []
+            while held:
+                while received and received[0][1] in emitted:
+                    emitted.discard(received.popleft()[1])
+                if len(held) <= self.max_queued_messages and received[0][0] + self.order_window > time.time():
+                    break
+                _, held_number, message_dict = heapq.heappop(held)
+                emitted.add(held_number)
+                batch.append(message_dict)
+            if batch:
+                self._print_messages(batch)
+
+        self._print_messages([heapq.heappop(held)[2] for _ in range(len(held))])
+        self._print_summary()
+
+    def _watch_jobs(self, clients):
+        while True:
+            try:
+                client = clients.get_nowait()
+            except Empty:
+                return
+            try:
+                client.connect()
+            except Exception as e:
+                self.errors[client.job_id] = e
+            finally:
+                self._messages.put(None)
+
+    def _print_summary(self):
+        # The watched jobs were described by their clients when they
+        # were closed
+        job_descs = {client.job_id: client.seen_jobs[client.job_id]
+                     for client in self.clients if client.job_id in client.seen_jobs}
+        if self.print_job_info:
+            for job_id in self.job_ids:
+                if job_id not in self.seen_jobs:
+                    self.seen_jobs[job_id] = {}
+            job_descs.update(self._describe_jobs([job_id for job_id in self.seen_jobs if job_id not in job_descs]))
+            self.seen_jobs.update(job_descs)
+            for job_id in self.seen_jobs.keys():
+                if not self.seen_jobs[job_id]:
+                    continue
+                print(
+                    get_find_executions_string(
+                        self.seen_jobs[job_id],
+                        has_children=False,
+                        show_outputs=True,
+                        show_try=self.job_has_try
+                    )
+                )
+
+        if self.errors:
+            raise DXJobLogStreamingException("".join(
+                "{job}: {error}".format(job=job_id, error=self.errors[job_id])
+                for job_id in self.job_ids if job_id in self.errors
+            ))
+        if (self.exit_on_failed and
+                any(job_descs.get(job_id, {}).get('state') in {'failed', 'terminated'} for job_id in self.job_ids)):
+            err_exit(code=3)
+
 
 class CursesDXJobLogStreamClient(DXJobLogStreamClient):
 
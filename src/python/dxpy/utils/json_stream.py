@@ -0,0 +1,137 @@
+# Copyright (C) 2013-2016 DNAnexus, Inc.
+#
+# This file is part of dx-toolkit (DNAnexus platform client libraries).
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may not
+#   use this file except in compliance with the License. You may obtain a copy
+#   of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+'''
+Incremental reader for large JSON documents, such as query results with
+millions of rows, which should not be loaded into memory all at once.
+'''
+
+from __future__ import print_function, unicode_literals, division, absolute_import
+
+import json, codecs
+
+DEFAULT_CHUNK_SIZE = 1024*64
+_WHITESPACE = " \t\n\r"
+
+
+class JSONStreamReader(object):
+    '''
+    :param fh: Binary file-like object containing a JSON object, such as an HTTP response opened with ``preload_content=False``
+    :param chunk_size: Number of bytes to read from *fh* at a time
+    :type chunk_size: int
+
+    Reads the top-level JSON object in *fh* one value at a time. Only
+    the value being parsed (and at most one chunk of data after it) is
+    kept in memory, and arrays given in *stream_keys* are read one
+    element at a time, so memory use does not depend on the size of the
+    document (as long as individual values are small). Example::
+
+        for key, value in JSONStreamReader(response).iter_items(stream_keys={"results"}):
+            if key == "results":
+                for row in value:
+                    ...
+
+    '''
+
+    def __init__(self, fh, chunk_size=DEFAULT_CHUNK_SIZE):
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size=None):
+        if self._eof:
+            return False
+        data = self._fh.read(size or self._chunk_size)
+        if not data:
+            self._eof = True
+        # Drop the data that has already been parsed
+        self._buf = self._buf[self._pos:] + self._utf8_decoder.decode(data, final=self._eof)
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars:
+            raise ValueError("Expected one of {} in JSON document, got {!r}".format(list(chars), char))
+        self._pos += 1
+        return char
+
+    def _read_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buf, self._pos)
+                # A number at the end of the buffer may continue in the
+                # next chunk
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except ValueError:
+                if self._eof:
+                    raise
+            # Read at least as much again as is buffered, so that a large
+            # value is not parsed over and over
+            self._fill(max(self._chunk_size, len(self._buf) - self._pos))
+
+    def _iter_array(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._read_value()
+            if self._expect(",]") == "]":
+                return
+
+    def iter_items(self, stream_keys=()):
+        '''
+        :param stream_keys: Keys whose values, if they are arrays, are yielded as iterators over their elements instead of lists
+        :type stream_keys: collection of strings
+        :returns: Generator of (key, value) pairs of the top-level object, in the order in which they appear
+
+        An iterator yielded for a key in *stream_keys* must be consumed
+        before the next pair is requested; if it is not, the remaining
+        elements are skipped.
+        '''
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._read_value()
+            self._expect(":")
+            if key in stream_keys and self._peek() == "[":
+                elements = self._iter_array()
+                yield key, elements
+                for _ in elements:
+                    pass
+            else:
+                yield key, self._read_value()
+            if self._expect(",}") == "}":
+                return
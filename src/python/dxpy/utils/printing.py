@@ -26,18 +26,31 @@ from ..exceptions import DXCLIError
 import contextlib
 import io
 
-if sys.stdout.isatty():
-    try:
-        tty_rows, tty_cols = map(int, subprocess.check_output(['stty', 'size'], stderr=open(os.devnull, 'w')).split())
-        std_width = min(tty_cols - 2, 100)
-    except:
+def refresh_terminal_settings():
+    '''
+    Sets the terminal size, output width, and colors from the current
+    standard output. This is done when the module is imported, and again
+    by processes whose standard streams are replaced afterwards.
+    '''
+    global tty_rows, tty_cols, std_width, color_state
+    if sys.stdout.isatty():
+        try:
+            if hasattr(os, 'get_terminal_size'):
+                # Avoids starting a subprocess each time dx is run
+                tty_cols, tty_rows = os.get_terminal_size(sys.stdout.fileno())
+            else:
+                tty_rows, tty_cols = map(int, subprocess.check_output(['stty', 'size'], stderr=open(os.devnull, 'w')).split())
+            std_width = min(tty_cols - 2, 100)
+        except:
+            tty_rows, tty_cols = 24, 80
+            std_width = 78
+        color_state = True
+    else:
         tty_rows, tty_cols = 24, 80
         std_width = 78
-    color_state = True
-else:
-    tty_rows, tty_cols = 24, 80
-    std_width = 78
-    color_state = False
+        color_state = False
+
+refresh_terminal_settings()
 
 delimiter = None
 
@@ -26,8 +26,10 @@ For more details, see external documentation [TODO: Put link here].
 from __future__ import print_function, unicode_literals, division, absolute_import
 
 import os, sys, json, re
+from threading import Lock
 
 import dxpy
+from . import describe_cache, get_futures_threadpool, response_iterator
 from .describe import get_ls_l_desc
 from ..compat import str, input, basestring
 from ..cli import try_call, INTERACTIVE_CLI
@@ -699,15 +701,23 @@ def _check_resolution_needed(path, project, folderpath, entity_name, expected_cl
                 describe['project'] = project
             elif dxpy.WORKSPACE_ID is not None:
                 describe['project'] = dxpy.WORKSPACE_ID
+
+        def describe_entity(describe_input):
+            cache = describe_cache.get_describe_cache() if is_data_obj_id(entity_name) else None
+            if cache is None:
+                return dxpy.DXHTTPRequest('/' + entity_name + '/describe', describe_input)
+            return cache.describe(entity_name, dict(describe_input),
+                                  lambda _input: dxpy.DXHTTPRequest('/' + entity_name + '/describe', _input))
+
         try:
-            desc = dxpy.DXHTTPRequest('/' + entity_name + '/describe', describe)
+            desc = describe_entity(describe)
             desc = dxpy.append_underlying_workflow_describe(desc)
         except Exception as details:
             if 'project' in describe:
                 # Now try it without the hint
                 del describe['project']
                 try:
-                    desc = dxpy.DXHTTPRequest('/' + entity_name + '/describe', describe)
+                    desc = describe_entity(describe)
                 except Exception as details2:
                     raise ResolutionError(str(details2))
             else:
@@ -938,6 +948,78 @@ def _format_resolution_output(path, project, folderpath, entity_name, result):
         return {"project": None, "folder": None, "name": None}
 
 
+# Maximum number of describe calls made at once by
+# resolve_multiple_existing_paths for IDs that are not described in bulk
+RESOLVE_DESCRIBE_THREADS = 8
+
+_resolve_describe_threadpool = None
+_resolve_describe_threadpool_mutex = Lock()
+
+def _get_resolve_describe_threadpool():
+    global _resolve_describe_threadpool
+    with _resolve_describe_threadpool_mutex:
+        if _resolve_describe_threadpool is None:
+            _resolve_describe_threadpool = get_futures_threadpool(max_workers=RESOLVE_DESCRIBE_THREADS)
+        return _resolve_describe_threadpool
+
+
+def _describe_hashid_paths(hashid_paths):
+    """
+    :param hashid_paths: (path, project, folderpath, entity_name) tuples, as
+                         returned by resolve_path, whose entity_name is a
+                         DX ID
+    :type hashid_paths: list
+    :returns: A dictionary mapping each path to its resolved object, in the
+              form returned by resolve_multiple_existing_paths
+    :rtype: dict
+
+    Describes the entities of many paths at once. Data object IDs are
+    described in batches with :func:`dxpy.bulk_describe`, first with the
+    project of the path as a hint, and then without it for the objects
+    that could not be described (as _check_resolution_needed does for a
+    single ID). Other IDs, and all IDs if the describe cache is enabled,
+    are described concurrently with _check_resolution_needed.
+    """
+    done_objects = {}
+    in_bulk = []
+    concurrently = []
+    for path_info in hashid_paths:
+        if is_data_obj_id(path_info[3]) and not describe_cache.describe_cache_enabled():
+            in_bulk.append(path_info)
+        else:
+            concurrently.append(path_info)
+
+    def get_link(entity_name, project):
+        if project is None:
+            return entity_name
+        return {"$dnanexus_link": {"project": project, "id": entity_name}}
+
+    descriptions = list(dxpy.bulk_describe(get_link(entity_name, project)
+                                           for _path, project, _folderpath, entity_name in in_bulk))
+    undescribed = [i for i, desc in enumerate(descriptions) if desc is None and in_bulk[i][1] is not None]
+    for i, desc in zip(undescribed, dxpy.bulk_describe(in_bulk[i][3] for i in undescribed)):
+        descriptions[i] = desc
+    for (path, project, folderpath, entity_name), desc in zip(in_bulk, descriptions):
+        if desc is not None:
+            entity_name = {"id": entity_name, "describe": desc}
+        done_objects[path] = {"project": project, "folder": folderpath, "name": entity_name}
+
+    def check_resolution_needed(path, project, folderpath, entity_name):
+        try:
+            _must_resolve, project, folderpath, entity_name = _check_resolution_needed(
+                path, project, folderpath, entity_name)
+        except:
+            pass
+        return path, {"project": project, "folder": folderpath, "name": entity_name}
+
+    requests = ((check_resolution_needed, path_info, {}) for path_info in concurrently)
+    for path, result in response_iterator(requests, _get_resolve_describe_threadpool(),
+                                          max_active_tasks=RESOLVE_DESCRIBE_THREADS,
+                                          do_first_task_sequentially=False):
+        done_objects[path] = result
+    return done_objects
+
+
 def resolve_multiple_existing_paths(paths):
     """
     :param paths: A list of paths to items that need to be resolved
@@ -982,8 +1064,13 @@ def resolve_multiple_existing_paths(paths):
     done_objects = {}  # Return value
     to_resolve_in_batch_paths = []  # Paths to resolve
     to_resolve_in_batch_inputs = []  # Project, folderpath, and entity name
+    to_describe = []  # Paths to DX IDs, with their project, folderpath, and entity name
     for path in paths:
         project, folderpath, entity_name = resolve_path(path, expected='entity')
+        if entity_name is not None and is_hashid(entity_name):
+            # Described together below
+            to_describe.append((path, project, folderpath, entity_name))
+            continue
         try:
             must_resolve, project, folderpath, entity_name = _check_resolution_needed(
                 path, project, folderpath, entity_name)
@@ -1008,6 +1095,8 @@ def resolve_multiple_existing_paths(paths):
             # No need to resolve
             done_objects[path] = {"project": project, "folder": folderpath, "name": entity_name}
 
+    done_objects.update(_describe_hashid_paths(to_describe))
+
     # Call resolveDataObjects
     resolution_results = dxpy.resolve_data_objects(to_resolve_in_batch_inputs)
     for path, inputs, result in zip(to_resolve_in_batch_paths, to_resolve_in_batch_inputs,
@@ -481,21 +481,23 @@ def _create_temporary_projects(enabled_regions, bill_to):
     iii. current context project, if none of the above are set
     iv. the regions where dependent applets/apps/workflows are enabled
     """
-    # Create one temp project in each region
-    projects_by_region = {}  # Project IDs by region
-    for region in enabled_regions:
-        try:
-            project_input = {"name": "Temporary build project for dx build global workflow",
-                             "region": region,
-                             "billTo": bill_to}
-            temp_project = dxpy.api.project_new(project_input)["id"]
-            projects_by_region[region] = temp_project
-            logger.debug("Created temporary project {} to build in".format(temp_project))
-        except:
-            # Clean up any temp projects that might have been created
-            if projects_by_region:
-                dxpy.executable_builder.delete_temporary_projects(projects_by_region.values())
-            err_exit()
+    # Create one temp project in each region, in all regions at once
+    def create_project(region, _):
+        project_input = {"name": "Temporary build project for dx build global workflow",
+                         "region": region,
+                         "billTo": bill_to}
+        temp_project = dxpy.api.project_new(project_input)["id"]
+        logger.debug("Created temporary project {} to build in".format(temp_project))
+        return temp_project
+
+    # Project IDs by region
+    projects_by_region, error = dxpy.executable_builder.run_in_regions(
+        create_project, dict((region, None) for region in enabled_regions))
+    if error is not None:
+        # Clean up any temp projects that might have been created
+        if projects_by_region:
+            dxpy.executable_builder.delete_temporary_projects(projects_by_region.values())
+        err_exit(exception=error)
     return projects_by_region
 
 
@@ -506,22 +508,20 @@ def _build_underlying_workflows(enabled_regions, json_spec, args):
     The caller is responsible for destroying the projects if this method returns properly.
     """
     projects_by_region = _create_temporary_projects(enabled_regions, json_spec["billTo"])
-    workflows_by_region = {}
 
-    try:
-        for region, project in projects_by_region.items():
-            # Override workflow project ID and folder in workflow spec 
-            # when building underlying workflow in temporary project
-            json_spec['project'] = project
-            json_spec['folder'] = '/'
-            workflow_id = _build_regular_workflow(json_spec)
-            logger.debug("Created workflow " + workflow_id + " successfully")
-            workflows_by_region[region] = workflow_id
-    except:
+    def build_workflow(region, project):
+        # Override workflow project ID and folder in workflow spec
+        # when building underlying workflow in temporary project
+        workflow_id = _build_regular_workflow(dict(json_spec, project=project, folder='/'))
+        logger.debug("Created workflow " + workflow_id + " successfully")
+        return workflow_id
+
+    workflows_by_region, error = dxpy.executable_builder.run_in_regions(build_workflow, projects_by_region)
+    if error is not None:
         # Clean up
         if projects_by_region:
             dxpy.executable_builder.delete_temporary_projects(projects_by_region.values())
-        raise
+        raise error
 
     return workflows_by_region, projects_by_region
 
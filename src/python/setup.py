@@ -107,7 +107,8 @@ setup(
     install_requires = dependencies,
     extras_require={
         'pandas': ["pandas==1.3.5; python_version>='3.7'", "pandas>=0.23.3,<=0.25.3; python_version>='3.5.3' and python_version<'3.7'", "pandas>=0.23.3,< 0.25.0; python_version<'3.5.3'"],
-        'xattr': ["xattr==0.10.1; sys_platform == 'linux2' or sys_platform == 'linux'"]
+        'xattr': ["xattr==0.10.1; sys_platform == 'linux2' or sys_platform == 'linux'"],
+        'aio': ["aiohttp>=3.7; python_version>='3.7'"]
     },
     tests_require = test_dependencies,
     test_suite = "test",
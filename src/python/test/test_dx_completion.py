@@ -51,6 +51,8 @@ class TestDXTabCompletion(unittest.TestCase):
         os.environ['_DX_ARC_DEBUG'] = '1'
         os.environ['COMP_WORDBREAKS'] = '"\'@><=;|&(:'
         os.environ['DX_PROJECT_CONTEXT_ID'] = self.project_id
+        # Objects are created between completions without running dx
+        os.environ['DX_COMPLETION_CACHE'] = '0'
         dxpy.set_workspace_id(self.project_id)
 
     def tearDown(self):
@@ -61,7 +63,8 @@ class TestDXTabCompletion(unittest.TestCase):
             if 'completed' not in resp:
                 raise DXError('Error removing folder')
             completed = resp['completed']
-        for var in 'IFS', '_ARGCOMPLETE', '_DX_ARC_DEBUG', 'COMP_WORDBREAKS', 'DX_PROJECT_CONTEXT_ID':
+        for var in ('IFS', '_ARGCOMPLETE', '_DX_ARC_DEBUG', 'COMP_WORDBREAKS', 'DX_PROJECT_CONTEXT_ID',
+                    'DX_COMPLETION_CACHE'):
             if var in os.environ:
                 del os.environ[var]
 
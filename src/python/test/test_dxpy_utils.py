@@ -19,18 +19,35 @@
 
 from __future__ import print_function, unicode_literals, division, absolute_import
 
-import unittest, time, json, re, os
+import unittest, time, json, re, os, io, sys, argparse, gzip, shutil, socket, logging, tarfile, tempfile, hashlib, threading, subprocess
 import dateutil.parser
 import dxpy
 from dxpy import AppError, AppInternalError, DXError, DXFile, DXRecord
 from dxpy.utils import (exec_utils, genomic_utils, response_iterator, get_futures_threadpool, DXJSONEncoder,
-                        normalize_timedelta, normalize_time_input, config, Nonce)
+                        normalize_timedelta, normalize_time_input, config, Nonce, describe_cache, completion_cache)
 from dxpy.utils.exec_utils import DXExecDependencyInstaller
+from dxpy.utils.block_cache import DXBlockCache
+from dxpy.bindings.dxfile import _ReadAheadController
 from dxpy.utils.pretty_print import flatten_json_array
+from dxpy.utils.json_stream import JSONStreamReader
 from dxpy.compat import USING_PYTHON2
 import dxpy_testutil as testutil
+from mock import patch
 from dxpy.system_requirements import SystemRequirementsDict
 
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+try:
+    import asyncio
+    from aiohttp import web
+    import dxpy.aio
+    HAVE_AIO = True
+except (ImportError, SyntaxError):
+    HAVE_AIO = False
+
 # TODO: unit tests for dxpy.utils.get_field_from_jbor, get_job_from_jbor, is_job_ref
 
 
@@ -395,6 +412,1292 @@ class TestNonceGeneration(unittest.TestCase):
         self.assertIn("nonce", updated_input)
         self.assertEqual(nonce, updated_input["nonce"])
 
+class TestDescribeCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = describe_cache.DXDescribeCache(os.path.join(self.temp_dir, "cache.sqlite"), max_entries=2)
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def describer(self, state, modified=1):
+        def describe_fn(describe_input):
+            self.calls.append(describe_input)
+            return {"id": "file-" + "x"*24, "state": state, "modified": modified, "name": "foo"}
+        return describe_fn
+
+    def test_closed_object_is_served_from_cache(self):
+        file_id = "file-" + "x"*24
+        describe_input = {"fields": {"parts": True}, "defaultFields": True, "project": "project-" + "y"*24}
+        for _ in range(3):
+            desc = self.cache.describe(file_id, describe_input, self.describer("closed"))
+            self.assertEqual(desc["name"], "foo")
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+        # A different field set is a different entry
+        self.cache.describe(file_id, {"project": "project-" + "y"*24}, self.describer("closed"))
+        self.assertEqual(len(self.calls), 2)
+
+        self.cache.invalidate(file_id)
+        self.cache.describe(file_id, describe_input, self.describer("closed"))
+        self.assertEqual(len(self.calls), 3)
+
+    def test_open_object_is_revalidated(self):
+        file_id = "file-" + "x"*24
+        self.cache.describe(file_id, {}, self.describer("open", modified=1))
+        self.cache.describe(file_id, {}, self.describer("open", modified=1))
+        self.assertEqual(self.calls[-1], {"fields": {"modified": True, "state": True}})
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["revalidations"], 1)
+
+        desc = self.cache.describe(file_id, {}, self.describer("closing", modified=2))
+        self.assertEqual(desc["state"], "closing")
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_partial_describe_is_not_cached(self):
+        file_id = "file-" + "x"*24
+        def describe_fn(describe_input):
+            self.calls.append(describe_input)
+            return {"id": file_id, "state": "closed"}
+        self.cache.describe(file_id, {"fields": {"state": True}}, describe_fn)
+        self.cache.describe(file_id, {"fields": {"state": True}}, describe_fn)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        for i in range(3):
+            self.cache.describe("file-" + str(i)*24, {}, self.describer("closed"))
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+class TestCompletionCache(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, "completion_cache.sqlite")
+        self.fetches = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def fetch(self, listing):
+        def fetch_fn():
+            self.fetches.append(listing)
+            return listing
+        return fetch_fn
+
+    def test_ttl_and_persistence(self):
+        cache = completion_cache.DXCompletionCache(self.path, ttl=60, background=False)
+        self.assertEqual(cache.get(("folders", "project-x", "/"), self.fetch(["/a"])), ["/a"])
+        self.assertEqual(cache.get(("folders", "project-x", "/"), self.fetch(["/b"])), ["/a"])
+        self.assertEqual(self.fetches, [["/a"]])
+        # Another process sees the listing
+        other = completion_cache.DXCompletionCache(self.path, ttl=60, background=False)
+        self.assertEqual(other.peek(("folders", "project-x", "/")), ["/a"])
+        self.assertIsNone(other.peek(("folders", "project-x", "/a")))
+        # Expired listings are fetched again
+        expired = completion_cache.DXCompletionCache(self.path, ttl=0, background=False)
+        self.assertEqual(expired.get(("folders", "project-x", "/"), self.fetch(["/b"])), ["/b"])
+        self.assertEqual(expired.stats(), {"hits": 0, "stale_hits": 0, "misses": 1, "background_fetches": 0})
+
+    def test_background_refresh(self):
+        cache = completion_cache.DXCompletionCache(ttl=0, max_stale=600)
+        self.assertEqual(cache.get(("apps",), self.fetch(["a"])), ["a"])
+        # The expired listing is returned while a new one is fetched
+        self.assertEqual(cache.get(("apps",), self.fetch(["a", "b"])), ["a"])
+        cache._threadpool.submit(lambda: None).result()
+        cache.ttl = 60
+        self.assertEqual(cache.get(("apps",), self.fetch(["c"])), ["a", "b"])
+        cache.prefetch(("apps", "x"), self.fetch(["x"]))
+        cache._threadpool.submit(lambda: None).result()
+        self.assertEqual(cache.peek(("apps", "x")), ["x"])
+        self.assertEqual(self.fetches, [["a"], ["a", "b"], ["x"]])
+
+    def test_data_names_narrowed_from_shorter_prefix(self):
+        from dxpy.utils import completer
+        cache = completion_cache.DXCompletionCache(ttl=60, background=False)
+        objects = [("a1", False), ("a2", True), ("b1", False)]
+        queries = []
+        def find_data_objects(name, visibility, limit, **kwargs):
+            queries.append((name, visibility))
+            return [{"describe": {"name": obj_name, "hidden": hidden}} for obj_name, hidden in objects
+                    if obj_name.startswith(name[:-1])][:limit]
+        dxproj = dxpy.DXProject("project-" + "0" * 24)
+        with patch("dxpy.utils.completer.get_completion_cache", return_value=cache), \
+                patch("dxpy.find_data_objects", side_effect=find_data_objects):
+            self.assertEqual(completer.get_data_matches("/", 0, dxproj, "/"), ["/a1", "/b1"])
+            self.assertEqual(completer.get_data_matches("/a", 0, dxproj, "/"), ["/a1", "/a2"])
+            self.assertEqual(completer.get_data_matches("/a", 0, dxproj, "/", visibility="hidden"), ["/a2"])
+            # A listing filled up to the limit is not narrowed
+            with patch("dxpy.utils.completer.DATA_MATCHES_LIMIT", 3):
+                self.assertEqual(completer.get_data_matches("/b", 0, dxproj, "/"), ["/b1"])
+        self.assertEqual(queries, [("*", "either"), ("b*", "either")])
+
+class TestBulkDescribe(unittest.TestCase):
+    def describe_data_objects(self, input_params, **kwargs):
+        self.batches.append(input_params["objects"])
+        return {"results": [{"describe": {"id": obj["id"], "project": obj.get("project")}}
+                            if obj["id"] != "file-" + "9"*24 else {} for obj in input_params["objects"]]}
+
+    def setUp(self):
+        self.batches = []
+
+    def test_batches_preserve_order(self):
+        ids = ["file-" + str(i)*24 for i in range(9)]
+        with patch("dxpy.api.system_describe_data_objects", side_effect=self.describe_data_objects):
+            descs = list(dxpy.bulk_describe(ids, fields={"name"}, batch_size=2))
+        self.assertEqual([desc["id"] for desc in descs], ids)
+        self.assertEqual([len(batch) for batch in self.batches], [2, 2, 2, 2, 1])
+        self.assertEqual(self.batches[0][0]["describe"], {"fields": {"name": True}})
+
+    def test_links_projects_and_missing_objects(self):
+        project = "project-" + "p"*24
+        inputs = [{"$dnanexus_link": {"id": "file-" + "1"*24, "project": "project-" + "q"*24}},
+                  {"$dnanexus_link": "file-" + "2"*24},
+                  "file-" + "9"*24]
+        with patch("dxpy.api.system_describe_data_objects", side_effect=self.describe_data_objects):
+            descs = list(dxpy.bulk_describe(inputs, project=project))
+        self.assertEqual(descs[0], {"id": "file-" + "1"*24, "project": "project-" + "q"*24})
+        self.assertEqual(descs[1], {"id": "file-" + "2"*24, "project": project})
+        self.assertIsNone(descs[2])
+        self.assertEqual(self.batches[0][0]["describe"], True)
+
+class TestDownloadDXFiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.contents = {"file-" + "a"*24: [b"0123456789", b"abcdefghijklmnopq", b"XYZ"],
+                         "file-" + "b"*24: [b"hello world"],
+                         "file-" + "c"*24: [b""]}
+        self.corrupt_ranges = set()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def describe(self, file_id):
+        return {"id": file_id,
+                "parts": {str(i + 1): {"size": len(part), "md5": hashlib.md5(part).hexdigest()}
+                          for i, part in enumerate(self.contents[file_id])}}
+
+    def read_range(self, url, headers, start, end, timeout, sub_range=True):
+        data = b"".join(self.contents[url])[start:end + 1]
+        if (url, start) in self.corrupt_ranges:
+            # Corrupt the first response only
+            self.corrupt_ranges.remove((url, start))
+            return data[::-1] if len(data) > 1 else b"?"
+        return data
+
+    def download_to(self, destinations, **kwargs):
+        downloads = [dict(dxid=file_id, filename=filename, describe_output=self.describe(file_id))
+                     for file_id, filename in destinations]
+        with patch.object(DXFile, "get_download_url", autospec=True, side_effect=lambda handler, **kw: (handler.get_id(), {})), \
+             patch("dxpy._dxhttp_read_range", side_effect=self.read_range):
+            dxpy.download_dxfiles(downloads, **kwargs)
+
+    def download(self, file_ids, **kwargs):
+        self.download_to([(file_id, os.path.join(self.temp_dir, file_id)) for file_id in file_ids], **kwargs)
+        for file_id in file_ids:
+            with open(os.path.join(self.temp_dir, file_id), "rb") as fh:
+                self.assertEqual(fh.read(), b"".join(self.contents[file_id]))
+
+    def test_download_many_files(self):
+        self.download(sorted(self.contents), chunksize=4, max_bytes_in_flight=9)
+
+    def test_resume(self):
+        file_id = "file-" + "a"*24
+        with open(os.path.join(self.temp_dir, file_id), "wb") as fh:
+            fh.write(b"0123456789abcdeXXXXXXXXXXXXXXXXXXXXXXX")
+        self.download([file_id], chunksize=5)
+
+    def test_corrupt_chunk_is_retried(self):
+        file_id = "file-" + "a"*24
+        self.corrupt_ranges.add((file_id, 14))
+        self.download([file_id], chunksize=4)
+
+    def test_corrupt_whole_part_is_retried(self):
+        # Parts fetched in one chunk are hashed by the download threads
+        file_id = "file-" + "a"*24
+        self.corrupt_ranges.add((file_id, 10))
+        self.download([file_id], chunksize=100)
+
+    def test_verify_downloaded_parts(self):
+        file_id = "file-" + "a"*24
+        desc = self.describe(file_id)
+        filename = os.path.join(self.temp_dir, file_id)
+        with open(filename, "wb") as fh:
+            fh.write(b"0123456789abcdefghijklmnopqXY?")
+        parts_to_get = sorted(desc["parts"], key=int)
+        verified = []
+        with open(filename, "rb+") as fh:
+            pos = dxpy.bindings.dxfile_functions._verify_downloaded_parts(fh, file_id, desc["parts"], parts_to_get,
+                                                                          progress_callback=verified.append)
+        self.assertEqual(pos, 27)
+        self.assertEqual(verified, [10, 27])
+        self.assertEqual(parts_to_get, ["3"])
+        self.assertEqual(os.path.getsize(filename), 27)
+
+    def test_verify_with_journal(self):
+        file_id = "file-" + "a"*24
+        desc = self.describe(file_id)
+        filename = os.path.join(self.temp_dir, file_id)
+        journal = dxpy.bindings.dxfile_functions._PartJournal(filename, file_id)
+        with open(filename, "wb") as fh:
+            fh.write(b"0123456789abcdefghijklmnopq")
+
+        def verify():
+            # Returns the verified position, the remaining parts, and the sizes of the data hashed
+            parts_to_get = sorted(desc["parts"], key=int)
+            with open(filename, "rb+") as fh, \
+                 patch("dxpy.bindings.dxfile_functions.PART_JOURNAL_SAMPLE_SIZE", 4), \
+                 patch("dxpy.bindings.dxfile_functions._hash_local_range",
+                       side_effect=dxpy.bindings.dxfile_functions._hash_local_range) as hash_local_range:
+                pos = dxpy.bindings.dxfile_functions._verify_downloaded_parts(fh, file_id, desc["parts"],
+                                                                              parts_to_get, journal=journal)
+            return pos, parts_to_get, [call[0][2] for call in hash_local_range.call_args_list]
+
+        self.assertEqual(verify(), (27, ["3"], [10, 17]))
+        # The second time, only a sample of each journaled part is hashed
+        self.assertEqual(verify(), (27, ["3"], [4, 4]))
+
+        # A replaced local file does not match the journal
+        with open(filename, "wb") as fh:
+            fh.write(b"X123456789abcdefghijklmnopq")
+        self.assertEqual(verify()[:2], (0, ["1", "2", "3"]))
+
+        # Downloading records the parts, and finishing the download removes the journal
+        with patch("dxpy.bindings.dxfile_functions._PartJournal.record",
+                   autospec=True, side_effect=dxpy.bindings.dxfile_functions._PartJournal.record) as record:
+            self.download([file_id])
+        self.assertEqual(sorted(call[0][1] for call in record.call_args_list), ["1", "2", "3"])
+        self.assertFalse(os.path.exists(journal.path))
+
+    def test_files_with_the_same_name(self):
+        # Same-named files are downloaded one after the other, so the
+        # last one is left, as when they were downloaded one by one
+        from dxpy.cli.download import _download_files
+        descs = []
+        for file_id in ("file-" + "a"*24, "file-" + "b"*24, "file-" + "c"*24):
+            descs.append(dict(self.describe(file_id), name="same" if file_id != "file-" + "c"*24 else "other",
+                              size=len(b"".join(self.contents[file_id])), state="closed", project=None))
+            descs[-1]["class"] = "file"
+        args = argparse.Namespace(overwrite=True, show_progress=False, symlink_max_tries=None)
+        with patch.object(DXFile, "get_download_url", autospec=True, side_effect=lambda handler, **kw: (handler.get_id(), {})), \
+             patch("dxpy._dxhttp_read_range", side_effect=self.read_range):
+            _download_files({None: [{"describe": desc} for desc in descs]}, self.temp_dir, args)
+        with open(os.path.join(self.temp_dir, "same"), "rb") as fh:
+            self.assertEqual(fh.read(), b"hello world")
+        with open(os.path.join(self.temp_dir, "other"), "rb") as fh:
+            self.assertEqual(fh.read(), b"")
+
+        # download_dxfiles does not download two files to one path at once
+        filename = os.path.join(self.temp_dir, "same")
+        with self.assertRaisesRegex(DXError, "still being downloaded"):
+            self.download_to([("file-" + "a"*24, filename), ("file-" + "b"*24, filename)], chunksize=4)
+
+    def test_journal_is_synced_in_batches(self):
+        from dxpy.bindings.dxfile_functions import _PartJournal
+        journal = _PartJournal(os.path.join(self.temp_dir, "file"), "file-" + "a"*24)
+        with patch("os.fsync") as fsync:
+            journal.reset()
+            for part_id in range(1, 101):
+                journal.record(str(part_id), "0"*32, (4, "1"*32))
+            self.assertEqual(fsync.call_count, 1)
+            self.assertEqual(len(journal.load()), 100)
+            journal.remove()
+        self.assertFalse(os.path.exists(journal.path))
+
+    def test_download_into_read_only_directory(self):
+        # A resumed download goes on without a journal if it cannot be written
+        file_id = "file-" + "a"*24
+        filename = os.path.join(self.temp_dir, file_id)
+        if os.geteuid() == 0:
+            # root can write to a read-only directory
+            os.mkdir(filename + dxpy.bindings.dxfile_functions.PART_JOURNAL_SUFFIX)
+        os.chmod(self.temp_dir, 0o555)
+        try:
+            with open(filename, "wb") as fh:
+                fh.write(b"0123456789abcde")
+            self.download([file_id], chunksize=5)
+
+            with open(filename, "wb") as fh:
+                fh.write(b"0123456789abcde")
+            with patch.object(DXFile, "get_download_url", autospec=True,
+                              side_effect=lambda handler, **kw: (handler.get_id(), {})), \
+                 patch("dxpy._dxhttp_read_range", side_effect=self.read_range):
+                describe_output = dict(self.describe(file_id), size=30)
+                dxpy.download_dxfile(file_id, filename, chunksize=5, describe_output=describe_output)
+            with open(filename, "rb") as fh:
+                self.assertEqual(fh.read(), b"".join(self.contents[file_id]))
+        finally:
+            os.chmod(self.temp_dir, 0o755)
+
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+class TestChecksumBenchmark(unittest.TestCase):
+    # Measures download and resume verification throughput with and
+    # without part checksums, against an in-memory server
+    part_size = 1024*1024*16
+    num_parts = 16
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.data = os.urandom(self.part_size) * self.num_parts
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def describe(self, with_md5):
+        part_md5 = hashlib.md5(self.data[:self.part_size]).hexdigest()
+        parts = {}
+        for i in range(self.num_parts):
+            parts[str(i + 1)] = {"size": self.part_size}
+            if with_md5:
+                parts[str(i + 1)]["md5"] = part_md5
+        return {"parts": parts, "size": len(self.data)}
+
+    def report(self, label, elapsed):
+        print("{}: {:.2f} GB/s".format(label, len(self.data) / elapsed / 1e9))
+
+    def test_download_throughput(self):
+        filename = os.path.join(self.temp_dir, "benchmark")
+        for with_md5 in (False, True):
+            if os.path.exists(filename):
+                os.remove(filename)
+            downloads = [dict(dxid="file-" + "a"*24, filename=filename, describe_output=self.describe(with_md5))]
+            with patch.object(DXFile, "get_download_url", autospec=True, return_value=("url", {})), \
+                 patch("dxpy._dxhttp_read_range",
+                       side_effect=lambda url, headers, start, end, timeout, sub_range=True: self.data[start:end + 1]):
+                start_time = time.time()
+                dxpy.download_dxfiles(downloads, chunksize=self.part_size)
+                self.report("download, checksums " + ("on" if with_md5 else "off"), time.time() - start_time)
+
+        desc = self.describe(True)
+        with open(filename, "rb+") as fh:
+            start_time = time.time()
+            dxpy.bindings.dxfile_functions._verify_downloaded_parts(fh, "file-" + "a"*24, desc["parts"],
+                                                                    sorted(desc["parts"], key=int))
+            self.report("resume verification", time.time() - start_time)
+
+
+class TestUploadLocalFiles(unittest.TestCase):
+    project = "project-" + "x"*24
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.contents = {"a": b"0123456789abcdefghij", "b": b"hello", "c": b""}
+        for name, data in self.contents.items():
+            with open(os.path.join(self.temp_dir, name), "wb") as fh:
+                fh.write(data)
+        self.file_names = {}
+        self.parts = {}
+        self.closed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def file_new(self, dx_hash, **kwargs):
+        file_id = "file-{:024d}".format(len(self.file_names))
+        self.file_names[file_id] = (dx_hash["folder"], dx_hash["name"])
+        return {"id": file_id}
+
+    def upload_part(self, handler, data, index=None, **kwargs):
+        self.parts[(handler.get_id(), index)] = data
+        handler._num_uploaded_parts += 1
+
+    def upload(self, **kwargs):
+        upload_params = {"minimumPartSize": 1, "maximumPartSize": 100, "maximumNumParts": 10000,
+                         "maximumFileSize": 10**9, "emptyLastPartAllowed": True}
+        uploads = [{"filename": os.path.join(self.temp_dir, name), "folder": "/dir"} for name in sorted(self.contents)]
+        with patch("dxpy.api.file_new", side_effect=self.file_new), \
+             patch("dxpy.api.project_describe", return_value={"fileUploadParameters": upload_params}) as describe, \
+             patch.object(DXFile, "upload_part", autospec=True, side_effect=self.upload_part), \
+             patch("dxpy.api.file_close", side_effect=lambda file_id, **kw: self.closed.append(file_id)):
+            handlers = dxpy.upload_local_files(uploads, project=self.project, **kwargs)
+        self.assertEqual(describe.call_count, 1)
+        return handlers
+
+    def test_upload_many_files(self):
+        handlers = self.upload(write_buffer_size=3, max_parts_in_flight=2)
+        self.assertEqual(sorted(self.closed), sorted(handler.get_id() for handler in handlers))
+        for name, handler in zip(sorted(self.contents), handlers):
+            self.assertEqual(self.file_names[handler.get_id()], ("/dir", name))
+            indices = sorted(index for file_id, index in self.parts if file_id == handler.get_id())
+            self.assertEqual(indices, list(range(1, len(indices) + 1)))
+            data = b"".join(self.parts[(handler.get_id(), index)] for index in indices)
+            self.assertEqual(data, self.contents[name])
+
+    def test_upload_directory(self):
+        from dxpy.scripts import dx
+        dir_name = os.path.basename(self.temp_dir)
+        # The contents of a directory given as "dir/" are uploaded into the destination folder itself
+        for path, folder in ((self.temp_dir, "/dest/" + dir_name), (self.temp_dir + "/", "/dest")):
+            dx.upload_seen_paths.clear()
+            args = dx.parser.parse_args(["upload", "-r", "--brief", path, "--path", self.project + ":/dest/"])
+            with patch("dxpy.api.project_new_folder") as new_folder, \
+                 patch("dxpy.upload_local_files", return_value=[]) as upload:
+                dx.upload(args)
+            self.assertEqual(new_folder.call_args[0], (self.project, {"folder": folder, "parents": True}))
+            self.assertEqual(sorted((u["name"], u["folder"]) for u in upload.call_args[0][0]),
+                             [(name, folder) for name in sorted(self.contents)])
+
+    def test_wait_on_close(self):
+        # The files are waited on with one batched describe call
+        with patch("dxpy.api.system_describe_data_objects",
+                   side_effect=lambda input_params, **kw: {"results": [{"describe": {"state": "closed"}}
+                                                                      for _ in input_params["objects"]]}) as describe:
+            self.upload(wait_on_close=True)
+        self.assertEqual(describe.call_count, 1)
+
+class TestDXFileRead(unittest.TestCase):
+    file_id = "file-" + "a"*24
+
+    def setUp(self):
+        self.ranges_read = []
+        patchers = [patch.object(DXFile, "get_download_url", autospec=True, return_value=("url", {})),
+                    patch("dxpy._dxhttp_read_range", side_effect=self.read_range)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Let requests queued by abandoned read-ahead run while the
+        # patches are still in place
+        self.addCleanup(lambda: DXFile._http_threadpool.submit(lambda: None).result())
+
+    def read_range(self, url, headers, start, end, timeout):
+        self.ranges_read.append((start, end))
+        return self.contents[start:end + 1]
+
+    def open(self, contents, mode="rb", read_buffer_size=7, **kwargs):
+        # Serves *contents* in responses of at most *read_buffer_size* bytes
+        self.contents = contents
+        dxfile = DXFile(self.file_id, mode=mode, read_buffer_size=read_buffer_size, **kwargs)
+        dxfile._file_length = len(contents)
+        return dxfile
+
+    def test_read(self):
+        contents = bytes(bytearray(range(256))) * 3
+        dxfile = self.open(contents)
+        self.assertEqual(dxfile.read(3), contents[:3])
+        self.assertEqual(dxfile.read(20), contents[3:23])
+        dxfile.seek(21)
+        self.assertEqual(dxfile.read(2), contents[21:23])
+        dxfile.seek(500)
+        self.assertEqual(dxfile.read(10), contents[500:510])
+        dxfile.seek(-5, os.SEEK_END)
+        self.assertEqual(dxfile.read(), contents[-5:])
+        self.assertEqual(dxfile.read(), b"")
+
+    def test_buffered_reader(self):
+        contents = b"0123456789" * 10
+        with io.BufferedReader(self.open(contents).raw_io(), buffer_size=16) as fh:
+            self.assertEqual(fh.read(25), contents[:25])
+            fh.seek(90)
+            self.assertEqual(fh.read(), contents[90:])
+        b = bytearray(12)
+        dxfile = self.open(contents)
+        self.assertEqual(dxfile.readinto(b), 12)
+        self.assertEqual(bytes(b), contents[:12])
+
+    def test_read_ahead_stats(self):
+        contents = bytes(bytearray(range(256))) * 40
+        dxfile = self.open(contents, read_buffer_size=1024)
+        self.assertEqual(dxfile.read(), contents)
+        stats = dxfile.get_read_ahead_stats()
+        self.assertEqual(stats.bytes, len(contents))
+        self.assertEqual(stats.requests, len(self.ranges_read))
+        self.assertLessEqual(stats.chunk_size, 1024)
+
+    def test_read_ahead_controller(self):
+        controller = _ReadAheadController(64, 1024, 8, 2048)
+        self.assertEqual((controller.chunk_size, controller.max_requests), (64, 4))
+        # Fast requests grow the chunk size, within the memory bound
+        for _ in range(10):
+            controller.record_request(controller.chunk_size, 0.01)
+        self.assertEqual((controller.chunk_size, controller.max_requests), (1024, 2))
+        # Slow requests shrink it
+        for _ in range(10):
+            controller.record_request(controller.chunk_size, 10)
+        self.assertEqual(controller.chunk_size, 64)
+
+        # The number of requests in flight grows while it raises the
+        # throughput seen by the reader, and shrinks when that drops
+        clock = [0]
+        def consume(num_responses, num_bytes):
+            for _ in range(num_responses):
+                clock[0] += 1
+                controller.record_response(num_bytes)
+        self.assertEqual(controller.max_requests, 2)
+        with patch("dxpy.bindings.dxfile.time.time", side_effect=lambda: clock[0]):
+            consume(5, 64)
+            self.assertEqual(controller.max_requests, 4)
+            consume(4, 128)
+            self.assertEqual(controller.max_requests, 8)
+            consume(8, 128)
+            self.assertEqual(controller.max_requests, 8)
+            consume(8, 64)
+            self.assertEqual(controller.max_requests, 7)
+
+    def test_block_cache(self):
+        contents = bytes(bytearray(range(100)))
+        spill_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spill_dir)
+        cache = DXBlockCache(block_size=16, max_memory=32, spill_dir=spill_dir)
+        dxfile = self.open(contents, block_cache=cache)
+        for offset, length in [(90, 10), (5, 20), (40, 3), (92, 5), (10, 30), (0, 100)]:
+            dxfile.seek(offset)
+            self.assertEqual(dxfile.read(length), contents[offset:offset + length])
+        # Every block was fetched exactly once, as a whole
+        self.assertEqual(sorted(self.ranges_read), [(start, min(start + 15, 99)) for start in range(0, 100, 16)])
+        stats = cache.stats()
+        self.assertEqual(stats["misses"], 7)
+        self.assertGreater(stats["spill_hits"], 0)
+        self.assertLessEqual(stats["memory_bytes"], 32)
+
+        # Other handlers of the same file share the cache
+        self.assertEqual(self.open(contents, block_cache=cache).read(), contents)
+        self.assertEqual(len(self.ranges_read), 7)
+
+    @unittest.skipIf(USING_PYTHON2, 'Text mode lines are bytes in Python 2')
+    def test_iterate_lines(self):
+        contents = "first line\nsecond ééé line\r\n\nlast line without newline"
+        dxfile = self.open(contents.encode("utf-8"), mode="r", read_buffer_size=5)
+        self.assertEqual(list(dxfile), ["first line", "second ééé line", "", "last line without newline"])
+
+@unittest.skipUnless(HAVE_AIO, 'dxpy.aio requires Python 3 and aiohttp')
+class TestAsyncDXHTTPRequest(unittest.TestCase):
+    def request(self, responses, **kwargs):
+        # Serves the given (status, headers, body) responses in order
+        # from a local server, and makes one request against it.
+        requests_received = []
+        async def handler(request):
+            requests_received.append(await request.json())
+            status, headers, body = responses[len(requests_received) - 1]
+            return web.Response(status=status, headers=headers, body=body, content_type="application/json")
+
+        async def run():
+            server = web.Server(handler)
+            runner = web.ServerRunner(server)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                return await dxpy.aio.DXHTTPRequest("http://127.0.0.1:%d/system/whoami" % port, {"n": 1},
+                                                    prepend_srv=False, auth=None, **kwargs)
+            finally:
+                await dxpy.aio.close_session()
+                await runner.cleanup()
+
+        try:
+            return asyncio.run(run())
+        finally:
+            self.num_requests = len(requests_received)
+
+    def test_retry_after_503(self):
+        result = self.request([(503, {"Retry-After": "0"}, b'{}'),
+                               (503, {"Retry-After": "0"}, b'{}'),
+                               (200, {}, b'{"id": "user-alice"}')],
+                              max_retries=1)
+        self.assertEqual(result, {"id": "user-alice"})
+        self.assertEqual(self.num_requests, 3)
+
+    def test_api_error_is_not_retried(self):
+        error = json.dumps({"error": {"type": "InvalidInput", "message": "bad input"}}).encode()
+        with self.assertRaises(dxpy.exceptions.InvalidInput):
+            self.request([(422, {}, error)], always_retry=True)
+        self.assertEqual(self.num_requests, 1)
+
+class TestResolveMultipleExistingPaths(unittest.TestCase):
+    def test_ids_are_described_in_bulk(self):
+        from dxpy.utils.resolver import resolve_multiple_existing_paths
+        project = "project-" + "0" * 24
+        file_ids = ["file-" + "%024d" % i for i in range(5)]
+        job_id = "job-" + "0" * 24
+        bulk_calls = []
+        def describe_data_objects(input_params, **kwargs):
+            bulk_calls.append(input_params["objects"])
+            # file 3 is only found without the project hint
+            return {"results": [{} if obj["id"] == file_ids[3] and "project" in obj or obj["id"] == file_ids[4]
+                                else {"describe": {"id": obj["id"], "project": project}}
+                                for obj in input_params["objects"]]}
+        def describe_job(resource, data, **kwargs):
+            self.assertEqual(resource, "/" + job_id + "/describe")
+            return {"id": job_id}
+
+        with patch.object(dxpy, "WORKSPACE_ID", project), \
+                patch("dxpy.api.system_describe_data_objects", side_effect=describe_data_objects), \
+                patch("dxpy.DXHTTPRequest", side_effect=describe_job):
+            results = resolve_multiple_existing_paths(file_ids + [job_id])
+
+        self.assertEqual(len(bulk_calls), 2)
+        self.assertEqual([obj["id"] for obj in bulk_calls[0]], file_ids)
+        self.assertTrue(all(obj["project"] == project for obj in bulk_calls[0]))
+        self.assertEqual(bulk_calls[1], [{"id": file_ids[3], "describe": True}, {"id": file_ids[4], "describe": True}])
+        for file_id in file_ids[:4]:
+            self.assertEqual(results[file_id], {"project": project, "folder": None,
+                                                "name": {"id": file_id, "describe": {"id": file_id, "project": project}}})
+        # An ID that cannot be described is returned as is
+        self.assertEqual(results[file_ids[4]]["name"], file_ids[4])
+        self.assertEqual(results[job_id]["name"], {"id": job_id, "describe": {"id": job_id}})
+
+class TestResolveDataObjects(unittest.TestCase):
+    def test_concurrent_batches_keep_order(self):
+        calls = []
+        def resolve(input_params, **kwargs):
+            calls.append((input_params, kwargs))
+            # Later batches finish first
+            time.sleep(0.01 * (10 - int(input_params["objects"][0]["name"]) // 3))
+            return {"results": [[{"project": input_params["project"], "id": obj["name"]}]
+                                for obj in input_params["objects"]]}
+        objects = [{"name": str(i)} for i in range(10)]
+        with patch("dxpy.api.system_resolve_data_objects", side_effect=resolve):
+            results = dxpy.resolve_data_objects(objects, project="project-x", batchsize=3, max_retries=2)
+        self.assertEqual([result[0]["id"] for result in results], [str(i) for i in range(10)])
+        self.assertEqual(sorted(len(input_params["objects"]) for input_params, _kwargs in calls), [1, 3, 3, 3])
+        self.assertTrue(all(kwargs == {"max_retries": 2} for _input_params, kwargs in calls))
+
+class TestWaitOnMany(unittest.TestCase):
+    def run_wait(self, states_by_round, **kwargs):
+        # Each round maps execution IDs to the state returned by that
+        # round's describe calls
+        self.described, self.sleeps = [], []
+        def describe_executions(input_params, **kwargs):
+            ids = [execution["id"] for execution in input_params["executions"]]
+            self.described.append(ids)
+            states = states_by_round[min(len(self.described), len(states_by_round)) - 1]
+            return {"results": [{"describe": {"id": execution_id, "state": states.get(execution_id, "running"),
+                                              "failureReason": "AppError", "failureMessage": "oops"}}
+                                for execution_id in ids]}
+        with patch("dxpy.api.system_describe_executions", side_effect=describe_executions), \
+                patch("dxpy.bindings.dxjob.time.sleep", side_effect=self.sleeps.append):
+            return [desc["id"] for desc in dxpy.wait_on_many(**kwargs)]
+
+    def test_completions_in_order_of_finishing(self):
+        analysis_id = "analysis-" + "0" * 24
+        done = self.run_wait([{}, {"job-2": "done"}, {"job-2": "done", analysis_id: "done"},
+                              {"job-2": "done", analysis_id: "done", "job-1": "done"}],
+                             executions=["job-1", "job-2", dxpy.DXAnalysis(analysis_id), "job-2"])
+        self.assertEqual(done, ["job-2", analysis_id, "job-1"])
+        self.assertEqual(self.described, [["job-1", "job-2", analysis_id], ["job-1", "job-2", analysis_id],
+                                          ["job-1", analysis_id], ["job-1"]])
+        self.assertEqual(len(self.sleeps), 3)
+
+    def test_backoff(self):
+        self.run_wait([{}] * 6 + [{"job-1": "done"}], executions=["job-1"], interval=2, max_interval=10)
+        self.assertEqual(len(self.sleeps), 6)
+        for sleep, interval in zip(self.sleeps, [2, 4, 8, 10, 10, 10]):
+            self.assertTrue(interval / 2.0 <= sleep <= interval)
+
+    def test_batches(self):
+        with patch("dxpy.bindings.dxjob.DESCRIBE_EXECUTIONS_BATCH_SIZE", 2):
+            self.run_wait([{"job-1": "done", "job-2": "done", "job-3": "done"}],
+                          executions=["job-1", "job-2", "job-3"])
+        self.assertEqual(self.described, [["job-1", "job-2"], ["job-3"]])
+
+    def test_failures(self):
+        with self.assertRaisesRegex(dxpy.exceptions.DXJobFailureError, "job-2 has failed because of AppError: oops"):
+            self.run_wait([{"job-2": "failed"}], executions=["job-1", "job-2"])
+        done = self.run_wait([{"job-2": "terminated"}, {"job-1": "done"}], executions=["job-1", "job-2"],
+                             fail_fast=False)
+        self.assertEqual(done, ["job-2", "job-1"])
+
+    def test_timeout(self):
+        with self.assertRaisesRegex(dxpy.exceptions.DXJobFailureError, "Reached timeout"):
+            self.run_wait([{}], executions=["job-1"], timeout=0)
+
+class TestHTTPPools(unittest.TestCase):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = b"close" if self.path == "/close" else b"data"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            if self.path == "/close":
+                self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), self.Handler)
+        self.server.daemon_threads = True
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+        dxpy.get_http_pool_stats(reset=True)
+
+    def tearDown(self):
+        with dxpy._pool_mutex:
+            pool_manager = dxpy._pool_managers.pop(dxpy.STORAGE_POOL, None)
+        if pool_manager is not None:
+            pool_manager.clear()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get(self, path):
+        return dxpy.DXHTTPRequest(self.url + path, "", method="GET", auth=None, prepend_srv=False,
+                                  jsonify_data=False, decode_response_body=False, max_retries=0)
+
+    def test_pool_name(self):
+        self.assertEqual(dxpy._get_pool_name(dxpy.APISERVER + "/system/whoami"), dxpy.API_POOL)
+        self.assertEqual(dxpy._get_pool_name(None), dxpy.API_POOL)
+        self.assertEqual(dxpy._get_pool_name("https://bucket.s3.amazonaws.com/part"), dxpy.STORAGE_POOL)
+
+    def test_pool_size(self):
+        with patch.dict(os.environ, {"DX_API_POOL_SIZE": "4", "DX_STORAGE_POOL_SIZE": "64"}):
+            self.assertEqual(dxpy._get_pool_size(dxpy.API_POOL), 4)
+            self.assertEqual(dxpy._get_pool_size(dxpy.STORAGE_POOL), 64)
+        with patch.dict(os.environ, {"DX_API_POOL_SIZE": "many"}):
+            self.assertEqual(dxpy._get_pool_size(dxpy.API_POOL), dxpy.DEFAULT_API_POOL_SIZE)
+        self.assertGreaterEqual(dxpy._get_pool_size(dxpy.STORAGE_POOL), dxpy.DEFAULT_STORAGE_POOL_SIZE)
+
+    def test_connection_counters(self):
+        for _ in range(3):
+            self.assertEqual(self.get("/data"), b"data")
+        stats = dxpy.get_http_pool_stats()
+        self.assertEqual(stats[dxpy.STORAGE_POOL], dict(opened=1, reused=2, dropped=0, waits=0))
+        self.assertEqual(stats[dxpy.API_POOL], dict(opened=0, reused=0, dropped=0, waits=0))
+
+        # A connection closed by the server is opened again
+        self.get("/close")
+        self.get("/data")
+        self.assertEqual(dxpy.get_http_pool_stats(reset=True)[dxpy.STORAGE_POOL]["opened"], 2)
+        self.assertEqual(dxpy.get_http_pool_stats()[dxpy.STORAGE_POOL]["opened"], 0)
+
+    def test_full_pool_drops_connections(self):
+        with patch.dict(os.environ, {"DX_STORAGE_POOL_SIZE": "1"}):
+            pool = dxpy._get_pool_manager(None, None, None, pool_name=dxpy.STORAGE_POOL).connection_from_url(self.url)
+        first, second = pool._get_conn(), pool._get_conn()
+        pool._put_conn(first)
+        pool._put_conn(second)
+        self.assertEqual(dxpy.get_http_pool_stats()[dxpy.STORAGE_POOL], dict(opened=2, reused=0, dropped=1, waits=0))
+
+def _run_python(code, *python_args):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(dxpy.__file__))))
+    return subprocess.check_output([sys.executable] + list(python_args) + ["-c", code], env=env,
+                                   stderr=subprocess.STDOUT).decode("utf-8")
+
+class TestCLIStartup(unittest.TestCase):
+    # Modules only needed by a few subcommands, which should not slow
+    # down every invocation of dx
+    lazy_modules = ["dxpy.scripts.dx_build_app", "dxpy.workflow_builder", "dxpy.nextflow.nextflow_builder",
+                    "dxpy.cli.dataset_utilities", "distutils", "setuptools", "pkg_resources"]
+
+    def test_heavy_modules_are_not_imported(self):
+        loaded = json.loads(_run_python("import sys, json, dxpy.scripts.dx; print(json.dumps(sorted(sys.modules)))"))
+        for module in self.lazy_modules:
+            self.assertNotIn(module, loaded)
+
+    def test_lazy_handler(self):
+        from dxpy.cli import lazy_handler
+        handler = lazy_handler("dxpy.utils.genomic_utils", "reverse_complement")
+        self.assertEqual(handler.__name__, "reverse_complement")
+        self.assertEqual(handler(b"CGGTTTAAAA"), b"TTTTAAACCG")
+
+@unittest.skipUnless(testutil.TEST_BENCHMARKS, 'skipping benchmarks')
+@unittest.skipIf(sys.version_info < (3, 7), '-X importtime requires Python 3.7')
+class TestCLIStartupBenchmark(unittest.TestCase):
+    # Budget for the cumulative import time of dx (the work done before
+    # any subcommand, such as "dx pwd" or "dx ls", starts to run)
+    import_budget_ms = 400
+
+    def test_import_time(self):
+        timings = []
+        for _ in range(3):
+            output = _run_python("import dxpy.scripts.dx", "-X", "importtime")
+            last_line = [line for line in output.splitlines() if line.endswith("| dxpy.scripts.dx")][-1]
+            timings.append(int(last_line.split("|")[1]) / 1000)
+        print("dx import time: {:.0f} ms".format(min(timings)))
+        self.assertLess(min(timings), self.import_budget_ms)
+
+@unittest.skipIf(USING_PYTHON2 or not hasattr(socket, "AF_UNIX"), 'the dx command server requires Python 3 and Unix sockets')
+class TestCommandServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, "dx-server.sock")
+        # Other tests may leave dx configuration variables behind in the
+        # environment of this process
+        self.env = dict((k, v) for k, v in os.environ.items() if not k.startswith("DX_"))
+        self.env.update(DX_USER_CONF_DIR=self.temp_dir, DX_APISERVER_PROTOCOL="http",
+                        DX_APISERVER_HOST="127.0.0.1", DX_APISERVER_PORT="9",
+                        PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(dxpy.__file__))))
+        self.server = subprocess.Popen([sys.executable, "-m", "dxpy.scripts.dx_server", "--spares", "2"],
+                                       env=self.env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        for _ in range(100):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.1)
+
+    def tearDown(self):
+        if self.server.poll() is None:
+            self.server.kill()
+        self.server.wait()
+        self.server.stdout.close()
+        shutil.rmtree(self.temp_dir)
+
+    def run_client(self, args, **env):
+        client = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(dxpy.__file__))), "scripts", "dx-client")
+        process = subprocess.Popen([sys.executable, client] + args, env=dict(self.env, **env),
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        return process.returncode, stdout.decode("utf-8"), stderr.decode("utf-8")
+
+    def test_run_commands(self):
+        self.assertTrue(os.path.exists(self.socket_path))
+        self.assertEqual(self.run_client(["--version"]), (0, "dx v" + dxpy.TOOLKIT_VERSION + "\n", ""))
+
+        # The configuration is that of the client
+        code, stdout, _ = self.run_client(["env", "--bash"], DX_APISERVER_HOST="example.com",
+                                          DX_PROJECT_CONTEXT_ID="project-" + "0" * 24)
+        self.assertEqual(code, 0)
+        self.assertIn("export DX_APISERVER_HOST=example.com\n", stdout)
+        self.assertIn("export DX_PROJECT_CONTEXT_ID=project-" + "0" * 24 + "\n", stdout)
+        code, stdout, _ = self.run_client(["env", "--bash"])
+        self.assertIn("export DX_APISERVER_HOST=127.0.0.1\n", stdout)
+        self.assertNotIn("DX_PROJECT_CONTEXT_ID", stdout)
+
+        code, stdout, stderr = self.run_client(["nosuchcommand"])
+        self.assertEqual(code, 2)
+        self.assertIn("usage: dx ", stderr)
+
+        subprocess.check_call([sys.executable, "-m", "dxpy.scripts.dx_server", "--stop"], env=self.env)
+        self.assertEqual(self.server.wait(), 0)
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_client_terminal(self):
+        # A server started from a terminal runs the commands of a client
+        # whose standard streams are not terminals as non-interactive
+        import pty
+        master_fd, slave_fd = pty.openpty()
+        self.addCleanup(os.close, master_fd)
+        socket_path = os.path.join(self.temp_dir, "pty.sock")
+        env = dict(self.env, DX_COMMAND_SERVER=socket_path)
+        server = subprocess.Popen([sys.executable, "-m", "dxpy.scripts.dx_server", "--spares", "1"],
+                                  env=env, stdin=slave_fd, stdout=slave_fd, stderr=slave_fd)
+        os.close(slave_fd)
+        try:
+            for _ in range(100):
+                if os.path.exists(socket_path):
+                    break
+                time.sleep(0.1)
+            client = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(dxpy.__file__))), "scripts", "dx-client")
+            process = subprocess.Popen([sys.executable, client, "new", "project"], env=env, stdin=subprocess.DEVNULL,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            stdout, stderr = process.communicate()
+            self.assertEqual(process.returncode, 3)
+            self.assertIn("input is not interactive", stdout.decode("utf-8") + stderr.decode("utf-8"))
+        finally:
+            server.kill()
+            server.wait()
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), 'DXLogHandler requires Unix sockets')
+class TestDXLogHandler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.sockets = {}
+        for name in ("priority", "bulk"):
+            self.sockets[name] = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sockets[name].bind(os.path.join(self.temp_dir, name))
+            self.sockets[name].settimeout(5)
+        self.logger = logging.getLogger("test_dxlog")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+        for sock in self.sockets.values():
+            sock.close()
+        shutil.rmtree(self.temp_dir)
+
+    def add_handler(self, **kwargs):
+        handler = dxpy.DXLogHandler(os.path.join(self.temp_dir, "priority"), os.path.join(self.temp_dir, "bulk"),
+                                    **kwargs)
+        self.logger.addHandler(handler)
+        return handler
+
+    def receive(self, name):
+        return json.loads(self.sockets[name].recv(65536).decode("utf-8"))
+
+    def test_send(self):
+        for queue_size in (None, 10):
+            handler = self.add_handler(queue_size=queue_size)
+            self.logger.info("hello %s", "world")
+            self.logger.critical("down")
+            handler.flush()
+            self.assertEqual(self.receive("bulk")["msg"], "hello world")
+            self.assertEqual(self.receive("priority")["msg"], "down")
+            self.assertEqual(handler.get_queue_stats(), dict(sent=2, dropped=0, coalesced=0, queued=0))
+            self.logger.removeHandler(handler)
+            handler.close()
+
+    def test_truncate_message(self):
+        def truncate_by_one_byte(message):
+            msg_bytes = message.encode('utf-8')[:8000]
+            while len(json.dumps(msg_bytes.decode('utf-8', 'ignore'))) > 8000:
+                msg_bytes = msg_bytes[:-1]
+            return msg_bytes.decode('utf-8', 'ignore') + "... [truncated]"
+
+        handler = self.add_handler()
+        self.assertEqual(handler.truncate_message("short"), "short")
+        for message in ("x" * 9000, "\u00fc" * 5000, "a\"b\\c\n\x01" * 2000, "\U0001F600 z" * 3000,
+                        "y" * 7990 + "\u20ac" * 10):
+            truncated = handler.truncate_message(message)
+            self.assertEqual(truncated, truncate_by_one_byte(message))
+            self.assertLessEqual(len(json.dumps(truncated)), 8015 + 2)
+
+    def test_queue_backpressure(self):
+        handler = self.add_handler(queue_size=2)
+        release, sent = threading.Event(), []
+        def send(record, level, message, timestamp, priority=None):
+            release.wait()
+            sent.append(message)
+        handler._send = send
+
+        self.logger.info("a")
+        for _ in range(100):
+            if handler.get_queue_stats()["queued"] == 0:
+                break
+            time.sleep(0.01)
+        self.logger.info("b")
+        self.logger.info("c")
+        self.logger.info("c")
+        self.logger.info("d")
+        self.assertEqual(handler.get_queue_stats(), dict(sent=0, dropped=1, coalesced=1, queued=2))
+        release.set()
+        handler.flush()
+        self.assertEqual(sent, ["a", "b", "1 log messages were dropped because the log queue was full",
+                                "c [repeated 1 more times]"])
+
+class TestJSONStreamReader(unittest.TestCase):
+    class Response(io.BytesIO):
+        released = False
+
+        def release_conn(self):
+            self.released = True
+
+    def read_items(self, doc, chunk_size):
+        items = []
+        for key, value in JSONStreamReader(io.BytesIO(doc.encode("utf-8")), chunk_size).iter_items({"results"}):
+            items.append((key, list(value) if key == "results" else value))
+        return items
+
+    def test_chunk_boundaries(self):
+        rows = [{"id": i, "name": "r\u00e9sum\u00e9 \"{}\"".format(i), "score": i * 1.5e-3, "ok": i % 2 == 0,
+                 "tags": [None, "[,]"]} for i in range(50)]
+        doc = json.dumps({"meta": {"n": 50}, "results": rows, "total": 12345}, indent=1)
+        for chunk_size in (1, 2, 3, 7, 1024):
+            self.assertEqual(self.read_items(doc, chunk_size),
+                             [("meta", {"n": 50}), ("results", rows), ("total", 12345)])
+        self.assertEqual(self.read_items(' { "results" : [ ] , "a":1 }', 1), [("results", []), ("a", 1)])
+        self.assertEqual(self.read_items('{}', 1), [])
+        for doc in ('{"results": [1, 2', '{"results": [1 2]}', '[1]', '{"a": tru}'):
+            with self.assertRaises(ValueError):
+                self.read_items(doc, 2)
+
+    def test_unconsumed_stream_is_skipped(self):
+        doc = b'{"results": [1, [2, 3], {"x": 4}], "after": "yes"}'
+        items = JSONStreamReader(io.BytesIO(doc), 4).iter_items({"results"})
+        self.assertEqual(next(items)[0], "results")
+        self.assertEqual(next(items), ("after", "yes"))
+
+    def test_stream_raw_api_call(self):
+        from dxpy.cli import dataset_utilities
+        resp = {"url": "https://vizserver", "dataset": "record-xxxx"}
+
+        def query(doc):
+            response = self.Response(doc.encode("utf-8"))
+            with patch("dxpy.DXHTTPRequest", return_value=response) as request:
+                results = dataset_utilities.stream_raw_api_call(resp, {"sql": False}, sql_message=False)
+                self.assertEqual(request.call_args[1]["resource"], "https://vizserver/data/3.0/record-xxxx/raw")
+            return results, response
+
+        results, response = query('{"results": [{"a": 1}, {"a": 2}], "sql": ""}')
+        self.assertEqual(list(results), [{"a": 1}, {"a": 2}])
+        self.assertTrue(response.released)
+
+        # Errors reported before the results are raised before any output is written
+        with patch("dxpy.cli.dataset_utilities.err_exit", side_effect=SystemExit) as err_exit:
+            with self.assertRaises(SystemExit):
+                query('{"error": {"type": "InvalidInput", "message": "No access"}}')
+            self.assertIn("No access", err_exit.call_args[0][0])
+
+class TestGenoBinsCache(unittest.TestCase):
+    def setUp(self):
+        from dxpy.dx_extract_utils import filter_to_payload
+        self.filter_to_payload = filter_to_payload
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        patcher = patch.object(dxpy.config, "get_user_conf_dir", return_value=self.temp_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.dict(filter_to_payload._geno_bin_indexes, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_geno_bins_are_downloaded_once(self):
+        geno_bins = {"BRCA2": {"chr": "13", "start": 32315507, "end": 32400268, "strand": "+"}}
+        file_id = self.filter_to_payload.load_geno_bin_manifest("Homo_sapiens_genes_manifest.json")["GRCh38.92"][
+            "aws:us-east-1"]
+        geno_bins_file = io.BytesIO(json.dumps(geno_bins).encode("utf-8"))
+
+        def describe(dxid, **kwargs):
+            return {"region": "aws:us-east-1"} if dxid == "project-xxxx" else {"id": dxid}
+
+        expected = [{"chr": "13", "start": 32315507, "end": 32400268}]
+        with patch("dxpy.describe", side_effect=describe) as describe_mock, \
+                patch("dxpy.DXFile", return_value=geno_bins_file) as dxfile_mock:
+            self.assertEqual(self.filter_to_payload.retrieve_geno_bins(["BRCA2"], "project-xxxx", "GRCh38.92"),
+                             expected)
+            dxfile_mock.assert_called_once_with(file_id, mode="rb")
+            self.assertEqual(describe_mock.call_count, 2)
+
+            # Later processes use the index kept on disk
+            self.filter_to_payload._geno_bin_indexes.clear()
+            self.assertEqual(self.filter_to_payload.retrieve_geno_bins(["BRCA2"], "project-xxxx", "GRCh38.92"),
+                             expected)
+            self.assertEqual(dxfile_mock.call_count, 1)
+            self.assertEqual(describe_mock.call_count, 3)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "geno_bins", file_id + ".json")))
+
+class TestUploadResources(unittest.TestCase):
+    def setUp(self):
+        self.src_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.src_dir)
+        os.makedirs(os.path.join(self.src_dir, "resources", "bin"))
+        with open(os.path.join(self.src_dir, "resources", "bin", "tool"), "w") as fh:
+            fh.write("#!/bin/sh\n" * 1000)
+        os.symlink("bin/tool", os.path.join(self.src_dir, "resources", "tool"))
+        with open(os.path.join(self.src_dir, "dxapp.json"), "w") as fh:
+            json.dump({"name": "resources_app", "project": "project-xxxx",
+                       "runSpec": {"interpreter": "bash", "file": "code.sh"}}, fh)
+
+    def test_existing_bundle_is_reused_without_archiving(self):
+        from dxpy import app_builder
+        existing = DXFile("file-" + "x" * 24)
+        with patch("dxpy.find_one_data_object", return_value=existing) as find_mock, \
+                patch("dxpy.new_dxfile") as new_dxfile_mock, patch("tarfile.open") as tarfile_mock:
+            bundle = app_builder.upload_resources(self.src_dir, brief=True)
+        self.assertEqual(bundle, [{"name": "resources.tar.gz", "id": dxpy.dxlink(existing.get_id())}])
+        self.assertEqual(len(find_mock.call_args[1]["properties"]["resource_bundle_checksum"]), 40)
+        self.assertFalse(new_dxfile_mock.called)
+        self.assertFalse(tarfile_mock.called)
+
+    def test_bundle_is_streamed(self):
+        from dxpy import app_builder
+        uploaded = io.BytesIO()
+        with patch("dxpy.find_one_data_object", return_value=None), patch("dxpy.new_dxfile") as new_dxfile_mock:
+            new_dxfile_mock.return_value.write.side_effect = uploaded.write
+            new_dxfile_mock.return_value.get_id.return_value = "file-" + "y" * 24
+            app_builder.upload_resources(self.src_dir, worker_resources_subpath="home/dnanexus")
+        new_dxfile_mock.return_value.close.assert_called_once_with(block=True)
+        with tarfile.open(fileobj=io.BytesIO(uploaded.getvalue()), mode="r:gz") as tar:
+            self.assertEqual(tar.getnames(), ["home/dnanexus", "home/dnanexus/tool", "home/dnanexus/bin",
+                                              "home/dnanexus/bin/tool"])
+            self.assertTrue(tar.getmember("home/dnanexus/tool").issym())
+
+    def test_bundle_is_built_once_for_all_regions(self):
+        from dxpy import app_builder
+        existing = DXFile("file-" + "x" * 24)
+        uploaded = {}
+
+        def find_one_data_object(project=None, **kwargs):
+            return existing if project == "project-existing" else None
+
+        def new_dxfile(project=None, **kwargs):
+            uploaded[project] = io.BytesIO()
+            dxfile = DXFile("file-" + project[-1] * 24)
+            dxfile.write = uploaded[project].write
+            dxfile.close = lambda block: None
+            return dxfile
+
+        projects_by_region = {"aws:us-east-1": "project-existing", "aws:eu-west-2": "project-a",
+                              "azure:westus": "project-b"}
+        with patch("dxpy.find_one_data_object", side_effect=find_one_data_object), \
+                patch("dxpy.new_dxfile", side_effect=new_dxfile), \
+                patch("dxpy.app_builder._scan_resources_dir", wraps=app_builder._scan_resources_dir) as scan_mock:
+            bundles = app_builder.upload_resources_to_regions(self.src_dir, projects_by_region, brief=True)
+        self.assertEqual(scan_mock.call_count, 1)
+        self.assertEqual(bundles, {"aws:us-east-1": [{"name": "resources.tar.gz", "id": dxpy.dxlink(existing.get_id())}],
+                                   "aws:eu-west-2": [{"name": "resources.tar.gz", "id": dxpy.dxlink("file-" + "a" * 24)}],
+                                   "azure:westus": [{"name": "resources.tar.gz", "id": dxpy.dxlink("file-" + "b" * 24)}]})
+        self.assertEqual(sorted(uploaded), ["project-a", "project-b"])
+        self.assertEqual(uploaded["project-a"].getvalue(), uploaded["project-b"].getvalue())
+
+    def test_run_in_regions(self):
+        from dxpy.executable_builder import run_in_regions
+
+        def fn(region, arg):
+            if arg < 0:
+                raise ValueError(region)
+            time.sleep(0.2)
+            return arg * 2
+
+        start = time.time()
+        results, error = run_in_regions(fn, {"r1": 1, "r2": 2, "r3": 3})
+        self.assertEqual(results, {"r1": 2, "r2": 4, "r3": 6})
+        self.assertIsNone(error)
+        self.assertLess(time.time() - start, 0.5)
+
+        results, error = run_in_regions(fn, {"r1": 1, "r2": -1})
+        self.assertEqual(results, {"r1": 2})
+        self.assertIsInstance(error, ValueError)
+
+    def test_parallel_gzip_writer(self):
+        from dxpy.app_builder import _ParallelGzipWriter
+        data = os.urandom(5000) + b"a" * 100000
+        for block_size in (1, 1000, 1024*1024):
+            compressed = io.BytesIO()
+            writer = _ParallelGzipWriter(compressed, block_size=block_size, max_workers=2)
+            for i in range(0, len(data), 777):
+                writer.write(data[i:i + 777])
+            writer.close()
+            self.assertEqual(gzip.decompress(compressed.getvalue()), data)
+        compressed = io.BytesIO()
+        _ParallelGzipWriter(compressed).close()
+        self.assertEqual(gzip.decompress(compressed.getvalue()), b"")
+
+class TestInputManifest(unittest.TestCase):
+    def setUp(self):
+        self.home_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home_dir)
+        self.job_input_file = os.path.join(self.home_dir, "job_input.json")
+        self.file_ids = ["file-" + str(i) * 24 for i in range(3)]
+        with open(self.job_input_file, "w") as fh:
+            json.dump({"reads": [dxpy.dxlink(file_id) for file_id in self.file_ids[:2]],
+                       "ref": dxpy.dxlink(self.file_ids[2], "project-" + "x" * 24),
+                       "evalue": 0.01}, fh)
+
+    def bulk_describe(self, ids, **kwargs):
+        for file_id in ids:
+            yield {"id": file_id, "name": "name of " + file_id[-1], "size": 1, "parts": {"1": {"size": 1}}}
+
+    def test_files_are_described_once(self):
+        from dxpy.utils import file_load_utils
+        with patch("dxpy.bulk_describe", side_effect=self.bulk_describe) as describe_mock:
+            dirs, files, rest = file_load_utils.get_job_input_filenames(self.job_input_file)
+            self.assertEqual(describe_mock.call_count, 1)
+            self.assertEqual(list(describe_mock.call_args[0][0]), self.file_ids)
+            self.assertEqual(rest, {"evalue": 0.01})
+            self.assertEqual([f["trg_fname"] for f in files["reads"]], ["reads/0/name of 0", "reads/1/name of 1"])
+            self.assertEqual(files["ref"][0]["src_file_desc"]["parts"], {"1": {"size": 1}})
+
+            # The manifest is used by later calls, as long as the job input is unchanged
+            _, files_again, _ = file_load_utils.get_job_input_filenames(self.job_input_file)
+            self.assertEqual(files_again["ref"][0]["src_file_desc"], files["ref"][0]["src_file_desc"])
+            self.assertEqual(describe_mock.call_count, 1)
+            with open(self.job_input_file, "a") as fh:
+                fh.write("\n")
+            file_load_utils.get_job_input_filenames(self.job_input_file)
+            self.assertEqual(describe_mock.call_count, 2)
+
+class TestJobLogStreamClient(unittest.TestCase):
+    job_ids = ["job-" + str(i) * 24 for i in range(4)]
+
+    def describe(self, job_id):
+        return {"id": job_id, "name": "name of " + job_id[-1], "state": "done", "rootExecution": self.job_ids[0]}
+
+    def setUp(self):
+        # Describes block until the test releases them
+        self.released = threading.Event()
+        self.timed_out = []
+
+    def wait_for_release(self):
+        if not self.released.wait(10):
+            self.timed_out.append(True)
+
+    def job_describe(self, job_id, input_params={}, **kwargs):
+        self.wait_for_release()
+        return self.describe(job_id)
+
+    def describe_executions(self, input_params, **kwargs):
+        self.wait_for_release()
+        return {"results": [{"describe": self.describe(execution["id"])} for execution in input_params["executions"]]}
+
+    def watch(self, client, messages=None):
+        client._app = type(str("App"), (), {"keep_running": True})()
+        for i in range(100):
+            client.received_message(json.dumps({"job": self.job_ids[i % 4], "level": "STDOUT", "msg": str(i)}))
+        client.received_message(json.dumps({"job": self.job_ids[0], "source": "SYSTEM", "msg": "END_LOG"}))
+        # All messages were received while the describes were still blocked
+        self.assertFalse(client._app.keep_running)
+        if messages is not None:
+            self.assertEqual(messages, [])
+        self.released.set()
+        client.closed()
+        self.assertEqual(self.timed_out, [])
+
+    def test_messages_are_not_held_up_by_describes(self):
+        from dxpy.utils.job_log_client import DXJobLogStreamClient
+        messages = []
+        client = DXJobLogStreamClient(self.job_ids[0], msg_callback=messages.append)
+        with patch("dxpy.api.job_describe", side_effect=self.job_describe) as describe_mock, \
+                patch("dxpy.api.system_describe_executions", side_effect=self.describe_executions) as bulk_mock, \
+                patch("dxpy.utils.job_log_client.get_find_executions_string", side_effect=lambda desc, **kwargs: desc["id"]):
+            self.watch(client, messages)
+
+            self.assertEqual([m["msg"] for m in messages], [str(i) for i in range(100)])
+            self.assertEqual(sorted(client.seen_jobs), self.job_ids)
+            self.assertEqual(client.seen_jobs[self.job_ids[3]]["name"], "name of 3")
+            # Each job is described once while watching, and the summary
+            # describes the watched job and, together, the others
+            described = [[e["id"] for e in call[0][0]["executions"]] for call in bulk_mock.call_args_list]
+            self.assertEqual(sorted(sum(described[:-1], [])), self.job_ids)
+            self.assertEqual(described[-1], self.job_ids[1:])
+            self.assertEqual(describe_mock.call_count, 1)
+
+    def test_messages_are_printed_if_jobs_cannot_be_described(self):
+        from dxpy.utils.job_log_client import DXJobLogStreamClient
+        messages = []
+        client = DXJobLogStreamClient(self.job_ids[0], msg_callback=messages.append)
+        with patch("dxpy.api.job_describe", side_effect=self.job_describe), \
+                patch("dxpy.api.system_describe_executions", side_effect=DXError("Unavailable")), \
+                patch("dxpy.utils.job_log_client.get_find_executions_string", side_effect=lambda desc, **kwargs: desc["id"]):
+            self.watch(client)
+        self.assertEqual([m["msg"] for m in messages], [str(i) for i in range(100)])
+        self.assertEqual(list(client.seen_jobs), [self.job_ids[0]])
+
+    def test_messages_of_several_jobs_are_merged(self):
+        from dxpy.utils.job_log_client import DXJobLogStreamClient, DXMultiJobLogStreamClient
+
+        connected, all_connected, waited = [], threading.Event(), []
+
+        def connect(client):
+            # All the jobs are watched at the same time, and each job logs
+            # every fourth timestamp, with a delay
+            connected.append(client.job_id)
+            if len(connected) == len(self.job_ids):
+                all_connected.set()
+            waited.append(all_connected.wait(5))
+            offset = self.job_ids.index(client.job_id)
+            client._app = type(str("App"), (), {"keep_running": True})()
+            for timestamp in range(offset, 40, 4):
+                time.sleep(0.001 * offset)
+                client.received_message(json.dumps({"job": client.job_id, "timestamp": timestamp, "msg": "x"}))
+            client.received_message(json.dumps({"job": client.job_id, "source": "SYSTEM", "msg": "END_LOG"}))
+            client.closed()
+
+        def job_describe(job_id, input_params={}, **kwargs):
+            return dict(self.describe(job_id), state="failed" if job_id == self.job_ids[2] else "done")
+
+        messages = []
+        client = DXMultiJobLogStreamClient(self.job_ids, msg_callback=messages.append, print_job_info=False,
+                                           msg_filter=lambda message: message["job"] != self.job_ids[1],
+                                           order_window=0.5)
+        with patch.object(DXJobLogStreamClient, "connect", connect), \
+                patch("dxpy.api.job_describe", side_effect=job_describe):
+            with self.assertRaises(SystemExit) as cm:
+                client.connect()
+        self.assertEqual(cm.exception.code, 3)
+        self.assertEqual(waited, [True] * len(self.job_ids))
+        self.assertEqual([m["timestamp"] for m in messages], [t for t in range(40) if t % 4 != 1])
+
 class TestSystemRequirementsDict(unittest.TestCase):
 
     def test_add(self):